@@ -1,23 +1,119 @@
 """
 인증 관련 유틸리티
 """
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Hashable, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from database import User
+import asyncio
+import hashlib
 import os
+import threading
+import time
 import bcrypt
 
 # 비밀번호 해싱 설정
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt 비용(cost factor)과 해싱 전용 워커 풀 설정
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))  # 초과 시 즉시 실패
+
 # JWT 설정
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30일
 
+# 검증된 토큰 캐시 설정 (jwt.decode 생략)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+
+# 사용자 정보 캐시 설정 (인증된 요청마다 users 조회 생략, 0이면 비활성화)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+
+class TTLCache:
+    """크기 제한 LRU 캐시 (항목별 만료 시간 지원, 스레드 안전)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """ttl을 주면 기본 ttl과 비교해 더 짧은 쪽을 사용"""
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class UserContext:
+    """
+    인증된 요청의 사용자 정보 (DB 세션과 분리된 스냅샷)
+    User 모델과 같은 속성 이름을 사용하므로 엔드포인트에서 그대로 사용 가능
+    """
+
+    __slots__ = ("id", "username", "email", "is_active", "created_at", "last_login")
+
+    def __init__(self, id: int, username: str, email: str, is_active: bool = True,
+                 created_at: Optional[datetime] = None, last_login: Optional[datetime] = None):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.is_active = is_active
+        self.created_at = created_at
+        self.last_login = last_login
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserContext":
+        return cls(user.id, user.username, user.email, user.is_active, user.created_at, user.last_login)
+
+
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL_SECONDS)
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """비밀번호 검증"""
@@ -40,12 +136,63 @@ def get_password_hash(password: str) -> str:
         password_bytes = password_bytes[:72]
     
     # bcrypt를 직접 사용하여 해싱 (passlib의 내부 초기화 문제 회피)
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     # passlib 형식으로 변환 (bcrypt 해시는 이미 올바른 형식)
     return hashed.decode('utf-8')
 
 
+class PasswordHasherBusy(Exception):
+    """비밀번호 해싱 대기열이 가득 참 (잠시 후 재시도 필요)"""
+
+
+class PasswordHasher:
+    """
+    bcrypt 해싱/검증을 이벤트 루프 밖의 전용 스레드 풀에서 실행
+    (bcrypt는 계산 중 GIL을 놓으므로 스레드로도 병렬 실행됨)
+
+    실행 중 + 대기 중인 작업이 workers + max_queue를 넘으면 대기열에 쌓지 않고
+    PasswordHasherBusy를 발생시켜 즉시 실패
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def run(self, func, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """비밀번호 해싱 (워커 풀에서 실행)"""
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """비밀번호 검증 (워커 풀에서 실행)"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """JWT 토큰 생성"""
     to_encode = data.copy()
@@ -60,12 +207,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def verify_token(token: str) -> Optional[dict]:
-    """JWT 토큰 검증"""
+    """JWT 토큰 검증 (검증된 토큰은 만료 시간(exp)까지 캐시)"""
+    # 토큰 원문 대신 다이제스트를 키로 사용
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+    exp = payload.get("exp")
+    token_cache.set(digest, payload, ttl=exp - time.time() if isinstance(exp, (int, float)) else None)
+    return payload
 
 
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
@@ -83,10 +237,38 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
 
 
+def get_user_context(db: Session, user_id: int) -> Optional[UserContext]:
+    """ID로 사용자 정보 조회 (캐시 우선)"""
+    context = user_cache.get(user_id)
+    if context is not None:
+        return context
+    user = get_user_by_id(db, user_id)
+    if user is None:
+        return None
+    context = UserContext.from_user(user)
+    user_cache.set(user_id, context)
+    return context
+
+
+def invalidate_user(user_id: int):
+    """사용자 정보가 바뀌면 캐시에서 제거"""
+    user_cache.pop(user_id)
+
+
 def create_user(db: Session, username: str, email: str, password: str) -> User:
     """새 사용자 생성"""
     # 비밀번호 해싱 (get_password_hash에서 72바이트 제한 처리)
-    hashed_password = get_password_hash(password)
+    return _insert_user(db, username, email, get_password_hash(password))
+
+
+async def create_user_async(db: Session, username: str, email: str, password: str) -> User:
+    """새 사용자 생성 (비밀번호 해싱은 워커 풀에서 실행)"""
+    # 해싱을 기다리는 동안 DB 커넥션을 점유하지 않도록 앞선 조회의 트랜잭션을 종료 (커넥션 풀 고갈 방지)
+    db.rollback()
+    return _insert_user(db, username, email, await get_password_hash_async(password))
+
+
+def _insert_user(db: Session, username: str, email: str, hashed_password: str) -> User:
     db_user = User(
         username=username,
         email=email,
@@ -95,6 +277,7 @@ def create_user(db: Session, username: str, email: str, password: str) -> User:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_user(db_user.id)
     return db_user
 
 
@@ -105,10 +288,28 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
         return None
     if not verify_password(password, user.hashed_password):
         return None
+    return _complete_login(db, user)
+
+
+async def authenticate_user_async(db: Session, username: str, password: str) -> Optional[User]:
+    """사용자 인증 (비밀번호 검증은 워커 풀에서 실행)"""
+    user = get_user_by_username(db, username)
+    if not user:
+        return None
+    hashed_password = user.hashed_password
+    # 검증을 기다리는 동안 DB 커넥션을 점유하지 않도록 조회 트랜잭션을 종료 (커넥션 풀 고갈 방지)
+    db.rollback()
+    if not await verify_password_async(password, hashed_password):
+        return None
+    return _complete_login(db, user)
+
+
+def _complete_login(db: Session, user: User) -> Optional[User]:
     if not user.is_active:
         return None
     # 마지막 로그인 시간 업데이트
     user.last_login = datetime.utcnow()
     db.commit()
+    invalidate_user(user.id)
     return user
 
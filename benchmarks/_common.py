@@ -0,0 +1,32 @@
+"""
+벤치마크 공통 준비 (각 스크립트가 다른 프로젝트 모듈보다 먼저 import)
+
+- 저장소 루트를 작업 디렉토리와 sys.path에 지정 (python benchmarks/xxx.py로 실행해도 프로젝트 모듈을 찾음)
+- DATABASE_URL이 없으면 임시 SQLite DB 사용 (server/database는 불러올 때 엔진을 만들므로 그 전에 지정)
+- quiet(): server 등을 불러올 때 나오는 print 출력 숨김
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def temp_database_url() -> str:
+    """새 임시 SQLite DB URL"""
+    return f"sqlite:///{tempfile.mkdtemp(prefix='zoom-bench-')}/bench.db"
+
+
+def quiet():
+    """블록 안의 표준 출력 숨김 (with quiet(): import server)"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = temp_database_url()
+os.chdir(ROOT)
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
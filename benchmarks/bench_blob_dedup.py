@@ -0,0 +1,108 @@
+"""
+공유 파일 중복 제거 벤치마크
+
+같은 파일(발표 자료, 녹화본 등)을 여러 회의실에 올릴 때 디스크 사용량과 처리 시간을 비교합니다.
+
+  - upload : 회의실마다 본문을 모두 올림 (내용이 같으면 blob 하나만 남음)
+  - sha256 : 같은 회의실에 다시 올릴 때 sha256을 먼저 보내 본문 전송 생략
+
+파일마다 따로 저장하던 이전 방식의 디스크 사용량은 (파일 크기 x 업로드 수)입니다.
+
+사용법:
+    python benchmarks/bench_blob_dedup.py [--size-mb 32] [--rooms 10]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from _common import quiet
+
+with quiet():
+    import httpx
+    import uvicorn
+    import server
+    from room_store import Connection
+
+PORT = 8798
+
+
+def disk_usage(directory):
+    return sum(path.stat().st_size for path in directory.rglob("*") if path.is_file())
+
+
+async def upload(client, sid, room_id, data, chunk, sha256=None):
+    body = {"filename": "deck.bin", "size": len(data)}
+    if sha256:
+        body["sha256"] = sha256
+    response = await client.post(f"/api/rooms/{room_id}/files", params={"sid": sid}, json=body)
+    status = response.json()
+    offset, sent = status["offset"], 0
+    while offset < len(data):
+        piece = data[offset:offset + chunk]
+        response = await client.put(f"/api/files/{status['file_id']}/content", params={"sid": sid}, content=piece)
+        offset = response.json()["offset"]
+        sent += len(piece)
+    return sent
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--rooms", type=int, default=10)
+    args = parser.parse_args()
+    size = args.size_mb * 1024 * 1024
+    data = os.urandom(size)
+    digest = hashlib.sha256(data).hexdigest()
+
+    # 기존 uploads/를 건드리지 않도록 임시 디렉토리 사용
+    directory = Path(tempfile.mkdtemp(prefix="zoom-bench-uploads-"))
+    server.file_share.directory = server.blob_store.directory = directory
+    server.blob_store.blob_dir = directory / "blobs"
+
+    config = uvicorn.Config(server.socket_app, host="127.0.0.1", port=PORT, log_level="warning")
+    uv = uvicorn.Server(config)
+    serve_task = asyncio.create_task(uv.serve())
+    while not uv.started:
+        await asyncio.sleep(0.05)
+
+    print("=" * 60)
+    print("공유 파일 중복 제거")
+    print(f"파일: {args.size_mb}MB, 업로드 수: {args.rooms}, 저장 위치: {directory}")
+    print("=" * 60)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=120) as client:
+            sids = []
+            for i in range(args.rooms):
+                sid = f"bench-sid-{i}"
+                await server.store.set_user(Connection(sid, "bench", room_id=f"bench-room-{i}"))
+                sids.append(sid)
+
+            started = time.perf_counter()
+            sent = 0
+            for i, sid in enumerate(sids):
+                sent += await upload(client, sid, f"bench-room-{i}", data, server.file_share.chunk_bytes)
+            seconds = time.perf_counter() - started
+            print(f"[upload] {args.rooms}개 회의실  {seconds:6.2f}s  전송 {sent / 1024 / 1024:7.1f}MB  "
+                  f"디스크 {disk_usage(directory) / 1024 / 1024:7.1f}MB (이전 방식 {args.rooms * size / 1024 / 1024:.1f}MB)")
+
+            started = time.perf_counter()
+            sent = 0
+            for _ in range(args.rooms):
+                sent += await upload(client, sids[0], "bench-room-0", data, server.file_share.chunk_bytes, digest)
+            seconds = time.perf_counter() - started
+            print(f"[sha256] 같은 회의실 {args.rooms}번  {seconds:6.2f}s  전송 {sent / 1024 / 1024:7.1f}MB  "
+                  f"디스크 {disk_usage(directory) / 1024 / 1024:7.1f}MB")
+            print(f"blob 참조 수: {await server.store.get_blob_ref(digest)}, "
+                  f"중복으로 버린 업로드: {server.blob_store.deduplicated}")
+    finally:
+        uv.should_exit = True
+        await serve_task
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+참가 시 채팅 기록 조회 벤치마크
+
+채팅 이벤트가 많은 회의실에 참가할 때 최근 메시지를 준비하는 시간을 비교합니다.
+
+  - timeline : 타임라인처럼 회의의 모든 이벤트를 읽은 뒤 최근 메시지만 사용
+  - query    : 참가할 때마다 최근 채팅 N개만 DB에서 조회
+  - buffer   : ChatHistory 링 버퍼 (처음 한 번만 DB에서 채우고 이후는 메모리)
+
+사용법:
+    python benchmarks/bench_chat_history.py [--events 20000] [--joins 500]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from _common import quiet
+
+with quiet():
+    import server
+    from chat_history import CHAT_HISTORY_SIZE, ChatHistory
+    from database import AsyncSessionLocal, SessionLocal, Meeting, MeetingEvent, init_db
+    from sqlalchemy import select
+
+ROOM_ID = "bench-room"
+
+
+def seed(events):
+    """회의 하나와 채팅/참가 이벤트 N개 생성"""
+    init_db()
+    db = SessionLocal()
+    meeting = Meeting(room_id=ROOM_ID, started_at=datetime(2024, 1, 1))
+    db.add(meeting)
+    db.flush()
+    started = datetime(2024, 1, 1)
+    db.bulk_insert_mappings(MeetingEvent, [
+        {
+            "meeting_id": meeting.id,
+            "username": f"user{i % 20}",
+            "event_type": "chat" if i % 5 else "user_join",
+            "message": f"채팅 메시지 {i}" if i % 5 else None,
+            "timestamp": started + timedelta(milliseconds=i * 100),
+        }
+        for i in range(events)
+    ])
+    db.commit()
+    meeting_id = meeting.id
+    db.close()
+    return meeting_id
+
+
+async def timeline_history(meeting_id):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(MeetingEvent).where(MeetingEvent.meeting_id == meeting_id).order_by(MeetingEvent.timestamp.asc())
+        )
+        events = [e for e in result.scalars().all() if e.event_type == "chat"]
+    return [server._chat_message(e.username, e.message, e.timestamp) for e in events[-CHAT_HISTORY_SIZE:]]
+
+
+async def query_history(meeting_id):
+    return [message for _, message in await server._load_chat_history(ROOM_ID, CHAT_HISTORY_SIZE)]
+
+
+async def measure(label, func, joins):
+    timings = []
+    for _ in range(joins):
+        started = time.perf_counter()
+        messages = await func()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"[{label:<8}] 참가당 평균={statistics.mean(timings):8.3f}ms  최대={max(timings):8.3f}ms  "
+          f"메시지={len(messages)}")
+    return messages
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--joins", type=int, default=500)
+    args = parser.parse_args()
+
+    meeting_id = seed(args.events)
+    await server.store.ensure_room(ROOM_ID, meeting_id)
+    history = ChatHistory(server._load_chat_history)
+
+    print("=" * 60)
+    print("참가 시 채팅 기록 조회")
+    print(f"이벤트: {args.events}, 참가 수: {args.joins}, 보관 메시지: {CHAT_HISTORY_SIZE}")
+    print("=" * 60)
+    # timeline은 한 번에 수백 ms가 걸리므로 참가 수의 1/50만 측정
+    timeline = await measure("timeline", lambda: timeline_history(meeting_id), max(1, args.joins // 50))
+    query = await measure("query", lambda: query_history(meeting_id), args.joins)
+    buffer = await measure("buffer", lambda: history.get(ROOM_ID), args.joins)
+    assert timeline == query == buffer, "메시지가 다름"
+    print(f"buffer DB 조회 횟수: {history.loads}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+"""
+SQLite 동시 읽기/쓰기 혼합 벤치마크
+
+채팅 이벤트를 커밋하는 비동기 쓰기 작업과 타임라인 API처럼 동기 세션으로 읽는 작업을
+동시에 돌리면서 저널 모드별 처리량과 지연 시간, 잠금 오류 수를 비교합니다.
+읽기는 별도 프로세스(여러 워커)에서 실행해 GIL 경합이 아니라 DB 잠금만 비교되도록 합니다.
+
+  - delete/FULL  : 이전 기본값 (rollback journal, 쓰기 커밋 동안 읽기가 막힘)
+  - wal/NORMAL   : database.py 기본값 (SQLITE_JOURNAL_MODE=WAL, SQLITE_SYNCHRONOUS=NORMAL)
+
+모드마다 새 DB와 새 프로세스에서 실행합니다 (PRAGMA는 database.py를 불러올 때 환경 변수로 정해짐).
+
+사용법:
+    python benchmarks/bench_db_mix.py [--writers 4] [--readers 4] [--seconds 5] [--events 100000]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from _common import quiet, temp_database_url
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+MODES = [("delete", "FULL"), ("wal", "NORMAL")]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def reader(meeting_id, seconds, start, results):
+    """읽기 프로세스: seconds 동안 타임라인 첫 페이지 반복 조회"""
+    with quiet():
+        import server
+        from database import SessionLocal
+
+    query = server._timeline_query(meeting_id).limit(200)
+    reads, errors = [], 0
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started_at = time.perf_counter()
+        session = SessionLocal()
+        try:
+            session.execute(query).scalars().all()
+            reads.append((time.perf_counter() - started_at) * 1000)
+        except Exception:
+            errors += 1
+        finally:
+            session.close()
+    results.put((reads, errors))
+
+
+def child(args):
+    """한 가지 모드 실행 (자식 프로세스), 결과를 JSON 한 줄로 출력"""
+    with quiet():
+        from sqlalchemy import text
+        from database import AsyncSessionLocal, SessionLocal, Meeting, MeetingEvent, engine, init_db
+
+    init_db()
+    db = SessionLocal()
+    started = datetime(2024, 1, 1)
+    meeting = Meeting(room_id="bench-room", started_at=started)
+    db.add(meeting)
+    db.flush()
+    meeting_id = meeting.id
+    db.bulk_insert_mappings(MeetingEvent, [
+        {"meeting_id": meeting_id, "username": f"user{i % 20}", "event_type": "chat",
+         "message": f"메시지 {i}", "timestamp": started + timedelta(milliseconds=i)}
+        for i in range(args.events)
+    ])
+    db.commit()
+    db.close()
+    with engine.connect() as connection:
+        journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+
+    context = multiprocessing.get_context("spawn")
+    start, results = context.Event(), context.Queue()
+    readers = [context.Process(target=reader, args=(meeting_id, args.seconds, start, results))
+               for _ in range(args.readers)]
+    for process in readers:
+        process.start()
+    time.sleep(2.0)  # 읽기 프로세스가 server를 불러올 때까지 대기
+
+    writes, write_errors = [], []
+    deadline = 0.0
+
+    async def writer(index):
+        i = 0
+        while time.perf_counter() < deadline:
+            started_at = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as session:
+                    session.add(MeetingEvent(meeting_id=meeting_id, username=f"writer{index}", event_type="chat",
+                                             message=f"새 메시지 {i}", timestamp=datetime.utcnow()))
+                    await session.commit()
+                writes.append((time.perf_counter() - started_at) * 1000)
+            except Exception as e:
+                write_errors.append(str(e))
+            i += 1
+
+    async def run():
+        nonlocal deadline
+        start.set()
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(*(writer(i) for i in range(args.writers)))
+
+    asyncio.run(run())
+    reads, read_errors = [], 0
+    for _ in readers:
+        latencies, errors = results.get()
+        reads.extend(latencies)
+        read_errors += errors
+    for process in readers:
+        process.join()
+    print(json.dumps({
+        "journal_mode": journal_mode,
+        "writes_per_sec": len(writes) / args.seconds,
+        "write_p50": percentile(writes, 50),
+        "write_p99": percentile(writes, 99),
+        "write_errors": len(write_errors),
+        "reads_per_sec": len(reads) / args.seconds,
+        "read_p50": percentile(reads, 50),
+        "read_p99": percentile(reads, 99),
+        "read_errors": read_errors,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=4, help="동시에 커밋하는 비동기 쓰기 작업 수")
+    parser.add_argument("--readers", type=int, default=4, help="타임라인을 읽는 프로세스 수")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--events", type=int, default=100000, help="미리 채울 이벤트 수")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print("=" * 60)
+    print("SQLite 동시 읽기/쓰기 혼합")
+    print(f"쓰기 작업: {args.writers}, 읽기 프로세스: {args.readers}, 시간: {args.seconds}s, 이벤트: {args.events}")
+    print("=" * 60)
+    for journal_mode, synchronous in MODES:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = temp_database_url()
+        env["SQLITE_JOURNAL_MODE"] = journal_mode
+        env["SQLITE_SYNCHRONOUS"] = synchronous
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", "--writers", str(args.writers), "--readers", str(args.readers),
+             "--seconds", str(args.seconds), "--events", str(args.events)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        label = f"{result['journal_mode']}/{synchronous}"
+        print(f"[{label:<12}] 쓰기 {result['writes_per_sec']:7.0f}/s  p50={result['write_p50']:7.2f}ms  "
+              f"p99={result['write_p99']:8.2f}ms  오류 {result['write_errors']}")
+        print(f"{'':14} 읽기 {result['reads_per_sec']:7.0f}/s  p50={result['read_p50']:7.2f}ms  "
+              f"p99={result['read_p99']:8.2f}ms  오류 {result['read_errors']}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
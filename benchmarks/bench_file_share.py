@@ -0,0 +1,104 @@
+"""
+파일 공유 업로드/다운로드 메모리 벤치마크
+
+uvicorn을 같은 프로세스에서 띄우고 파일을 청크 업로드한 뒤 다시 내려받으면서
+처리량과 최대 메모리 증가량(tracemalloc)을 측정합니다. 파일 크기를 키워도 메모리가 늘지 않아야 합니다.
+
+사용법:
+    python benchmarks/bench_file_share.py [--sizes 16,64,256] [--chunk-mb 8]
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+
+from _common import quiet
+
+with quiet():
+    import httpx
+    import uvicorn
+    import server
+    from room_store import Connection
+
+PORT = 8799
+PIECE = 64 * 1024
+
+
+async def body(size):
+    """size바이트를 64KB씩 만들어 보내는 요청 본문 (클라이언트도 전체를 메모리에 두지 않음)"""
+    piece = os.urandom(PIECE)
+    sent = 0
+    while sent < size:
+        n = min(PIECE, size - sent)
+        yield piece[:n]
+        sent += n
+
+
+async def run(client, sid, size, chunk):
+    response = await client.post("/api/rooms/bench-room/files", params={"sid": sid},
+                                 json={"filename": "bench.bin", "size": size})
+    file_id = response.json()["file_id"]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    offset = 0
+    while offset < size:
+        end = min(size, offset + chunk)
+        response = await client.put(f"/api/files/{file_id}/content", params={"sid": sid},
+                                    headers={"Content-Range": f"bytes {offset}-{end - 1}/{size}"},
+                                    content=body(end - offset))
+        offset = response.json()["offset"]
+    upload_seconds = time.perf_counter() - started
+    _, upload_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    started = time.perf_counter()
+    received = 0
+    async with client.stream("GET", f"/api/files/{file_id}", params={"sid": sid}) as response:
+        async for data in response.aiter_raw():
+            received += len(data)
+    download_seconds = time.perf_counter() - started
+    _, download_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert received == size, "받은 크기가 다름"
+
+    await client.delete(f"/api/files/{file_id}", params={"sid": sid})
+    mb = size / 1024 / 1024
+    return (f"[{mb:5.0f}MB] 업로드 {mb / upload_seconds:7.1f}MB/s 최대 메모리 +{upload_peak / 1024 / 1024:6.2f}MB  "
+            f"다운로드 {mb / download_seconds:7.1f}MB/s 최대 메모리 +{download_peak / 1024 / 1024:6.2f}MB")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="16,64,256", help="파일 크기 목록 (MB)")
+    parser.add_argument("--chunk-mb", type=int, default=8)
+    args = parser.parse_args()
+    chunk = args.chunk_mb * 1024 * 1024
+    server.file_share.chunk_bytes = chunk
+
+    config = uvicorn.Config(server.socket_app, host="127.0.0.1", port=PORT, log_level="warning")
+    uv = uvicorn.Server(config)
+    serve_task = asyncio.create_task(uv.serve())
+    while not uv.started:
+        await asyncio.sleep(0.05)
+
+    sid = "bench-sid"
+    await server.store.set_user(Connection(sid, "bench", room_id="bench-room"))
+
+    print("=" * 60)
+    print("파일 공유 업로드/다운로드")
+    print(f"청크: {args.chunk_mb}MB, 저장 위치: {server.UPLOAD_DIR.resolve()}")
+    print("=" * 60)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=120) as client:
+            for size_mb in args.sizes.split(","):
+                print(await run(client, sid, int(size_mb) * 1024 * 1024, chunk))
+    finally:
+        uv.should_exit = True
+        await serve_task
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
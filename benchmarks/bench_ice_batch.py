@@ -0,0 +1,112 @@
+"""
+ICE candidate 묶음 전송 벤치마크
+
+여러 회의실에서 동시에 N인 메시(mesh) 연결을 맺을 때 각 연결 방향마다 candidate가
+짧은 시간 안에 몰려 들어오는 상황을 재현하고, 통화 연결 한 건당 emit 수를 비교합니다.
+
+  - single : 기존 방식 (candidate마다 ice-candidate emit 한 번)
+  - batch  : ice_batch를 지원하는 클라이언트 (쌍별로 ICE_BATCH_WINDOW_MS 동안 모아 ice-candidates 한 번)
+
+사용법:
+    ICE_BATCH_WINDOW_MS=20 python benchmarks/bench_ice_batch.py [--rooms 20] [--peers 4] [--candidates 12]
+"""
+import argparse
+import asyncio
+import random
+import time
+from itertools import permutations
+
+from _common import quiet
+
+with quiet():
+    import metrics
+    import server
+    from room_store import Connection
+
+
+def emit_count(event_name):
+    return metrics.SIO_EMIT_RECIPIENTS.labels(event_name).count
+
+
+async def send_candidates(from_sid, to_sid, count, spread, rng):
+    """한 연결 방향의 candidate 폭주 (spread초 안에 무작위 간격으로 도착)"""
+    offsets = sorted(rng.uniform(0, spread) for _ in range(count))
+    started = time.perf_counter()
+    for i, offset in enumerate(offsets):
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await server.ice_candidate(from_sid, {
+            "target": to_sid,
+            "candidate": {"candidate": f"candidate:{i} 1 udp 2122260223 10.0.0.1 {50000 + i} typ host",
+                          "sdpMid": "0", "sdpMLineIndex": 0, "t": time.perf_counter()}
+        })
+
+
+async def run(mode, rooms, peers, candidates, spread):
+    rng = random.Random(42)
+    sids = [[f"{mode}-r{r}-p{p}" for p in range(peers)] for r in range(rooms)]
+    # 릴레이 검증을 통과하도록 같은 방 참가자로 등록
+    for r, room in enumerate(sids):
+        for sid in room:
+            await server.store.set_user(Connection(sid, sid, room_id=f"{mode}-room-{r}"))
+    server.ice_batch_sids.clear()
+    if mode == "batch":
+        server.ice_batch_sids.update(sid for room in sids for sid in room)
+
+    delays = []
+    original_send = server.ice_batcher.send
+
+    async def timed_send(from_sid, to_sid, batch):
+        now = time.perf_counter()
+        delays.extend(now - candidate["t"] for candidate in batch)
+        await original_send(from_sid, to_sid, batch)
+
+    server.ice_batcher.send = timed_send
+    before = emit_count("ice-candidate") + emit_count("ice-candidates")
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            send_candidates(a, b, candidates, spread, rng)
+            for room in sids for a, b in permutations(room, 2)
+        ))
+        await server.ice_batcher.flush_all()
+        # 마지막 묶음 타이머가 끝날 때까지 대기
+        await asyncio.sleep(server.ice_batcher.window * 2)
+    finally:
+        server.ice_batcher.send = original_send
+    elapsed = time.perf_counter() - started
+    emits = emit_count("ice-candidate") + emit_count("ice-candidates") - before
+
+    calls = rooms * peers * (peers - 1) // 2
+    max_delay = max(delays) * 1000 if delays else 0.0
+    print(f"[{mode:<6}] {elapsed:5.2f}s  emit={emits:>6}  연결당 emit={emits / calls:6.1f}  "
+          f"추가 지연 최대={max_delay:6.1f}ms")
+    return emits
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--peers", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=12)
+    parser.add_argument("--spread-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    metrics.instrument_socketio(server.sio)
+    spread = args.spread_ms / 1000
+
+    print("=" * 60)
+    print("ICE candidate 묶음 전송")
+    print(f"회의실: {args.rooms}, 인원: {args.peers}, 방향당 candidate: {args.candidates}, "
+          f"도착 구간: {args.spread_ms}ms, 묶음 창: {server.ice_batcher.window * 1000:.0f}ms")
+    print("=" * 60)
+    single = await run("single", args.rooms, args.peers, args.candidates, spread)
+    batch = await run("batch", args.rooms, args.peers, args.candidates, spread)
+    print("=" * 60)
+    if batch:
+        print(f"emit 감소: {single / batch:.1f}배")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+동시 회의실 참가(join_room) 중 시그널링 지연 시간 벤치마크
+
+여러 클라이언트가 동시에 join_room을 호출하는 동안 다른 연결의 offer 릴레이가
+얼마나 지연되는지 측정합니다.
+
+  - async    : 현재 server.py 핸들러 (AsyncSession, 이벤트 루프 비블로킹)
+  - blocking : 이전 방식 재현 (이벤트 루프에서 동기 SessionLocal 커밋)
+
+사용법:
+    python benchmarks/bench_join_latency.py [--joins 500] [--rooms 50]
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime
+
+from _common import quiet
+
+with quiet():
+    import server
+    from room_store import Connection
+    from database import SessionLocal, Meeting, MeetingParticipant, MeetingEvent
+
+
+def legacy_join(sid, data):
+    """이전 join_room의 DB 처리 (동기 세션, 이벤트 루프 블로킹)"""
+    db = SessionLocal()
+    try:
+        room_id = data["room_id"]
+        meeting = db.query(Meeting).filter(Meeting.room_id == room_id).order_by(Meeting.started_at.desc()).first()
+        if not meeting:
+            meeting = Meeting(room_id=room_id, started_at=datetime.utcnow(), is_active=True)
+            db.add(meeting)
+            db.commit()
+            db.refresh(meeting)
+        db.add(MeetingParticipant(meeting_id=meeting.id, username=data["username"], joined_at=datetime.utcnow()))
+        db.add(MeetingEvent(meeting_id=meeting.id, event_type="user_join", username=data["username"]))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def blocking_join(sid, data):
+    legacy_join(sid, data)
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(mode, joins, rooms, prefix):
+    join_handler = server.join_room if mode == "async" else blocking_join
+    probe_sid = await server.sio.manager.connect(f"{prefix}-probe", "/")
+    target_sid = await server.sio.manager.connect(f"{prefix}-target", "/")
+    # 릴레이 검증을 통과하도록 서로 매칭된 직접 연결로 등록
+    await server.store.set_user(Connection(probe_sid, "probe", peer_sid=target_sid))
+    await server.store.set_user(Connection(target_sid, "target", peer_sid=probe_sid))
+    sids = [await server.sio.manager.connect(f"{prefix}-{i}", "/") for i in range(joins)]
+
+    latencies = []
+    done = asyncio.Event()
+
+    async def probe():
+        # 5ms 간격으로 offer를 릴레이하고, 예정 시각부터 처리 완료까지의 시간을 기록
+        interval = 0.005
+        next_at = time.perf_counter()
+        while not done.is_set():
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            await server.offer(probe_sid, {"target": target_sid, "offer": {"type": "offer", "sdp": "v=0"}})
+            latencies.append((time.perf_counter() - next_at) * 1000)
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        join_handler(sid, {"room_id": f"{prefix}-room-{i % rooms}", "username": f"user{i}"})
+        for i, sid in enumerate(sids)
+    ])
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+
+    return {
+        "joins_per_sec": joins / elapsed,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+        "samples": len(latencies),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--joins", type=int, default=500)
+    parser.add_argument("--rooms", type=int, default=50)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("join_room 동시 참가 중 시그널링 지연 시간")
+    print(f"참가 수: {args.joins}, 방 수: {args.rooms}, DB: {os.environ['DATABASE_URL']}")
+    print("=" * 60)
+    for mode in ("blocking", "async"):
+        with quiet():
+            result = await run(mode, args.joins, args.rooms, mode)
+        print(f"[{mode:8}] joins/s={result['joins_per_sec']:8.1f}  "
+              f"offer p50={result['p50']:7.2f}ms  p99={result['p99']:7.2f}ms  "
+              f"max={result['max']:7.2f}ms  (samples={result['samples']})")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+로그인 폭주 중 시그널링 지연 시간 벤치마크
+
+여러 로그인 요청이 동시에 들어오는 동안 offer 릴레이의 p99 지연 시간을 측정합니다.
+
+  - inline : 이전 방식 (이벤트 루프에서 bcrypt.checkpw 직접 실행)
+  - pool   : 현재 방식 (전용 워커 풀에서 실행, 대기열 초과 시 즉시 503)
+
+사용법:
+    BCRYPT_ROUNDS=12 python benchmarks/bench_login_burst.py [--logins 32]
+"""
+import argparse
+import asyncio
+import time
+
+from _common import quiet
+
+with quiet():
+    import server
+    from room_store import Connection
+    from auth import (
+        BCRYPT_ROUNDS, PasswordHasherBusy, authenticate_user, authenticate_user_async,
+        create_user, get_user_by_username, password_hasher
+    )
+    from database import SessionLocal
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def run(mode, logins):
+    probe_sid = await server.sio.manager.connect(f"{mode}-probe", "/")
+    target_sid = await server.sio.manager.connect(f"{mode}-target", "/")
+    # 릴레이 검증을 통과하도록 서로 매칭된 직접 연결로 등록
+    await server.store.set_user(Connection(probe_sid, "probe", peer_sid=target_sid))
+    await server.store.set_user(Connection(target_sid, "target", peer_sid=probe_sid))
+    latencies, outcomes = [], {"ok": 0, "busy": 0}
+    done = asyncio.Event()
+
+    async def probe():
+        interval = 0.005
+        next_at = time.perf_counter()
+        while not done.is_set():
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            await server.offer(probe_sid, {"target": target_sid, "offer": {"type": "offer", "sdp": "v=0"}})
+            latencies.append((time.perf_counter() - next_at) * 1000)
+
+    async def login():
+        db = SessionLocal()
+        try:
+            if mode == "inline":
+                authenticate_user(db, "bench", "bench-password")
+            else:
+                await authenticate_user_async(db, "bench", "bench-password")
+            outcomes["ok"] += 1
+        except PasswordHasherBusy:
+            outcomes["busy"] += 1
+        finally:
+            db.close()
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await asyncio.gather(*[login() for _ in range(logins)])
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+    return elapsed, latencies, outcomes
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    if not get_user_by_username(db, "bench"):
+        create_user(db, "bench", "bench@example.com", "bench-password")
+    db.close()
+
+    print("=" * 60)
+    print("로그인 폭주 중 시그널링 지연 시간")
+    print(f"동시 로그인: {args.logins}, BCRYPT_ROUNDS={BCRYPT_ROUNDS}, "
+          f"워커={password_hasher.workers}, 대기열={password_hasher.max_queue}")
+    print("=" * 60)
+    for mode in ("inline", "pool"):
+        with quiet():
+            elapsed, latencies, outcomes = await run(mode, args.logins)
+        print(f"[{mode:6}] {elapsed:6.2f}s  성공={outcomes['ok']} 거절(503)={outcomes['busy']}  "
+              f"offer p50={percentile(latencies, 50):7.2f}ms  p99={percentile(latencies, 99):8.2f}ms  "
+              f"(samples={len(latencies)})")
+    password_hasher.shutdown()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
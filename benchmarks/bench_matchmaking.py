@@ -0,0 +1,136 @@
+"""
+직접 연결 매칭(start_connection) 부하 테스트
+
+대상 사용자를 기다리는(아직 접속하지 않은 사용자를 지정한) 대기자 수천 명이 쌓여 있는 상태에서
+자동 매칭 요청이 몰릴 때의 처리 시간을 비교하고, 매칭 결과의 정합성을 검사합니다.
+
+  - legacy : 이전 server.py 방식 (username 키 딕셔너리 + 선형 탐색)
+  - engine : Matchmaker (FIFO 큐 + 대상별 인덱스)
+  - store  : RoomStore.match_or_wait를 수천 개의 코루틴에서 동시에 호출 (--redis 시 fakeredis 사용)
+
+사용법:
+    python benchmarks/bench_matchmaking.py [--waiters 5000] [--arrivals 20000] [--redis]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import _common  # noqa: F401  (저장소 루트를 sys.path에 추가)
+
+from matchmaking import Matchmaker
+from room_store import MemoryRoomStore, RedisRoomStore
+
+
+def workload(waiters, arrivals):
+    """(sid, username, target_username) 요청 목록"""
+    requests = [(f"t{i}", f"fan{i}", f"absent{i}") for i in range(waiters)]
+    rng = random.Random(7)
+    for i in range(arrivals):
+        # 같은 이름이 여러 번 등장하도록 이름 공간을 작게 잡음
+        requests.append((f"a{i}", f"guest{rng.randrange(arrivals // 4)}", None))
+    return requests
+
+
+def run_legacy(requests):
+    waiting_users = {}
+    matches = []
+    started = time.perf_counter()
+    for sid, username, target in requests:
+        if target:
+            target_user = waiting_users.get(target)
+            if target_user and target_user["sid"] != sid:
+                del waiting_users[target]
+                matches.append((sid, target_user["sid"]))
+            else:
+                waiting_users[username] = {"sid": sid, "username": username, "target_username": target}
+            continue
+        matched = None
+        for waiting_user in waiting_users.values():
+            if waiting_user["sid"] != sid and waiting_user["target_username"] in (None, username):
+                matched = waiting_user
+                break
+        if matched:
+            del waiting_users[matched["username"]]
+            matches.append((sid, matched["sid"]))
+        else:
+            waiting_users[username] = {"sid": sid, "username": username, "target_username": None}
+    return time.perf_counter() - started, matches, len(waiting_users)
+
+
+def run_engine(requests):
+    engine = Matchmaker()
+    matches = []
+    started = time.perf_counter()
+    for sid, username, target in requests:
+        matched = engine.match_or_wait(sid, username, target)
+        if matched:
+            matches.append((sid, matched.sid))
+    return time.perf_counter() - started, matches, len(engine)
+
+
+async def run_store(store, requests, concurrency):
+    matches = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(sid, username, target):
+        async with semaphore:
+            matched = await store.match_or_wait(sid, username, target)
+            if matched:
+                matches.append((sid, matched.sid))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[request(*req) for req in requests])
+    return time.perf_counter() - started, matches, await store.count_waiting()
+
+
+def check(name, requests, matches, waiting):
+    """모든 sid는 최대 한 번만 매칭되고, 매칭 + 대기 = 전체 요청 수여야 함"""
+    seen = [sid for pair in matches for sid in pair]
+    assert len(seen) == len(set(seen)), f"{name}: 중복 매칭 발생"
+    assert len(seen) + waiting == len(requests), f"{name}: 사라진 대기자 있음 ({len(seen)} + {waiting})"
+
+
+def check_fifo():
+    """가장 오래 기다린 대기자부터 매칭 (같은 이름의 대기자도 덮어쓰지 않음)"""
+    engine = Matchmaker()
+    for i in range(3):
+        engine.match_or_wait(f"w{i}", "alice", "bob")
+    assert len(engine) == 3
+    order = [engine.match_or_wait(f"b{i}", "bob").sid for i in range(3)]
+    assert order == ["w0", "w1", "w2"], order
+    engine.match_or_wait("x", "alice", "bob")
+    assert engine.cancel("x") and len(engine) == 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--waiters", type=int, default=5000)
+    parser.add_argument("--arrivals", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--redis", action="store_true", help="fakeredis로 RedisRoomStore도 측정")
+    args = parser.parse_args()
+    requests = workload(args.waiters, args.arrivals)
+
+    print("=" * 60)
+    print("직접 연결 매칭 부하 테스트")
+    print(f"대상 지정 대기자: {args.waiters}, 자동 매칭 요청: {args.arrivals}")
+    print("=" * 60)
+    check_fifo()
+    results = [("legacy", run_legacy(requests)), ("engine", run_engine(requests))]
+    results.append(("store", asyncio.run(run_store(MemoryRoomStore(), requests, args.concurrency))))
+    if args.redis:
+        import fakeredis
+        store = RedisRoomStore(fakeredis.aioredis.FakeRedis(decode_responses=True))
+        # 연결 풀 크기 제한 때문에 동시 요청 수를 줄여서 측정
+        results.append(("redis", asyncio.run(run_store(store, requests, min(args.concurrency, 50)))))
+    for name, (elapsed, matches, waiting) in results:
+        if name != "legacy":
+            check(name, requests, matches, waiting)
+        print(f"[{name:6}] {elapsed * 1000:9.1f}ms  요청당 {elapsed / len(requests) * 1e6:8.2f}us  "
+              f"매칭 {len(matches)}쌍, 남은 대기자 {waiting}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+접속자/회의실 상태 구조 마이크로 벤치마크
+
+1,000개 방에 10,000개의 가상 sid를 참가시킨 뒤(각 참가마다 existing-users 목록 생성)
+모두 나가게 하면서 다음 두 구현을 비교합니다.
+
+  - legacy : 이전 server.py 방식 (방별 sid list + users[sid] 딕셔너리)
+  - store  : MemoryRoomStore (방별 {sid: username} 인덱스 + __slots__ Connection)
+
+사용법:
+    python benchmarks/bench_presence.py [--sids 10000] [--rooms 1000]
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+import _common  # noqa: F401  (저장소 루트를 sys.path에 추가)
+
+from room_store import Connection, MemoryRoomStore
+
+
+def leave_order(sids):
+    """나가는 순서는 참가 순서와 무관하게 섞음 (고정 시드)"""
+    order = list(sids)
+    random.Random(42).shuffle(order)
+    return order
+
+
+def run_legacy(sids, rooms):
+    """이전 구현: list 기반 O(n) 포함 검사/제거"""
+    room_map, users = {}, {}
+    started = time.perf_counter()
+    for i, sid in enumerate(sids):
+        room_id = f"room-{i % rooms}"
+        room = room_map.setdefault(room_id, {"id": room_id, "users": [], "db_id": i})
+        users[sid] = {
+            "sid": sid,
+            "username": f"user{i}",
+            "room_id": room_id,
+            "user_id": None,
+            "joined_at": datetime.now().isoformat()
+        }
+        if sid not in room["users"]:
+            room["users"].append(sid)
+        [{"sid": uid, "username": users[uid].get("username")}
+         for uid in room["users"] if uid != sid and uid in users]
+    joined = time.perf_counter()
+    for sid in leave_order(sids):
+        room = room_map[users[sid]["room_id"]]
+        if sid in room["users"]:
+            room["users"].remove(sid)
+        del users[sid]
+    return joined - started, time.perf_counter() - joined
+
+
+async def run_store(sids, rooms):
+    """MemoryRoomStore: O(1) 참가/나감/조회"""
+    store = MemoryRoomStore()
+    started = time.perf_counter()
+    for i, sid in enumerate(sids):
+        room_id = f"room-{i % rooms}"
+        await store.ensure_room(room_id, i)
+        username = f"user{i}"
+        await store.set_user(Connection(sid, username, room_id=room_id))
+        await store.get_members(room_id, exclude_sid=sid)
+        await store.add_member(room_id, sid, username)
+    joined = time.perf_counter()
+    for sid in leave_order(sids):
+        user = await store.get_user(sid)
+        await store.remove_member(user.room_id, sid)
+        await store.remove_user(sid)
+    return joined - started, time.perf_counter() - joined
+
+
+def record_size(factory, count):
+    """접속 정보 레코드 1개당 평균 메모리 (바이트)"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    records = [factory(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del records
+    return total / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sids", type=int, default=10000)
+    parser.add_argument("--rooms", type=int, default=1000)
+    args = parser.parse_args()
+    sids = [f"sid-{i:08d}" for i in range(args.sids)]
+    # 10,000명이 1,000개 방에 고르게 분산되면 방당 10명 - 큰 방의 차이도 보기 위해 방 10개 경우도 측정
+    scenarios = [(args.sids, args.rooms), (args.sids, max(1, args.rooms // 100))]
+
+    print("=" * 60)
+    print("접속자/회의실 상태 구조 마이크로 벤치마크")
+    print("=" * 60)
+    for count, rooms in scenarios:
+        print(f"\nsid {count}개 / 방 {rooms}개 (방당 {count // rooms}명)")
+        legacy_join, legacy_leave = run_legacy(sids[:count], rooms)
+        store_join, store_leave = asyncio.run(run_store(sids[:count], rooms))
+        print(f"   legacy : 참가 {legacy_join * 1000:8.1f}ms  나감 {legacy_leave * 1000:8.1f}ms")
+        print(f"   store  : 참가 {store_join * 1000:8.1f}ms  나감 {store_leave * 1000:8.1f}ms")
+
+    dict_size = record_size(lambda i: {
+        "sid": f"sid-{i:08d}", "username": f"user{i}", "room_id": "room", "user_id": None,
+        "joined_at": datetime.now().isoformat(), "target_username": None
+    }, 10000)
+    slot_size = record_size(lambda i: Connection(f"sid-{i:08d}", f"user{i}", room_id="room"), 10000)
+    print(f"\n접속 레코드당 메모리: dict {dict_size:.0f}B, Connection {slot_size:.0f}B")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
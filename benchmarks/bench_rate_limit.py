@@ -0,0 +1,106 @@
+"""
+이벤트 폭주 클라이언트 속도 제한 벤치마크
+
+한 클라이언트가 message를 쉬지 않고 보내는 동안 다른 회의실 클라이언트의 채팅 처리 지연과
+폭주 클라이언트가 만들어낸 fan-out emit/저널 기록 수를 비교합니다.
+
+  - unlimited : 속도 제한 없음 (기존 방식)
+  - limited   : RateLimiter 기본 한도 (RATE_LIMITS 환경 변수로 조정 가능)
+
+사용법:
+    python benchmarks/bench_rate_limit.py [--seconds 2] [--listeners 20]
+"""
+import argparse
+import asyncio
+import time
+
+from _common import quiet
+
+with quiet():
+    import server
+    from ratelimit import RATE_LIMITS, RateLimiter
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def join(sid, room_id):
+    await server.sio.manager.connect(sid, "/")
+    await server.join_room(sid, {"room_id": room_id, "username": sid})
+
+
+async def run(mode, seconds, listeners):
+    limiter = RateLimiter(RATE_LIMITS if mode == "limited" else {})
+    handler = server.message
+    if "message" in limiter.limits:
+        handler = limiter.wrap(server.sio, "message", server.message)
+
+    noisy = f"{mode}-noisy"
+    probe = f"{mode}-probe"
+    await join(noisy, f"{mode}-noisy-room")
+    for i in range(listeners):
+        await join(f"{mode}-listener-{i}", f"{mode}-noisy-room")
+    await join(probe, f"{mode}-quiet-room")
+    await server.journal.flush()
+
+    committed_before = server.journal.committed_ops
+    done = asyncio.Event()
+    latencies = []
+    sent = 0
+
+    async def flood():
+        nonlocal sent
+        while not done.is_set():
+            await handler(noisy, {"message": "spam" * 10})
+            sent += 1
+            await asyncio.sleep(0)
+
+    async def probe_loop():
+        # 5ms 간격으로 채팅을 보내고, 예정 시각부터 처리 완료까지의 시간을 기록
+        interval = 0.005
+        next_at = time.perf_counter()
+        while not done.is_set():
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            # 측정용 클라이언트는 한도 아래로 보낸다고 보고 제한 없이 호출
+            await server.message(probe, {"message": "hello"})
+            latencies.append((time.perf_counter() - next_at) * 1000)
+
+    tasks = [asyncio.create_task(flood()), asyncio.create_task(probe_loop())]
+    await asyncio.sleep(seconds)
+    done.set()
+    await asyncio.gather(*tasks)
+    await server.journal.flush()
+    journal_ops = server.journal.committed_ops - committed_before - len(latencies)
+
+    return (f"[{mode:9}] 폭주 전송={sent:>7}  저널 기록={journal_ops:>6}  fan-out 전송={journal_ops * (listeners + 1):>7}  "
+            f"채팅 p50={percentile(latencies, 50):6.2f}ms  p99={percentile(latencies, 99):6.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--listeners", type=int, default=20)
+    args = parser.parse_args()
+
+    limit = RATE_LIMITS.get("message")
+    print("=" * 60)
+    print("이벤트 폭주 클라이언트 속도 제한")
+    print(f"시간: {args.seconds}s, 폭주 방 인원: {args.listeners + 1}, message 한도: {limit}")
+    print("=" * 60)
+    await server.journal.start()
+    try:
+        for mode in ("unlimited", "limited"):
+            with quiet():
+                line = await run(mode, args.seconds, args.listeners)
+            print(line)
+    finally:
+        await server.journal.stop()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
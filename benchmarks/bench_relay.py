@@ -0,0 +1,98 @@
+"""
+시그널링 릴레이 인코딩 비용 벤치마크
+
+offer 패킷 하나를 받아 상대에게 전달할 때의 JSON 디코딩 + 인코딩 시간을 비교합니다.
+
+  - legacy : 기존 방식 (json.loads로 전부 디코딩한 뒤 offer dict를 json.dumps로 다시 인코딩)
+  - relay  : RelayJSON (검증 후 받은 offer JSON 텍스트를 그대로 이어 붙여 전송)
+
+사용법:
+    python benchmarks/bench_relay.py [--messages 20000] [--sdp-lines 120]
+"""
+import argparse
+import json
+import time
+
+import _common  # noqa: F401  (저장소 루트를 sys.path에 추가)
+
+from relay import RelayJSON, check_candidate, check_description
+
+SEPARATORS = (",", ":")
+
+
+def make_sdp(lines):
+    """브라우저 offer와 비슷한 SDP (오디오/비디오 코덱, ICE, DTLS 줄)"""
+    body = ["v=0", "o=- 4611731400430051336 2 IN IP4 127.0.0.1", "s=-", "t=0 0", "a=group:BUNDLE 0 1"]
+    for i in range(lines):
+        body.append(f"a=rtpmap:{96 + i % 30} VP8/90000")
+        body.append(f"a=rtcp-fb:{96 + i % 30} nack pli")
+        body.append(f"a=fmtp:{96 + i % 30} level-asymmetry-allowed=1;packetization-mode=1;profile-level-id=42e01f")
+    return "\r\n".join(body) + "\r\n"
+
+
+def legacy_relay(packet, sid):
+    event_name, data = json.loads(packet)
+    return json.dumps([event_name, {"offer": data["offer"], "from": sid}], separators=SEPARATORS)
+
+
+def relay_relay(packet, sid):
+    event_name, data = RelayJSON.loads(packet)
+    offer, reason = check_description("offer", data)
+    if reason is not None:
+        return None
+    return RelayJSON.dumps([event_name, {"offer": offer, "from": sid}], separators=SEPARATORS)
+
+
+def legacy_candidate(packet, sid):
+    event_name, data = json.loads(packet)
+    return json.dumps(["ice-candidate", {"candidate": data["candidate"], "from": sid}], separators=SEPARATORS)
+
+
+def relay_candidate(packet, sid):
+    event_name, data = RelayJSON.loads(packet)
+    candidate, reason = check_candidate(data)
+    if reason is not None:
+        return None
+    return RelayJSON.dumps(["ice-candidate", {"candidate": candidate, "from": sid}], separators=SEPARATORS)
+
+
+def measure(label, func, packet, messages):
+    sid = "abcdefghijklmnopqrst"
+    output = func(packet, sid)
+    started = time.perf_counter()
+    for _ in range(messages):
+        func(packet, sid)
+    elapsed = time.perf_counter() - started
+    print(f"[{label:<17}] {elapsed:6.2f}s  메시지당={elapsed / messages * 1e6:7.1f}us")
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--sdp-lines", type=int, default=120)
+    args = parser.parse_args()
+
+    offer = {"type": "offer", "sdp": make_sdp(args.sdp_lines)}
+    offer_packet = json.dumps(["offer", {"target": "zyxwvutsrqponmlkjihg", "offer": offer}], separators=SEPARATORS)
+    candidate = {"candidate": "candidate:842163049 1 udp 1677729535 203.0.113.7 46154 typ srflx raddr 0.0.0.0 "
+                              "rport 0 generation 0 ufrag EEtu network-cost 999",
+                 "sdpMid": "0", "sdpMLineIndex": 0}
+    candidate_packet = json.dumps(["ice_candidate", {"target": "zyxwvutsrqponmlkjihg", "candidate": candidate}],
+                                  separators=SEPARATORS)
+
+    print("=" * 60)
+    print("시그널링 릴레이 인코딩 비용")
+    print(f"메시지 수: {args.messages}, offer 패킷: {len(offer_packet)}B, candidate 패킷: {len(candidate_packet)}B")
+    print("=" * 60)
+    legacy_out = measure("legacy offer", legacy_relay, offer_packet, args.messages)
+    relay_out = measure("relay offer", relay_relay, offer_packet, args.messages)
+    assert json.loads(legacy_out) == json.loads(relay_out), "전달 결과가 다름"
+    legacy_out = measure("legacy candidate", legacy_candidate, candidate_packet, args.messages)
+    relay_out = measure("relay candidate", relay_candidate, candidate_packet, args.messages)
+    assert json.loads(legacy_out) == json.loads(relay_out), "전달 결과가 다름"
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+REST API 지연 시간 / SQL 쿼리 수 회귀 점검
+
+database.py 모델로 SQLite DB에 사용자, 회의, 참가자, 이벤트(기본 100만 개)를 채운 뒤
+주요 엔드포인트를 같은 프로세스에서(httpx ASGITransport) 호출하며 요청당 지연 시간과 SQL 문 수를 기록합니다.
+benchmarks/rest_budgets.json의 예산(요청당 쿼리 수, p99 ms)을 넘으면 종료 코드 1로 실패합니다.
+
+  - 쿼리 수는 캐시가 채워진 뒤(워밍업 이후) 요청 중 최댓값
+  - 같은 시드로 데이터를 만들므로 실행할 때마다 같은 DB가 만들어짐 (--db로 채운 DB를 재사용 가능)
+
+사용법:
+    python benchmarks/bench_rest_api.py [--events 1000000] [--requests 200]
+    python benchmarks/bench_rest_api.py --db /tmp/rest-bench.db        # 처음 한 번만 채움
+    python benchmarks/bench_rest_api.py --write-budgets                  # 현재 결과로 예산 파일 갱신
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BUDGETS = Path(__file__).resolve().parent / "rest_budgets.json"
+
+
+def _db_path():
+    """--db 인자는 server를 불러오기 전에 DATABASE_URL로 반영해야 함"""
+    for i, arg in enumerate(sys.argv):
+        if arg == "--db" and i + 1 < len(sys.argv):
+            return Path(sys.argv[i + 1]).resolve()
+        if arg.startswith("--db="):
+            return Path(arg.split("=", 1)[1]).resolve()
+    return None
+
+
+if _db_path() is not None:
+    os.environ["DATABASE_URL"] = f"sqlite:///{_db_path()}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from _common import quiet
+
+with quiet():
+    import httpx
+    from sqlalchemy import event, func, select
+    import server
+    from auth import create_access_token
+    from database import SessionLocal, User, Meeting, MeetingParticipant, MeetingEvent, async_engine, engine, init_db
+
+SEED = 42
+INSERT_BATCH = 50000
+EVENT_TYPES = ["chat"] * 8 + ["user_join", "user_leave"]
+
+
+class StatementCounter:
+    """동기/비동기 엔진에서 실행된 SQL 문 수"""
+
+    def __init__(self, *engines):
+        self.count = 0
+        for target in engines:
+            event.listen(target, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def seed(users, meetings, participants, events):
+    """
+    재현 가능한 데이터 생성 (이미 채워져 있으면 건너뜀)
+
+    user 1은 절반의 회의에 참가한 헤비 사용자, meeting 1은 이벤트의 10%를 가진 긴 회의
+    """
+    init_db()
+    db = SessionLocal()
+    try:
+        if db.scalar(select(func.count(User.id))):
+            return db.scalar(select(func.count(MeetingEvent.id)))
+        rng = random.Random(SEED)
+        started = datetime(2024, 1, 1)
+        db.bulk_insert_mappings(User, [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x",
+             "created_at": started}
+            for i in range(1, users + 1)
+        ])
+        db.bulk_insert_mappings(Meeting, [
+            {"id": i, "room_id": f"room-{i}", "created_by": rng.randint(1, users),
+             "started_at": started + timedelta(minutes=i * 30), "is_active": False}
+            for i in range(1, meetings + 1)
+        ])
+        rows = []
+        for meeting_id in range(1, meetings + 1):
+            members = rng.sample(range(2, users + 1), participants - 1)
+            if meeting_id % 2 == 1:
+                members.append(1)
+            for user_id in members:
+                joined_at = started + timedelta(minutes=meeting_id * 30 + rng.randint(0, 10))
+                rows.append({"meeting_id": meeting_id, "user_id": user_id, "username": f"user{user_id}",
+                             "joined_at": joined_at, "left_at": joined_at + timedelta(minutes=20),
+                             "duration_seconds": 1200})
+        db.bulk_insert_mappings(MeetingParticipant, rows)
+
+        hot_events = events // 10
+        for offset in range(0, events, INSERT_BATCH):
+            batch = []
+            for i in range(offset, min(events, offset + INSERT_BATCH)):
+                meeting_id = 1 if i < hot_events else rng.randint(2, meetings)
+                event_type = EVENT_TYPES[i % len(EVENT_TYPES)]
+                batch.append({
+                    "meeting_id": meeting_id,
+                    "user_id": rng.randint(1, users),
+                    "username": f"user{rng.randint(1, users)}",
+                    "event_type": event_type,
+                    "message": f"메시지 {i}" if event_type == "chat" else None,
+                    "timestamp": started + timedelta(minutes=meeting_id * 30, milliseconds=i),
+                })
+            db.bulk_insert_mappings(MeetingEvent, batch)
+        db.commit()
+        return events
+    finally:
+        db.close()
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def scenarios():
+    """(이름, URL) 목록 - user 1 기준"""
+    db = SessionLocal()
+    try:
+        # 긴 회의 타임라인의 중간 지점 커서 (깊은 페이지)
+        middle = db.execute(
+            server._timeline_query(1).offset(db.scalar(select(func.count(MeetingEvent.id))
+                                                      .where(MeetingEvent.meeting_id == 1)) // 2).limit(1)
+        ).scalars().first()
+    finally:
+        db.close()
+    deep_cursor = server._encode_cursor(middle.timestamp, middle.id)
+    return [
+        ("me", "/api/me"),
+        ("meetings", "/api/meetings"),
+        ("meetings_page2", None),  # 첫 페이지의 next_cursor로 채움
+        ("timeline", "/api/meetings/1/timeline"),
+        ("timeline_deep", f"/api/meetings/1/timeline?cursor={deep_cursor}"),
+        ("timeline_chat", "/api/meetings/1/timeline?event_type=chat&limit=500"),
+        ("timeline_by_room", "/api/meetings/room/room-1/timeline"),
+        ("participants", "/api/meetings/1/participants"),
+    ]
+
+
+async def measure(client, counter, url, requests, warmup):
+    for _ in range(warmup):
+        response = await client.get(url)
+        assert response.status_code == 200, f"{url}: {response.status_code} {response.text[:200]}"
+    timings, queries = [], []
+    for _ in range(requests):
+        before = counter.count
+        started = time.perf_counter()
+        response = await client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count - before)
+        assert response.status_code == 200, f"{url}: {response.status_code}"
+    return {
+        "queries": max(queries),
+        "p50_ms": percentile(timings, 50),
+        "p99_ms": percentile(timings, 99),
+        "mean_ms": statistics.mean(timings),
+    }
+
+
+def check(results, budgets):
+    """예산을 넘은 항목 목록"""
+    failures = []
+    for name, result in results.items():
+        budget = budgets.get(name)
+        if budget is None:
+            failures.append(f"{name}: 예산 없음 (--write-budgets로 추가)")
+            continue
+        if result["queries"] > budget["queries"]:
+            failures.append(f"{name}: 쿼리 {result['queries']}개 > 예산 {budget['queries']}개")
+        if result["p99_ms"] > budget["p99_ms"]:
+            failures.append(f"{name}: p99 {result['p99_ms']:.2f}ms > 예산 {budget['p99_ms']}ms")
+    return failures
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--meetings", type=int, default=2000)
+    parser.add_argument("--participants", type=int, default=8, help="회의당 참가자 수")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--db", help="채운 DB를 저장/재사용할 SQLite 파일")
+    parser.add_argument("--budgets", default=str(BUDGETS))
+    parser.add_argument("--write-budgets", action="store_true",
+                        help="현재 쿼리 수와 p99의 5배(최소 50ms)로 예산 파일 갱신 (지연 시간 예산은 인덱스 누락 같은 큰 회귀를 잡는 용도)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    events = seed(args.users, args.meetings, args.participants, args.events)
+    seed_seconds = time.perf_counter() - started
+    counter = StatementCounter(engine, async_engine.sync_engine)
+    token = create_access_token({"sub": "user1", "user_id": 1})
+
+    print("=" * 60)
+    print("REST API 지연 시간 / 쿼리 수")
+    print(f"DB: {os.environ['DATABASE_URL']} (이벤트 {events}개, 준비 {seed_seconds:.1f}s), 요청: {args.requests}")
+    print("=" * 60)
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        meetings = (await client.get("/api/meetings")).json()
+        for name, url in scenarios():
+            if name == "meetings_page2":
+                url = f"/api/meetings?cursor={meetings['next_cursor']}"
+            result = results[name] = await measure(client, counter, url, args.requests, args.warmup)
+            print(f"[{name:<16}] 쿼리 {result['queries']:2d}개  p50={result['p50_ms']:7.2f}ms  "
+                  f"p99={result['p99_ms']:7.2f}ms")
+    print("=" * 60)
+
+    budgets_path = Path(args.budgets)
+    if args.write_budgets:
+        budgets = {
+            name: {"queries": result["queries"], "p99_ms": round(max(50.0, result["p99_ms"] * 5), 1)}
+            for name, result in results.items()
+        }
+        budgets_path.write_text(json.dumps(budgets, indent=2, ensure_ascii=False) + "\n")
+        print(f"예산 저장: {budgets_path}")
+        return
+    budgets = json.loads(budgets_path.read_text())
+    failures = check(results, budgets)
+    for name, result in results.items():
+        budget = budgets.get(name)
+        if budget and result["queries"] < budget["queries"]:
+            print(f"참고: {name} 쿼리 수가 예산보다 적습니다 ({result['queries']} < {budget['queries']}), 예산을 낮출 수 있음")
+    if failures:
+        print("예산 초과:")
+        for line in failures:
+            print(f"  - {line}")
+        sys.exit(1)
+    print(f"모든 엔드포인트가 예산({budgets_path.name}) 안에 있습니다")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
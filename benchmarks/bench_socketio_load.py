@@ -0,0 +1,332 @@
+"""
+Socket.IO 부하/지연 시간 벤치마크
+
+socket_app을 uvicorn으로 띄우고 python-socketio 클라이언트 수천 개로 실제 시나리오를 실행합니다.
+
+  connect → join_room → offer/answer → ice_candidate → message → disconnect
+
+단계마다 처리량(초당 처리/수신 수)과 p50/p99 지연 시간(보낸 시각부터 상대 클라이언트가 받을 때까지),
+서버 메모리(RSS)와 연결당 메모리를 출력합니다. 서버는 이 스크립트가 띄우는 자식 프로세스에서 실행되므로
+클라이언트 부하가 서버 메모리/CPU 측정에 섞이지 않습니다 (RSS는 Linux의 /proc에서 읽음).
+
+회귀 확인:
+    python benchmarks/bench_socketio_load.py --json baseline.json          # 기준 저장
+    python benchmarks/bench_socketio_load.py --compare baseline.json       # 기준보다 나빠지면 종료 코드 1
+
+기본값은 RATE_LIMITS=off (처리 용량 측정), --rate-limits ""로 운영 기본 제한을 적용할 수 있습니다.
+클라이언트 의존성은 benchmarks/requirements.txt 참고.
+
+사용법:
+    python benchmarks/bench_socketio_load.py [--clients 1000] [--room-size 4] [--candidates 10] [--messages 3]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import _common  # noqa: F401  (작업 디렉토리와 DATABASE_URL 설정, 서버 자식 프로세스도 그대로 물려받음)
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+import socketio
+
+PORT = 8796
+CONNECT_CONCURRENCY = 200
+
+
+def serve(port):
+    """자식 프로세스: server.socket_app 실행 (서버 경고/오류 로그는 그대로 출력)"""
+    import uvicorn
+    import server
+
+    uvicorn.Server(uvicorn.Config(server.socket_app, host="127.0.0.1", port=port, log_level="warning")).run()
+
+
+def rss_mb(pid):
+    """프로세스 RSS (MB, /proc이 없으면 None)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Phase:
+    """단계별 지연 시간 수집 (expected개를 받으면 완료)"""
+
+    def __init__(self, name, expected):
+        self.name = name
+        self.expected = expected
+        self.latencies = []
+        self.done = asyncio.Event()
+        self.started = time.perf_counter()
+        self.finished = None
+        if expected == 0:
+            self.finish()
+
+    def record(self, sent_at):
+        self.latencies.append((time.perf_counter() - sent_at) * 1000)
+        if len(self.latencies) >= self.expected and not self.done.is_set():
+            self.finish()
+
+    def finish(self):
+        self.finished = time.perf_counter()
+        self.done.set()
+
+    async def wait_count(self, count, timeout):
+        """count개를 받을 때까지 대기 (단계는 계속 진행)"""
+        deadline = time.perf_counter() + timeout
+        while len(self.latencies) < count and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+
+    async def wait(self, timeout):
+        try:
+            await asyncio.wait_for(self.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.finish()
+
+    def result(self):
+        seconds = (self.finished or time.perf_counter()) - self.started
+        latencies = self.latencies or [0.0]
+        return {
+            "count": len(self.latencies),
+            "expected": self.expected,
+            "per_sec": len(self.latencies) / seconds if seconds > 0 else 0.0,
+            "p50": percentile(latencies, 50),
+            "p99": percentile(latencies, 99),
+            "mean": statistics.mean(latencies),
+        }
+
+
+def stamp(text):
+    """페이로드에 넣은 보낸 시각 (같은 프로세스의 perf_counter)"""
+    return float(text.rsplit(":", 1)[1])
+
+
+class BenchClient:
+    def __init__(self, index, phases):
+        self.index = index
+        self.phases = phases
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.join_sent = 0.0
+        self.sio.on("existing-users", self.on_existing_users)
+        self.sio.on("offer", self.on_offer)
+        self.sio.on("answer", self.on_answer)
+        self.sio.on("ice-candidate", self.on_candidate)
+        self.sio.on("message", self.on_message)
+
+    @property
+    def sid(self):
+        return self.sio.get_sid()
+
+    async def on_existing_users(self, data):
+        self.phases["join"].record(self.join_sent)
+
+    async def on_offer(self, data):
+        self.phases["offer"].record(stamp(data["offer"]["sdp"]))
+        await self.sio.emit("answer", {
+            "target": data["from"],
+            "answer": {"type": "answer", "sdp": f"v=0\r\na=bench:{time.perf_counter()!r}"},
+        })
+
+    async def on_answer(self, data):
+        self.phases["answer"].record(stamp(data["answer"]["sdp"]))
+
+    async def on_candidate(self, data):
+        self.phases["ice_candidate"].record(stamp(data["candidate"]["candidate"]))
+
+    async def on_message(self, data):
+        self.phases["message"].record(stamp(data["message"]))
+
+
+async def run(args, pid):
+    phases = {}
+    clients = [BenchClient(i, phases) for i in range(args.clients)]
+    rooms = [clients[i:i + args.room_size] for i in range(0, len(clients), args.room_size)]
+    memory = {"start": rss_mb(pid)}
+    url = f"http://127.0.0.1:{PORT}"
+
+    # connect (지연 시간 = connect() 완료까지)
+    phases["connect"] = Phase("connect", len(clients))
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def connect(client):
+        async with semaphore:
+            started = time.perf_counter()
+            await client.sio.connect(url, transports=["websocket"])
+            phases["connect"].record(started)
+
+    await asyncio.gather(*(connect(c) for c in clients))
+    memory["connected"] = rss_mb(pid)
+
+    # join_room (지연 시간 = existing-users 수신까지)
+    # 회의실을 만드는 첫 참가자들이 참가를 마친 뒤 나머지를 보냄 (여러 회의실에 동시에 참가)
+    phases["join"] = Phase("join", len(clients))
+
+    async def join(client, room_index):
+        client.join_sent = time.perf_counter()
+        await client.sio.emit("join_room", {"room_id": f"bench-room-{room_index}", "username": f"user{client.index}"})
+
+    await asyncio.gather(*(join(room[0], r) for r, room in enumerate(rooms)))
+    await phases["join"].wait_count(len(rooms), args.timeout)
+    await asyncio.gather(*(join(c, r) for r, room in enumerate(rooms) for c in room[1:]))
+    await phases["join"].wait(args.timeout)
+    memory["joined"] = rss_mb(pid)
+
+    # offer → answer (회의실 안에서 다음 참가자에게, 받은 쪽이 바로 answer)
+    pairs = [(room[i], room[(i + 1) % len(room)]) for room in rooms if len(room) > 1 for i in range(len(room))]
+    phases["offer"] = Phase("offer", len(pairs))
+    phases["answer"] = Phase("answer", len(pairs))
+    await asyncio.gather(*(
+        sender.sio.emit("offer", {
+            "target": receiver.sid,
+            "offer": {"type": "offer", "sdp": f"v=0\r\na=bench:{time.perf_counter()!r}"},
+        })
+        for sender, receiver in pairs
+    ))
+    await phases["offer"].wait(args.timeout)
+    await phases["answer"].wait(args.timeout)
+
+    # ice_candidate
+    phases["ice_candidate"] = Phase("ice_candidate", len(pairs) * args.candidates)
+
+    async def candidates(sender, receiver):
+        for i in range(args.candidates):
+            await sender.sio.emit("ice_candidate", {
+                "target": receiver.sid,
+                "candidate": {"candidate": f"candidate:{i} 1 udp 2122260223 10.0.0.1 5000{i} typ host:"
+                                           f"{time.perf_counter()!r}", "sdpMid": "0", "sdpMLineIndex": 0},
+            })
+
+    await asyncio.gather(*(candidates(s, r) for s, r in pairs))
+    await phases["ice_candidate"].wait(args.timeout)
+
+    # message (회의실 전체에 전달되므로 보낸 사람 포함 room_size명이 받음)
+    phases["message"] = Phase("message", sum(len(room) * len(room) * args.messages for room in rooms))
+
+    async def messages(client):
+        for i in range(args.messages):
+            await client.sio.emit("message", {"message": f"bench {client.index}-{i}:{time.perf_counter()!r}"})
+
+    await asyncio.gather(*(messages(c) for c in clients))
+    await phases["message"].wait(args.timeout)
+
+    # disconnect
+    phases["disconnect"] = Phase("disconnect", len(clients))
+
+    async def disconnect(client):
+        started = time.perf_counter()
+        await client.sio.disconnect()
+        phases["disconnect"].record(started)
+
+    await asyncio.gather(*(disconnect(c) for c in clients))
+    # 서버의 disconnect 처리(나감 기록)가 끝날 때까지 잠시 대기
+    await asyncio.sleep(1.0)
+    memory["disconnected"] = rss_mb(pid)
+
+    return {"phases": {name: phase.result() for name, phase in phases.items()}, "memory": memory}
+
+
+def compare(result, baseline, tolerance):
+    """기준 결과와 비교해 나빠진 항목 목록"""
+    regressions = []
+    for name, base in baseline["phases"].items():
+        current = result["phases"].get(name)
+        if current is None:
+            continue
+        if current["count"] < base["count"]:
+            regressions.append(f"{name}: 수신 {current['count']} < 기준 {base['count']}")
+        if current["p99"] > base["p99"] * (1 + tolerance) and current["p99"] - base["p99"] > 1.0:
+            regressions.append(f"{name}: p99 {current['p99']:.2f}ms > 기준 {base['p99']:.2f}ms")
+        if current["per_sec"] < base["per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: 처리량 {current['per_sec']:.0f}/s < 기준 {base['per_sec']:.0f}/s")
+    base_kb, current_kb = baseline.get("kb_per_connection"), result.get("kb_per_connection")
+    if base_kb and current_kb and current_kb > base_kb * (1 + tolerance):
+        regressions.append(f"연결당 메모리 {current_kb:.1f}KB > 기준 {base_kb:.1f}KB")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--room-size", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=10, help="연결 쌍당 ICE candidate 수")
+    parser.add_argument("--messages", type=int, default=3, help="클라이언트당 채팅 수")
+    parser.add_argument("--timeout", type=float, default=60.0, help="단계별 최대 대기 시간 (초)")
+    parser.add_argument("--rate-limits", default="off", help="서버 RATE_LIMITS (빈 문자열이면 기본 제한)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--compare", help="비교할 기준 JSON 파일")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="기준 대비 허용 비율")
+    args = parser.parse_args()
+
+    if args.rate_limits:
+        os.environ["RATE_LIMITS"] = args.rate_limits
+    else:
+        os.environ.pop("RATE_LIMITS", None)
+    process = multiprocessing.get_context("spawn").Process(target=serve, args=(PORT,), daemon=True)
+    process.start()
+    async with httpx.AsyncClient() as http:
+        for _ in range(200):
+            try:
+                if (await http.get(f"http://127.0.0.1:{PORT}/health")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+        else:
+            process.terminate()
+            raise SystemExit("서버가 시작되지 않았습니다")
+
+    print("=" * 60)
+    print("Socket.IO 부하/지연 시간")
+    print(f"클라이언트: {args.clients}, 회의실 크기: {args.room_size}, candidate: {args.candidates}, "
+          f"채팅: {args.messages}, RATE_LIMITS: {args.rate_limits or '기본값'}")
+    print("=" * 60)
+    try:
+        result = await run(args, process.pid)
+    finally:
+        process.terminate()
+        process.join()
+
+    for name, phase in result["phases"].items():
+        missing = "" if phase["count"] >= phase["expected"] else f"  (수신 {phase['count']}/{phase['expected']})"
+        print(f"[{name:<13}] {phase['count']:7d}건  {phase['per_sec']:9.0f}/s  "
+              f"p50={phase['p50']:8.2f}ms  p99={phase['p99']:8.2f}ms{missing}")
+    memory = result["memory"]
+    if memory["start"] is not None:
+        result["kb_per_connection"] = (memory["joined"] - memory["start"]) * 1024 / args.clients
+        print(f"서버 RSS: 시작 {memory['start']:.1f}MB, 연결 후 {memory['connected']:.1f}MB, "
+              f"참가 후 {memory['joined']:.1f}MB, 종료 후 {memory['disconnected']:.1f}MB")
+        print(f"연결당 메모리 (참가 포함): {result['kb_per_connection']:.1f}KB")
+    print("=" * 60)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2, ensure_ascii=False))
+        print(f"결과 저장: {args.json}")
+    if args.compare:
+        regressions = compare(result, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            print("기준 대비 성능 저하:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"기준({args.compare}) 대비 허용 범위 안 (±{args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+정적 자산 응답 벤치마크
+
+메인 페이지를 처음 열 때와 다시 열 때 받는 바이트와 요청 시간을 비교합니다.
+
+  - file     : 이전 방식 (FileResponse/StaticFiles, 압축 없음, 지문 없음)
+  - assets   : StaticAssets (미리 압축, 지문이 붙은 URL, 재방문 시 index.html은 304, 자산은 브라우저 캐시)
+
+사용법:
+    python benchmarks/bench_static_assets.py [--requests 300]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from _common import quiet
+
+with quiet():
+    import httpx
+    import uvicorn
+    import server
+    from starlette.responses import FileResponse
+
+PORT = 8797
+
+
+@server.app.get("/bench-file/{name}")
+async def bench_file(name: str):
+    """이전 방식과 같은 FileResponse"""
+    return FileResponse(f"static/{name}")
+
+
+async def first_visit(client, paths):
+    sent = 0
+    for path in paths:
+        response = await client.get(path, headers={"Accept-Encoding": "gzip, br"})
+        sent += int(response.headers.get("content-length", len(response.content)))
+    return sent
+
+
+async def measure(label, client, first, repeat, requests):
+    timings = []
+    received = 0
+    for i in range(requests):
+        started = time.perf_counter()
+        received += await (first() if i == 0 else repeat())
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"[{label:<6}] 방문당 평균={statistics.mean(timings):7.3f}ms  "
+          f"첫 방문 {await first() / 1024:7.1f}KB  재방문 {await repeat() / 1024:7.1f}KB")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    config = uvicorn.Config(server.socket_app, host="127.0.0.1", port=PORT, log_level="warning")
+    uv = uvicorn.Server(config)
+    serve_task = asyncio.create_task(uv.serve())
+    while not uv.started:
+        await asyncio.sleep(0.05)
+
+    print("=" * 60)
+    print("정적 자산 응답 (index.html + app.js + style.css)")
+    print(f"방문 수: {args.requests}, 버전: {server.static_assets.version}")
+    print("=" * 60)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}") as client:
+            file_paths = ["/bench-file/index.html", "/bench-file/app.js", "/bench-file/style.css"]
+            # 이전 방식은 캐시 헤더가 없어 재방문에도 모두 다시 받음
+            await measure("file", client,
+                          lambda: first_visit(client, file_paths),
+                          lambda: first_visit(client, file_paths),
+                          args.requests)
+
+            asset_paths = ["/", *server.static_assets.urls.values()]
+            etag = (await client.get("/", headers={"Accept-Encoding": "gzip, br"})).headers["etag"]
+
+            async def revisit():
+                # 자산은 immutable이라 요청하지 않고, index.html만 조건부 요청
+                response = await client.get("/", headers={"Accept-Encoding": "gzip, br", "If-None-Match": etag})
+                assert response.status_code == 304
+                return len(response.content)
+
+            await measure("assets", client, lambda: first_visit(client, asset_paths), revisit, args.requests)
+    finally:
+        uv.should_exit = True
+        await serve_task
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+"""
+회의 타임라인 응답 메모리 벤치마크
+
+채팅 이벤트가 많은 회의 하나를 만든 뒤 전체 타임라인을 내려받을 때의 최대 메모리 사용량을 비교합니다.
+
+  - legacy : 이전 방식 (.all()로 전부 읽어 dict 리스트를 만든 뒤 JSON 문서 하나로 직렬화)
+  - export : /api/meetings/{id}/timeline/export (서버 측 커서에서 청크 단위로 NDJSON 스트리밍)
+  - paged  : /api/meetings/{id}/timeline 을 next_cursor로 끝까지 순회 (페이지당 최대 메모리)
+
+사용법:
+    python benchmarks/bench_timeline_export.py [--events 50000]
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from _common import quiet
+
+with quiet():
+    import server
+    from auth import UserContext
+    from database import SessionLocal, Meeting, MeetingEvent, MeetingParticipant, User, init_db
+
+
+def seed(events):
+    """회의 하나와 채팅 이벤트 N개 생성"""
+    init_db()
+    db = SessionLocal()
+    user = User(username="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    meeting = Meeting(room_id="bench-room", created_by=user.id, started_at=datetime(2024, 1, 1))
+    db.add(meeting)
+    db.flush()
+    db.add(MeetingParticipant(meeting_id=meeting.id, user_id=user.id, username="bench"))
+    started = datetime(2024, 1, 1)
+    db.bulk_insert_mappings(MeetingEvent, [
+        {
+            "meeting_id": meeting.id,
+            "user_id": user.id,
+            "username": "bench",
+            "event_type": "chat",
+            "message": f"채팅 메시지 {i} " + "가" * 40,
+            "timestamp": started + timedelta(milliseconds=i * 100),
+        }
+        for i in range(events)
+    ])
+    db.commit()
+    context = UserContext.from_user(user)
+    meeting_id = meeting.id
+    db.close()
+    return meeting_id, context
+
+
+def run_legacy(meeting_id):
+    """이전 구현: 모든 이벤트를 메모리에 올린 뒤 한 번에 직렬화"""
+    db = SessionLocal()
+    try:
+        events = db.query(MeetingEvent).filter(
+            MeetingEvent.meeting_id == meeting_id
+        ).order_by(MeetingEvent.timestamp.asc()).all()
+        timeline = [
+            {
+                "id": e.id,
+                "type": e.event_type,
+                "username": e.username,
+                "timestamp": e.timestamp.isoformat() if e.timestamp else None,
+                "message": e.message,
+                "data": e.data
+            }
+            for e in events
+        ]
+        body = json.dumps({"timeline": timeline}, ensure_ascii=False)
+        return len(timeline), len(body.encode())
+    finally:
+        db.close()
+
+
+async def run_export(meeting_id, user):
+    """현재 구현: NDJSON 스트리밍 응답을 끝까지 소비"""
+    db = SessionLocal()
+    try:
+        with quiet():
+            response = await server.export_meeting_timeline(meeting_id, None, None, None, user, db)
+        lines = size = 0
+        async for chunk in response.body_iterator:
+            lines += chunk.count("\n")
+            size += len(chunk.encode())
+        return lines, size
+    finally:
+        db.close()
+
+
+async def run_paged(meeting_id, user, limit):
+    """현재 구현: 커서 페이지네이션으로 전체 순회"""
+    db = SessionLocal()
+    try:
+        cursor, count, size = None, 0, 0
+        with quiet():
+            while True:
+                page = await server.get_meeting_timeline(meeting_id, cursor, limit, None, None, None, user, db)
+                count += len(page["timeline"])
+                size += len(json.dumps(page, ensure_ascii=False).encode())
+                db.expunge_all()
+                cursor = page["next_cursor"]
+                if not cursor:
+                    break
+        return count, size
+    finally:
+        db.close()
+
+
+def measure(label, func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count, size = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"[{label:<6}] {elapsed:6.2f}s  이벤트={count:>7}  응답={size / 1024 / 1024:7.1f}MB  "
+          f"최대 메모리={peak / 1024 / 1024:7.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--page", type=int, default=server.TIMELINE_PAGE_MAX)
+    args = parser.parse_args()
+
+    meeting_id, user = seed(args.events)
+
+    print("=" * 60)
+    print("회의 타임라인 응답 메모리")
+    print(f"이벤트 수: {args.events}, 내보내기 청크: {server.TIMELINE_EXPORT_CHUNK}, 페이지 크기: {args.page}")
+    print("=" * 60)
+    measure("legacy", lambda: run_legacy(meeting_id))
+    measure("export", lambda: asyncio.run(run_export(meeting_id, user)))
+    measure("paged", lambda: asyncio.run(run_paged(meeting_id, user, args.page)))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
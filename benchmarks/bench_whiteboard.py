@@ -0,0 +1,119 @@
+"""
+화이트보드 전송량 벤치마크
+
+한 사람이 획을 그리며 mousemove마다 점 하나씩 보내는 상황을 재현하고,
+방의 다른 사용자에게 나가는 프레임 수/바이트와 늦게 들어온 참가자가 받는 데이터 크기를 비교합니다.
+
+  - legacy : 기존 방식 (받은 그리기 이벤트를 그대로 다시 전송, 늦은 참가자는 모든 이벤트를 다시 받아야 함)
+  - engine : WhiteboardEngine (구간 묶음 + 양자화/delta 인코딩, 참가 시 스냅샷 + 최근 획)
+
+사용법:
+    python benchmarks/bench_whiteboard.py [--strokes 300] [--points 80] [--rate 120]
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+
+import _common  # noqa: F401  (저장소 루트를 sys.path에 추가)
+
+from relay import RelayJSON
+from whiteboard import WHITEBOARD_BATCH_MS, WhiteboardEngine
+
+SEPARATORS = (",", ":")
+
+
+def make_strokes(count, points, rng):
+    """캔버스(1280x720) 위의 부드러운 곡선 획들"""
+    strokes = []
+    for _ in range(count):
+        x, y = rng.uniform(100, 1180), rng.uniform(100, 620)
+        angle = rng.uniform(0, 2 * math.pi)
+        path = []
+        for _ in range(points):
+            angle += rng.uniform(-0.3, 0.3)
+            x += math.cos(angle) * 3.7 + rng.random() * 0.01
+            y += math.sin(angle) * 3.7 + rng.random() * 0.01
+            path.append((x, y))
+        strokes.append(path)
+    return strokes
+
+
+def legacy_events(strokes):
+    """기존 클라이언트 형식 (선분마다 이벤트 하나)"""
+    for path in strokes:
+        for (x0, y0), (x1, y1) in zip(path, path[1:]):
+            yield {"room_id": "bench", "x0": x0, "y0": y0, "x1": x1, "y1": y1, "color": "#e03131", "width": 3}
+
+
+def point_events(strokes):
+    """점 스트림 형식 (mousemove마다 점 하나, 마지막 점에 end)"""
+    for s, path in enumerate(strokes):
+        for i, (x, y) in enumerate(path):
+            yield {"room_id": "bench", "stroke": s, "points": [[x, y]], "color": "#e03131", "width": 3,
+                   "end": i == len(path) - 1}
+
+
+def run_legacy(strokes):
+    frames = 0
+    sent_bytes = 0
+    history = []
+    for event in legacy_events(strokes):
+        packet = json.dumps(["whiteboard-draw", event], separators=SEPARATORS)
+        frames += 1
+        sent_bytes += len(packet)
+        history.append(packet)
+    # 늦은 참가자에게 지금까지의 이벤트를 모두 다시 보내야 같은 화면이 됨
+    return frames, sent_bytes, sum(len(packet) for packet in history)
+
+
+async def run_engine(strokes, rate):
+    frames = 0
+    sent_bytes = 0
+
+    async def send(room_id, author, segments):
+        nonlocal frames, sent_bytes
+        packet = RelayJSON.dumps(["whiteboard-draw", {"from": author, "g": engine.grid, "segments": segments}],
+                                 separators=SEPARATORS)
+        frames += 1
+        sent_bytes += len(packet)
+
+    # 실제 시간 대신 rate(Hz)로 이벤트가 들어온다고 보고 WHITEBOARD_BATCH_MS 경계마다 직접 전송
+    engine = WhiteboardEngine(send, window=3600)
+    window = WHITEBOARD_BATCH_MS / 1000
+    next_flush = window
+    for i, event in enumerate(point_events(strokes)):
+        if i / rate >= next_flush:
+            await engine.flush("bench")
+            next_flush += window
+        await engine.draw("bench", "author-sid-0000000000", event)
+    await engine.flush_all()
+    join_packet = RelayJSON.dumps(["whiteboard-snapshot", engine.state("bench")], separators=SEPARATORS)
+    return frames, sent_bytes, len(join_packet)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--strokes", type=int, default=300)
+    parser.add_argument("--points", type=int, default=80)
+    parser.add_argument("--rate", type=int, default=120, help="mousemove 이벤트 빈도 (Hz)")
+    args = parser.parse_args()
+
+    strokes = make_strokes(args.strokes, args.points, random.Random(42))
+
+    print("=" * 60)
+    print("화이트보드 전송량")
+    print(f"획: {args.strokes}, 획당 점: {args.points}, mousemove: {args.rate}Hz, 묶음 창: {WHITEBOARD_BATCH_MS}ms")
+    print("=" * 60)
+    results = {
+        "legacy": run_legacy(strokes),
+        "engine": await run_engine(strokes, args.rate),
+    }
+    for mode, (frames, sent_bytes, join_bytes) in results.items():
+        print(f"[{mode}] 프레임={frames:>7}  전송={sent_bytes / 1024:9.1f}KB  늦은 참가자 수신={join_bytes / 1024:8.1f}KB")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
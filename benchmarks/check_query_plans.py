@@ -0,0 +1,98 @@
+"""
+핫 쿼리 실행 계획 점검
+
+EXPLAIN으로 자주 실행되는 쿼리가 인덱스를 타는지 확인하고, 전체 테이블 스캔이 있으면 실패(종료 코드 1)합니다.
+기존 DB에 마이그레이션이 적용됐는지 확인할 때도 사용할 수 있습니다.
+SQLite에서 각 쿼리가 써야 하는 인덱스는 tests/test_query_plans.py가 자동으로 확인하고,
+운영 DB(PostgreSQL 등)나 마이그레이션이 적용된 기존 DB는 배포 전에 이 스크립트로 직접 확인합니다.
+
+  - 나감 처리      : MeetingParticipant (meeting_id, username) ORDER BY joined_at DESC
+  - 타임라인       : MeetingEvent meeting_id ORDER BY timestamp, id
+  - 회의실 입장    : Meeting room_id ORDER BY started_at DESC
+  - 회의 목록      : MeetingParticipant user_id
+  - 접근 권한 확인 : MeetingParticipant (meeting_id, user_id)
+  - 참가자 목록    : MeetingParticipant meeting_id ORDER BY joined_at, id
+
+사용법:
+    python benchmarks/check_query_plans.py            # 임시 SQLite DB
+    DATABASE_URL=postgresql://... python benchmarks/check_query_plans.py
+"""
+import sys
+
+from _common import quiet
+
+from sqlalchemy import select, text
+
+with quiet():
+    import server
+    from database import Meeting, MeetingParticipant, engine, init_db
+
+
+def hot_queries():
+    return {
+        "나감 처리": select(MeetingParticipant).where(
+            MeetingParticipant.meeting_id == 1,
+            MeetingParticipant.username == "alice"
+        ).order_by(MeetingParticipant.joined_at.desc()).limit(1),
+        "타임라인": server._timeline_query(1).limit(200),
+        "회의실 입장": select(Meeting).where(Meeting.room_id == "room").order_by(Meeting.started_at.desc()).limit(1),
+        "회의 목록": select(MeetingParticipant.meeting_id).where(MeetingParticipant.user_id == 1),
+        "접근 권한 확인": select(MeetingParticipant.id).where(
+            MeetingParticipant.meeting_id == 1,
+            MeetingParticipant.user_id == 1
+        ).limit(1),
+        "참가자 목록": select(MeetingParticipant).where(MeetingParticipant.meeting_id == 1).order_by(
+            MeetingParticipant.joined_at.asc(), MeetingParticipant.id.asc()
+        ).limit(101),
+    }
+
+
+def explain(connection, statement):
+    """실행 계획을 문자열 목록으로 반환"""
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "sqlite":
+        return [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [row[0] for row in connection.execute(text(f"EXPLAIN {sql}"))]
+
+
+def uses_index(plan):
+    """전체 테이블 스캔 없이 인덱스로 접근하는지 확인"""
+    for line in plan:
+        if engine.dialect.name == "sqlite":
+            if line.startswith("SCAN") and "INDEX" not in line and "PRIMARY KEY" not in line:
+                return False
+        elif "Seq Scan" in line:
+            return False
+    return True
+
+
+def main():
+    with quiet():
+        init_db()
+
+    print("=" * 60)
+    print("핫 쿼리 실행 계획 점검")
+    print(f"DB: {engine.dialect.name}")
+    print("=" * 60)
+    failed = []
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            # 빈 테이블에서는 플래너가 순차 스캔을 고르므로 인덱스 사용 가능 여부만 확인
+            connection.execute(text("SET enable_seqscan = off"))
+        for name, statement in hot_queries().items():
+            plan = explain(connection, statement)
+            ok = uses_index(plan)
+            if not ok:
+                failed.append(name)
+            print(f"[{'OK' if ok else 'FAIL'}] {name}")
+            for line in plan:
+                print(f"       {line}")
+    print("=" * 60)
+    if failed:
+        print(f"인덱스를 사용하지 않는 쿼리: {', '.join(failed)}")
+        sys.exit(1)
+    print("모든 핫 쿼리가 인덱스를 사용합니다")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+공유 파일 내용 주소(content-addressed) 저장소
+- 업로드를 받는 동안 sha256을 이어서 계산하고, 완료되면 UPLOAD_DIR/blobs/<앞 2글자>/<sha256>에 저장
+- 같은 내용이 이미 있으면 새로 받은 파일은 지우고 기존 blob을 함께 사용 (회의실/파일이 달라도 한 벌만 저장)
+- 공유 파일 항목이 blob을 참조하는 수를 RoomStore(add_blob_ref/get_blob_ref)에 보관하고,
+  참조가 없는 blob과 오래 방치된 업로드(.part)는 백그라운드 GC가 지움
+"""
+import asyncio
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+import aiofiles.os
+
+from logger import get_logger
+
+logger = get_logger("blob_store")
+
+# GC 설정 (환경 변수로 조정 가능)
+BLOB_GC_INTERVAL = int(os.getenv("BLOB_GC_INTERVAL", "600"))  # GC 주기 (초, 0이면 실행하지 않음)
+BLOB_GC_GRACE = int(os.getenv("BLOB_GC_GRACE", "3600"))  # 이 시간(초) 동안 수정되지 않은 blob/.part만 삭제
+
+_HASH_READ_BYTES = 1024 * 1024
+
+
+def _hash_prefix(path: Path, length: int):
+    """파일 앞 length바이트의 sha256 (이어 올리는 업로드의 해시 상태를 잃었을 때 다시 계산)"""
+    hasher = hashlib.sha256()
+    remaining = length
+    with open(path, "rb") as f:
+        while remaining > 0:
+            data = f.read(min(_HASH_READ_BYTES, remaining))
+            if not data:
+                raise ValueError("업로드 중인 파일이 기록된 위치보다 짧습니다")
+            hasher.update(data)
+            remaining -= len(data)
+    return hasher
+
+
+def _touch(path: Path) -> bool:
+    """수정 시각 갱신 (반환: 파일이 있었는지)"""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _remove_stale(path: Path, cutoff: float) -> bool:
+    """
+    cutoff 이후 수정되지 않은 blob 삭제 (반환: 삭제했는지, 스레드에서 실행)
+
+    먼저 이름을 바꿔 떼어 낸 뒤 수정 시각을 확인하므로, 그 사이 commit()/add_ref()가 blob을 다시 쓰면
+    - 떼어 내기 전에 갱신했으면 수정 시각이 새로워 되돌려 놓고
+    - 떼어 낸 뒤면 blob이 없다고 보고 새로 저장함
+    """
+    detached = path.with_name(path.name + ".gc")
+    try:
+        os.replace(path, detached)
+    except FileNotFoundError:
+        return False
+    if os.stat(detached).st_mtime >= cutoff:
+        os.replace(detached, path)
+        return False
+    os.remove(detached)
+    return True
+
+
+class BlobStore:
+    """
+    sha256 blob 저장소
+
+    - hasher(): 업로드별 해시 상태 (워커 메모리, 다른 워커로 이어 올리면 기록된 부분을 다시 읽어 계산)
+    - commit(): 완성된 업로드 파일을 blob으로 옮기고(이미 있으면 삭제) 참조 수 증가
+    - release(): 참조 수 감소 (파일은 GC가 유예 시간 뒤에 삭제)
+    """
+
+    def __init__(self, store, directory: Path, grace: float = BLOB_GC_GRACE):
+        self.store = store
+        self.directory = directory
+        self.blob_dir = directory / "blobs"
+        self.grace = grace
+        self._hashers: Dict[str, Tuple[int, "hashlib._Hash"]] = {}
+        self.deduplicated = 0
+
+    def path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+
+    async def hasher(self, upload_id: str, part_path: Path, offset: int):
+        """offset까지 기록된 업로드의 해시 상태"""
+        entry = self._hashers.get(upload_id)
+        if entry is not None and entry[0] == offset:
+            return entry[1]
+        if offset == 0:
+            hasher = hashlib.sha256()
+        else:
+            hasher = await asyncio.to_thread(_hash_prefix, part_path, offset)
+        self._hashers[upload_id] = (offset, hasher)
+        return hasher
+
+    def advance(self, upload_id: str, hasher, offset: int):
+        """청크를 기록한 뒤 해시 상태의 위치 갱신"""
+        self._hashers[upload_id] = (offset, hasher)
+
+    def forget(self, upload_id: str):
+        self._hashers.pop(upload_id, None)
+
+    async def exists(self, digest: str) -> bool:
+        return await aiofiles.os.path.exists(self.path(digest))
+
+    async def commit(self, upload_id: str, part_path: Path, digest: str) -> bool:
+        """
+        완성된 업로드를 blob으로 저장하고 참조 수 증가
+
+        반환: 이미 같은 blob이 있어 새로 저장하지 않았으면 True
+        """
+        self.forget(upload_id)
+        path = self.path(digest)
+        await aiofiles.os.makedirs(path.parent, exist_ok=True)
+        # 참조 수를 먼저 올리고 기존 blob의 수정 시각을 갱신해 GC가 지우지 않게 한 뒤 판단
+        # (GC는 참조 수와 수정 시각을 모두 확인하고 지움)
+        await self.store.add_blob_ref(digest, 1)
+        duplicate = await asyncio.to_thread(_touch, path)
+        if duplicate:
+            await aiofiles.os.remove(part_path)
+            self.deduplicated += 1
+        else:
+            await aiofiles.os.replace(part_path, path)
+        return duplicate
+
+    async def add_ref(self, digest: str) -> bool:
+        """이미 저장된 blob을 참조하는 항목 추가 (반환: blob이 있어 참조했는지)"""
+        await self.store.add_blob_ref(digest, 1)
+        if await asyncio.to_thread(_touch, self.path(digest)):
+            return True
+        await self.store.add_blob_ref(digest, -1)
+        return False
+
+    async def release(self, digest: str) -> int:
+        """참조 수 감소 (반환: 남은 참조 수)"""
+        return await self.store.add_blob_ref(digest, -1)
+
+    async def collect(self) -> Tuple[int, int, int]:
+        """
+        참조가 없는 blob과 방치된 .part 파일 삭제
+
+        반환: (삭제한 blob 수, 삭제한 .part 수, 확보한 바이트)
+        """
+        cutoff = time.time() - self.grace
+        blobs, parts = await asyncio.to_thread(self._scan, cutoff)
+        removed_blobs = removed_parts = freed_bytes = 0
+        for digest, path, size in blobs:
+            if await self.store.get_blob_ref(digest) > 0:
+                continue
+            # 참조 수 확인 뒤에 같은 내용이 다시 올라왔으면 commit()이 수정 시각을 갱신했으므로 건너뜀
+            if not await asyncio.to_thread(_remove_stale, path, cutoff):
+                continue
+            removed_blobs += 1
+            freed_bytes += size
+        for path, size in parts:
+            # 진행 중인 업로드는 청크를 받을 때마다 수정 시각이 갱신되므로 유예 시간 안에 있음
+            upload_id = path.name[:-len(".part")]
+            try:
+                await aiofiles.os.remove(path)
+            except FileNotFoundError:
+                continue
+            self.forget(upload_id)
+            info = await self.store.get_file(upload_id)
+            if info is not None and not info.get("complete"):
+                await self.store.remove_file(upload_id)
+            removed_parts += 1
+            freed_bytes += size
+        return removed_blobs, removed_parts, freed_bytes
+
+    def _scan(self, cutoff: float):
+        """유예 시간이 지난 blob/.part 목록 (스레드에서 실행)"""
+        blobs = []
+        if self.blob_dir.exists():
+            for entry in self.blob_dir.glob("*/*"):
+                stat = entry.stat()
+                if stat.st_mtime < cutoff:
+                    blobs.append((entry.name, entry, stat.st_size))
+        parts = []
+        for entry in self.directory.glob("*.part"):
+            stat = entry.stat()
+            if stat.st_mtime < cutoff:
+                parts.append((entry, stat.st_size))
+        return blobs, parts
+
+    async def run_gc(self, interval: float = BLOB_GC_INTERVAL):
+        """interval마다 collect() 실행 (취소될 때까지)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed_blobs, removed_parts, freed = await self.collect()
+            except Exception as e:
+                logger.warning("blob GC 실패: %s", e)
+                continue
+            if removed_blobs or removed_parts:
+                logger.info("blob GC: blob %s개, 방치된 업로드 %s개 삭제 (%s바이트)", removed_blobs, removed_parts, freed)
@@ -0,0 +1,84 @@
+"""
+회의실별 최근 채팅 기록
+참가 시 chat-history로 보낼 최근 메시지를 메모리 링 버퍼(deque)에 보관하고,
+회의실을 처음 조회할 때 한 번만 DB(MeetingEvent)에서 채움
+"""
+import asyncio
+import os
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, List, Tuple
+
+from logger import get_logger
+
+logger = get_logger("chat_history")
+
+# 회의실당 보관할 최근 메시지 수 (환경 변수로 조정 가능)
+CHAT_HISTORY_SIZE = int(os.getenv("CHAT_HISTORY_SIZE", "50"))
+
+# (중복 확인 키, 클라이언트에 보낼 메시지) 목록을 오래된 순으로 반환
+LoadHistory = Callable[[str, int], Awaitable[List[Tuple[Hashable, Dict]]]]
+
+
+class ChatHistory:
+    """
+    회의실별 최근 메시지 링 버퍼
+
+    - get()은 버퍼가 없으면 load(room_id, limit)로 DB에서 채움 (회의실당 한 번, 동시에 요청해도 한 번만 조회)
+    - append()는 채워진 버퍼에만 추가 (아직 채우지 않은 회의실은 나중에 DB에서 함께 읽힘)
+    - DB를 읽는 동안 들어온 메시지는 따로 모았다가 키로 중복을 걸러 뒤에 붙임
+    - 워커 메모리에 보관하므로 REDIS_URL로 여러 워커를 쓰면 버퍼를 채운 뒤 다른 워커에서 보낸 메시지는 빠짐
+    """
+
+    def __init__(self, load: LoadHistory, size: int = CHAT_HISTORY_SIZE):
+        self.load = load
+        self.size = size
+        self._buffers: Dict[str, Deque[Dict]] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._pending: Dict[str, List[Tuple[Hashable, Dict]]] = {}
+        self.loads = 0
+
+    async def get(self, room_id: str) -> List[Dict]:
+        """최근 메시지 (오래된 순)"""
+        buffer = self._buffers.get(room_id)
+        if buffer is not None:
+            return list(buffer)
+        loading = self._loading.get(room_id)
+        if loading is None:
+            loading = self._loading[room_id] = asyncio.get_running_loop().create_future()
+            self._pending[room_id] = []
+            asyncio.ensure_future(self._seed(room_id, loading))
+        return list(await asyncio.shield(loading))
+
+    def append(self, room_id: str, key: Hashable, message: Dict):
+        """메시지 추가"""
+        buffer = self._buffers.get(room_id)
+        if buffer is not None:
+            buffer.append(message)
+            return
+        pending = self._pending.get(room_id)
+        if pending is not None:
+            pending.append((key, message))
+
+    def discard(self, room_id: str):
+        """회의실 버퍼 삭제"""
+        self._buffers.pop(room_id, None)
+
+    async def _seed(self, room_id: str, loading: asyncio.Future):
+        try:
+            rows = await self.load(room_id, self.size)
+        except Exception as e:
+            # 다음 조회에서 다시 시도 (그 사이 메시지는 DB에 기록되므로 버려도 됨)
+            logger.warning("채팅 기록 불러오기 실패: room=%s: %s", room_id, e)
+            self._pending.pop(room_id, None)
+            self._loading.pop(room_id, None)
+            loading.set_result(deque())
+            return
+        self.loads += 1
+        seen = {key for key, _ in rows}
+        buffer = deque((message for _, message in rows), maxlen=self.size)
+        for key, message in self._pending.pop(room_id, ()):
+            if key not in seen:
+                buffer.append(message)
+        self._buffers[room_id] = buffer
+        self._loading.pop(room_id, None)
+        loading.set_result(buffer)
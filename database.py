@@ -1,27 +1,96 @@
 """
 데이터베이스 모델 및 설정
 """
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import create_engine, event, Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, Table, select, func, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 import os
 
+from logger import get_logger
+
+logger = get_logger("database")
+
 # SQLite 또는 PostgreSQL 데이터베이스 URL 설정
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./zoom_clone.db")
 
+# SQLite 연결 설정 (연결마다 PRAGMA로 적용, 환경 변수로 조정 가능)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")  # WAL이면 쓰기 중에도 읽기가 막히지 않음
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # WAL에서 NORMAL은 체크포인트 때만 fsync
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))  # 잠금 대기 시간
+
+# PostgreSQL 등 서버 DB 커넥션 풀 설정 (엔진마다 적용: 동기 엔진 + 비동기 엔진)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # 유지할 연결 수
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))  # 풀이 가득 찼을 때 추가로 열 수 있는 연결 수
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # 연결을 얻기까지 최대 대기 시간 (초)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # 이 시간(초)이 지난 연결은 다시 연결 (-1이면 끔)
+DB_POOL_PRE_PING = int(os.getenv("DB_POOL_PRE_PING", "1"))  # 1이면 풀에서 꺼낼 때 끊긴 연결인지 확인
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _engine_options(url: str) -> dict:
+    """create_engine/create_async_engine 공통 옵션"""
+    if _is_sqlite(url):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": bool(DB_POOL_PRE_PING),
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """새 SQLite 연결에 WAL/synchronous/busy_timeout 적용 (aiosqlite 어댑터도 같은 커서 API 제공)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    finally:
+        cursor.close()
+
+
 # SQLite의 경우 connect_args 필요
-if DATABASE_URL.startswith("sqlite"):
+if _is_sqlite(DATABASE_URL):
     engine = create_engine(
         DATABASE_URL, 
         connect_args={"check_same_thread": False},
         echo=False
     )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 else:
     # PostgreSQL의 경우
-    engine = create_engine(DATABASE_URL, echo=False)
+    engine = create_engine(DATABASE_URL, echo=False, **_engine_options(DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def to_async_database_url(url: str) -> str:
+    """동기 드라이버 URL을 비동기 드라이버 URL로 변환 (sqlite → aiosqlite, postgresql → asyncpg)"""
+    if url.startswith("sqlite+aiosqlite:") or "+asyncpg" in url:
+        return url
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+# Socket.IO 핸들러용 비동기 엔진 (이벤트 루프를 블로킹하지 않음)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_database_url(DATABASE_URL))
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **_engine_options(ASYNC_DATABASE_URL))
+if _is_sqlite(ASYNC_DATABASE_URL):
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+# expire_on_commit=False: 커밋 후에도 속성 접근 시 추가 쿼리(lazy load)가 발생하지 않도록 함
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
 
@@ -54,6 +123,7 @@ class Meeting(Base):
     ended_at = Column(DateTime, nullable=True)
     duration_seconds = Column(Integer, nullable=True)
     is_active = Column(Boolean, default=True)
+    activated_at = Column(DateTime, nullable=True)  # 마지막으로 (다시) 활성화된 시각 (이전에 나간 참가자의 종료 기록은 무시)
 
     # 관계
     creator = relationship("User", foreign_keys=[created_by], back_populates="meetings")
@@ -77,6 +147,15 @@ class MeetingParticipant(Base):
     meeting = relationship("Meeting", back_populates="participants_rel")
     user = relationship("User", back_populates="participants")
 
+    __table_args__ = (
+        # 나감 처리: (meeting_id, username)의 가장 최근 참가 기록
+        Index("ix_meeting_participants_meeting_username_joined", "meeting_id", "username", "joined_at"),
+        # 회의 목록/권한 확인: 사용자가 참가한 회의
+        Index("ix_meeting_participants_user_meeting", "user_id", "meeting_id"),
+        # 참가자 목록: 회의별 참가 시간순 (keyset 커서 (joined_at, id))
+        Index("ix_meeting_participants_meeting_joined", "meeting_id", "joined_at", "id"),
+    )
+
 
 class MeetingEvent(Base):
     """회의 이벤트 모델 (채팅, 참가/나감 등)"""
@@ -94,10 +173,79 @@ class MeetingEvent(Base):
     # 관계
     meeting = relationship("Meeting", back_populates="events")
 
+    __table_args__ = (
+        # 타임라인: 회의별 시간순 (keyset 커서 (timestamp, id))
+        Index("ix_meeting_events_meeting_timestamp", "meeting_id", "timestamp", "id"),
+    )
+
+
+# 스키마 버전 (마이그레이션 적용 여부 기록)
+schema_version = Table(
+    "schema_version",
+    Base.metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+def _create_indexes(*indexes):
+    """없는 인덱스만 생성하는 마이그레이션"""
+    def migrate(connection):
+        for index in indexes:
+            index.create(connection, checkfirst=True)
+    return migrate
+
+
+def _add_columns(table, *names):
+    """없는 컬럼만 추가하는 마이그레이션 (nullable 컬럼)"""
+    def migrate(connection):
+        existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+        for name in names:
+            if name not in existing:
+                column_type = table.c[name].type.compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+    return migrate
+
+
+def _index(table, name):
+    return next(index for index in table.indexes if index.name == name)
+
+
+# 버전별 마이그레이션 (추가만 하고 기존 항목은 수정하지 않음)
+# create_all은 기존 테이블에 인덱스를 추가하지 않으므로 이미 운영 중인 DB는 여기서 반영
+MIGRATIONS = [
+    (1, "핫 쿼리용 복합 인덱스", _create_indexes(
+        _index(MeetingParticipant.__table__, "ix_meeting_participants_meeting_username_joined"),
+        _index(MeetingParticipant.__table__, "ix_meeting_participants_user_meeting"),
+        _index(MeetingEvent.__table__, "ix_meeting_events_meeting_timestamp"),
+    )),
+    (2, "참가자 목록 keyset 인덱스", _create_indexes(
+        _index(MeetingParticipant.__table__, "ix_meeting_participants_meeting_joined"),
+    )),
+    (3, "회의 활성화 시각", _add_columns(Meeting.__table__, "activated_at")),
+]
+
+
+def run_migrations(connection) -> int:
+    """아직 적용되지 않은 마이그레이션을 순서대로 실행하고 현재 버전 반환"""
+    current = connection.execute(select(func.max(schema_version.c.version))).scalar()
+    if current is None:
+        connection.execute(schema_version.insert().values(version=0))
+        current = 0
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        logger.debug("마이그레이션 적용: v%s %s", version, description)
+        migrate(connection)
+        connection.execute(schema_version.update().values(version=version))
+        current = version
+    return current
+
 
 def init_db():
-    """데이터베이스 초기화 (테이블 생성)"""
+    """데이터베이스 초기화 (테이블 생성 + 마이그레이션)"""
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        run_migrations(connection)
 
 
 def get_db():
@@ -107,3 +255,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """비동기 데이터베이스 세션 의존성"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,189 @@
+"""
+회의실 파일 공유 (이어 올리기 가능한 청크 업로드)
+- 업로드는 요청 본문을 받는 대로 aiofiles로 디스크에 기록하므로 파일 전체를 메모리에 올리지 않음
+- 청크마다 Content-Range(bytes 시작-끝/전체)로 위치를 지정하고, 끊기면 저장된 offset부터 다시 보냄
+- 파일 정보는 RoomStore(set_file/get_file/list_files)에 회의실별로 보관
+- 받는 동안 sha256을 이어서 계산하고, 다 받으면 BlobStore에 내용 주소로 저장 (같은 내용은 한 벌만 보관)
+- 다운로드는 FileResponse가 Range 요청과 서버가 지원하는 경우 zero-copy 전송(pathsend)을 처리
+"""
+import hashlib
+import os
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+import aiofiles
+import aiofiles.os
+
+from blob_store import BlobStore
+from logger import get_logger
+
+logger = get_logger("file_share")
+
+# 설정 (환경 변수로 조정 가능)
+FILE_MAX_BYTES = int(os.getenv("FILE_MAX_BYTES", str(500 * 1024 * 1024)))  # 파일 하나의 최대 크기
+FILE_CHUNK_BYTES = int(os.getenv("FILE_CHUNK_BYTES", str(8 * 1024 * 1024)))  # 요청 하나로 받을 최대 청크 크기
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+_MAX_FILENAME_LENGTH = 255
+
+
+class UploadConflict(Exception):
+    """청크 위치가 저장된 offset과 다르거나 같은 파일에 다른 업로드가 진행 중"""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+def parse_content_range(header: Optional[str]) -> Optional[Tuple[int, int, Optional[int]]]:
+    """Content-Range: bytes 시작-끝/전체 → (시작, 끝(포함), 전체 또는 None), 헤더가 없으면 None"""
+    if not header:
+        return None
+    match = _CONTENT_RANGE.match(header.strip())
+    if match is None:
+        raise ValueError("Content-Range 형식이 올바르지 않습니다")
+    start, end = int(match.group(1)), int(match.group(2))
+    total = None if match.group(3) == "*" else int(match.group(3))
+    if end < start or (total is not None and end >= total):
+        raise ValueError("Content-Range 범위가 올바르지 않습니다")
+    return start, end, total
+
+
+def clean_filename(filename: str) -> str:
+    """표시용 파일 이름 (경로 구분자/제어 문자 제거, 디스크에는 file_id로만 저장)"""
+    name = os.path.basename(filename.replace("\\", "/")).strip()
+    name = "".join(ch for ch in name if ch.isprintable())
+    return name[:_MAX_FILENAME_LENGTH] or "file"
+
+
+class FileShare:
+    """
+    업로드 세션과 파일 경로 관리
+
+    - create(): 파일 정보 생성 및 빈 .part 파일 준비
+    - write_chunk(): offset 위치부터 본문 스트림을 이어 씀 (다 받으면 .part를 blob으로 이동하거나 중복이면 삭제)
+    - 같은 워커에서는 파일마다 한 번에 한 요청만 쓰고, 위치가 맞지 않는 청크는 UploadConflict
+    """
+
+    def __init__(self, store, directory: Path, blobs: BlobStore,
+                 max_bytes: int = FILE_MAX_BYTES, chunk_bytes: int = FILE_CHUNK_BYTES):
+        self.store = store
+        self.directory = directory
+        self.blobs = blobs
+        self.max_bytes = max_bytes
+        self.chunk_bytes = chunk_bytes
+        self._writing: Set[str] = set()  # 청크를 받고 있는 file_id
+
+    def file_path(self, info: Dict) -> Path:
+        """다운로드할 파일 경로 (완료된 파일의 blob)"""
+        return self.blobs.path(info["sha256"])
+
+    def part_path(self, file_id: str) -> Path:
+        return self.directory / f"{file_id}.part"
+
+    async def create(self, room_id: str, filename: str, size: int, content_type: Optional[str], uploaded_by: str,
+                     sha256: Optional[str] = None) -> Dict:
+        """
+        업로드 시작
+
+        sha256을 함께 보냈고 같은 회의실에 그 내용의 파일이 이미 있으면 본문을 받지 않고 바로 완료
+        (다른 회의실의 blob은 해시만 알아도 받을 수 있게 되므로 같은 회의실로 한정)
+        """
+        if size < 0 or size > self.max_bytes:
+            raise ValueError(f"파일 크기는 {self.max_bytes}바이트 이하여야 합니다")
+        file_id = uuid.uuid4().hex
+        info = {
+            "file_id": file_id,
+            "room_id": room_id,
+            "filename": clean_filename(filename),
+            "content_type": content_type or "application/octet-stream",
+            "size": size,
+            "offset": 0,
+            "complete": False,
+            "uploaded_by": uploaded_by,
+            "created_at": datetime.now().isoformat(),
+        }
+        if sha256 and await self._reuse(room_id, size, sha256.lower()):
+            info["sha256"] = sha256.lower()
+            info["offset"] = size
+            info["complete"] = True
+            logger.info("같은 내용의 파일이 있어 업로드 생략: %s (%s)", file_id, info["filename"])
+            await self.store.set_file(file_id, info)
+            return info
+        async with aiofiles.open(self.part_path(file_id), "wb"):
+            pass
+        if size == 0:
+            await self._complete(info, hashlib.sha256())
+        await self.store.set_file(file_id, info)
+        return info
+
+    async def _reuse(self, room_id: str, size: int, sha256: str) -> bool:
+        """같은 회의실의 완료된 파일 중 sha256이 같은 blob에 참조 추가"""
+        for other in await self.store.list_files(room_id):
+            if other.get("complete") and other.get("sha256") == sha256 and other["size"] == size:
+                return await self.blobs.add_ref(sha256)
+        return False
+
+    async def _complete(self, info: Dict, hasher):
+        """다 받은 .part 파일을 blob으로 저장"""
+        file_id = info["file_id"]
+        digest = hasher.hexdigest()
+        duplicate = await self.blobs.commit(file_id, self.part_path(file_id), digest)
+        info["sha256"] = digest
+        info["complete"] = True
+        logger.info("파일 업로드 완료: %s (%s, %s바이트, %s)", file_id, info["filename"], info["size"],
+                    "기존 blob 사용" if duplicate else "새 blob")
+
+    async def write_chunk(self, info: Dict, start: int, chunks: AsyncIterator[bytes]) -> Dict:
+        """
+        start 위치부터 청크 기록 (반환: 갱신된 파일 정보)
+
+        요청이 도중에 끊겨도 실제로 기록한 만큼 offset을 갱신해 그 위치부터 이어 올릴 수 있음
+        """
+        file_id = info["file_id"]
+        if file_id in self._writing:
+            raise UploadConflict("같은 파일의 다른 청크를 받는 중입니다", info["offset"])
+        self._writing.add(file_id)
+        try:
+            info = await self.store.get_file(file_id) or info
+            if info["complete"]:
+                raise UploadConflict("이미 업로드가 끝난 파일입니다", info["offset"])
+            if start != info["offset"]:
+                raise UploadConflict("청크 시작 위치가 저장된 위치와 다릅니다", info["offset"])
+            limit = min(info["size"] - start, self.chunk_bytes)
+            hasher = await self.blobs.hasher(file_id, self.part_path(file_id), start)
+            written = 0
+            try:
+                async with aiofiles.open(self.part_path(file_id), "r+b") as f:
+                    await f.seek(start)
+                    async for chunk in chunks:
+                        if not chunk:
+                            continue
+                        if written + len(chunk) > limit:
+                            raise ValueError(f"청크가 남은 크기 또는 {self.chunk_bytes}바이트를 넘습니다")
+                        await f.write(chunk)
+                        hasher.update(chunk)
+                        written += len(chunk)
+            finally:
+                info["offset"] = start + written
+                self.blobs.advance(file_id, hasher, info["offset"])
+                if info["offset"] == info["size"]:
+                    await self._complete(info, hasher)
+                await self.store.set_file(file_id, info)
+            return info
+        finally:
+            self._writing.discard(file_id)
+
+    async def remove(self, info: Dict):
+        """파일 정보 삭제 (blob은 참조 수만 줄이고 GC가 삭제)"""
+        await self.store.remove_file(info["file_id"])
+        self.blobs.forget(info["file_id"])
+        if info.get("sha256"):
+            await self.blobs.release(info["sha256"])
+        try:
+            await aiofiles.os.remove(self.part_path(info["file_id"]))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,83 @@
+"""
+ICE candidate 묶음 전송
+같은 (보낸 sid, 받는 sid) 쌍의 candidate를 짧은 시간 동안 모았다가 ice-candidates 프레임 하나로 전송
+"""
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from logger import get_logger
+
+logger = get_logger("ice_batch")
+
+# 묶음 전송 설정 (환경 변수로 조정 가능, 0이면 묶지 않고 바로 전송)
+ICE_BATCH_WINDOW_MS = int(os.getenv("ICE_BATCH_WINDOW_MS", "20"))  # 첫 candidate 이후 모으는 시간
+ICE_BATCH_MAX = int(os.getenv("ICE_BATCH_MAX", "32"))  # 이 개수가 모이면 기다리지 않고 전송
+
+Pair = Tuple[str, str]
+SendBatch = Callable[[str, str, List[Dict]], Awaitable[None]]
+
+
+class IceCandidateBatcher:
+    """
+    (보낸 sid, 받는 sid) 쌍별 candidate 버퍼
+
+    - add()는 버퍼에 넣고 바로 반환하며, 쌍의 첫 candidate 이후 window가 지나거나 max_batch개가 모이면 전송
+    - 전송은 send(from_sid, to_sid, candidates) 콜백으로 수행
+    - 연결이 끊긴 sid의 버퍼는 discard()로 버림
+    """
+
+    def __init__(self, send: SendBatch, window: float = ICE_BATCH_WINDOW_MS / 1000, max_batch: int = ICE_BATCH_MAX):
+        self.send = send
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[Pair, List[Dict]] = {}
+        self._timers: Dict[Pair, asyncio.Task] = {}
+        self.frames_sent = 0
+        self.candidates_sent = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    async def add(self, from_sid: str, to_sid: str, candidate: Dict):
+        """candidate 추가 (가득 차면 즉시 전송)"""
+        pair = (from_sid, to_sid)
+        candidates = self._pending.setdefault(pair, [])
+        candidates.append(candidate)
+        if len(candidates) >= self.max_batch:
+            await self.flush(pair)
+        elif pair not in self._timers:
+            self._timers[pair] = asyncio.create_task(self._flush_later(pair))
+
+    async def flush(self, pair: Pair):
+        """쌍의 버퍼를 바로 전송"""
+        timer = self._timers.pop(pair, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+        candidates = self._pending.pop(pair, None)
+        if not candidates:
+            return
+        self.frames_sent += 1
+        self.candidates_sent += len(candidates)
+        try:
+            await self.send(pair[0], pair[1], candidates)
+        except Exception as e:
+            logger.warning("ICE candidate 묶음 전송 실패: %s -> %s (%s건): %s", pair[0], pair[1], len(candidates), e)
+
+    async def flush_all(self):
+        """모든 버퍼 전송 (종료 시)"""
+        for pair in list(self._pending):
+            await self.flush(pair)
+
+    def discard(self, sid: str):
+        """sid가 보내거나 받을 버퍼 삭제 (연결 해제 시)"""
+        for pair in [pair for pair in self._pending if sid in pair]:
+            self._pending.pop(pair, None)
+            timer = self._timers.pop(pair, None)
+            if timer is not None:
+                timer.cancel()
+
+    async def _flush_later(self, pair: Pair):
+        await asyncio.sleep(self.window)
+        await self.flush(pair)
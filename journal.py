@@ -0,0 +1,327 @@
+"""
+회의 이벤트 write-behind 저널
+MeetingEvent / MeetingParticipant 쓰기와 회의 종료를 메모리에 모아 두었다가 일괄 커밋
+"""
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, or_, select
+
+from database import AsyncSessionLocal, Meeting, MeetingParticipant, MeetingEvent
+from logger import get_logger
+
+logger = get_logger("journal")
+
+# 저널 설정 (환경 변수로 조정 가능)
+JOURNAL_MAX_BATCH = int(os.getenv("JOURNAL_MAX_BATCH", "500"))  # 한 번에 커밋할 최대 작업 수
+JOURNAL_FLUSH_INTERVAL_MS = int(os.getenv("JOURNAL_FLUSH_INTERVAL_MS", "50"))  # 최대 대기 시간
+JOURNAL_MAX_PENDING = int(os.getenv("JOURNAL_MAX_PENDING", "10000"))  # 버퍼 상한 (초과 시 생산자 대기)
+
+# 작업 종류
+OP_EVENT = "event"
+OP_JOIN = "join"
+OP_LEAVE = "leave"
+OP_MEETING_END = "meeting_end"
+_OP_FLUSH = "flush"
+_OP_STOP = "stop"
+
+# 참가 시간으로 찾는 나감 기록 (배치의 나감을 한 번의 executemany로 갱신, 인덱스 meeting_id/username/joined_at 사용)
+_participants = MeetingParticipant.__table__
+_LEAVE_UPDATE = (
+    _participants.update()
+    .where(
+        _participants.c.meeting_id == bindparam("b_meeting_id"),
+        _participants.c.username == bindparam("b_username"),
+        _participants.c.joined_at == bindparam("b_joined_at"),
+        _participants.c.left_at.is_(None),
+    )
+    .values(left_at=bindparam("b_left_at"), duration_seconds=bindparam("b_duration"))
+)
+
+# 회의 종료 (다른 워커가 그 사이에 다시 활성화했거나 아직 나가지 않은 참가자가 있으면 DB에서 건너뜀)
+# 활성화 이전 참가 기록은 비정상 종료로 남은 행일 수 있으므로 활성화 이후 참가만 확인
+_meetings = Meeting.__table__
+_MEETING_END = (
+    _meetings.update()
+    .where(
+        _meetings.c.id == bindparam("b_meeting_id"),
+        _meetings.c.is_active.is_(True),
+        or_(_meetings.c.activated_at.is_(None), _meetings.c.activated_at <= bindparam("b_ended_at")),
+        ~select(_participants.c.id).where(
+            _participants.c.meeting_id == _meetings.c.id,
+            _participants.c.left_at.is_(None),
+            or_(_meetings.c.activated_at.is_(None), _participants.c.joined_at >= _meetings.c.activated_at),
+        ).exists(),
+    )
+    .values(is_active=False, ended_at=bindparam("b_ended_at"), duration_seconds=bindparam("b_duration"))
+)
+
+
+class EventJournal:
+    """
+    write-behind 이벤트 저널
+
+    - record_* 호출은 메모리 큐에 작업을 넣고 바로 반환 (DB 커밋을 기다리지 않음)
+    - 백그라운드 작업이 max_batch개가 모이거나 flush_interval이 지나면 한 트랜잭션으로 커밋
+    - 큐는 max_pending으로 제한되며, 가득 차면 record_*가 자리가 날 때까지 대기 (back-pressure)
+    - stop() 호출 시 남은 작업을 모두 기록한 뒤 종료
+    - 백그라운드 작업이 죽으면 다음 record_*/flush/stop이 같은 큐로 다시 시작 (쌓인 작업을 버리지 않음)
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        max_batch: int = JOURNAL_MAX_BATCH,
+        flush_interval: float = JOURNAL_FLUSH_INTERVAL_MS / 1000,
+        max_pending: int = JOURNAL_MAX_PENDING,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.committed_ops = 0
+        self.failed_ops = 0
+
+    @property
+    def pending(self) -> int:
+        """아직 커밋되지 않은 작업 수"""
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self):
+        """백그라운드 기록 작업 시작 (이전 작업이 죽었으면 남은 큐를 그대로 이어서 처리)"""
+        if self._task and not self._task.done():
+            return
+        if self._task is not None and not self._task.cancelled() and self._task.exception() is not None:
+            logger.error("이벤트 저널 작업 재시작 (대기 중인 작업 %s건): %s", self.pending, self._task.exception())
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._batch_ready = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """남은 작업을 모두 기록하고 종료 (종료 시 반드시 호출)"""
+        if self._task is None or (self._task.done() and not self.pending):
+            return
+        await self._put((_OP_STOP, None))
+        task = self._task
+        await task
+        self._task = None
+
+    async def flush(self):
+        """지금까지 넣은 작업이 모두 커밋될 때까지 대기 (그 사이 백그라운드 작업이 끝나면 바로 반환)"""
+        if self._task is None or (self._task.done() and not self.pending):
+            return
+        done = asyncio.get_running_loop().create_future()
+        await self._put((_OP_FLUSH, done))
+        task = self._task
+        await asyncio.wait([done, task], return_when=asyncio.FIRST_COMPLETED)
+        if not done.done():
+            done.cancel()
+
+    async def record_event(
+        self,
+        meeting_id: int,
+        event_type: str,
+        user_id: Optional[int] = None,
+        username: Optional[str] = None,
+        message: Optional[str] = None,
+        data: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ):
+        """MeetingEvent 추가 예약"""
+        await self._put((OP_EVENT, {
+            "meeting_id": meeting_id,
+            "event_type": event_type,
+            "user_id": user_id,
+            "username": username,
+            "message": message,
+            "data": data,
+            "timestamp": timestamp or datetime.utcnow(),
+        }))
+
+    async def record_join(
+        self,
+        meeting_id: int,
+        username: str,
+        user_id: Optional[int] = None,
+        joined_at: Optional[datetime] = None,
+    ):
+        """MeetingParticipant 추가 예약"""
+        await self._put((OP_JOIN, {
+            "meeting_id": meeting_id,
+            "user_id": user_id,
+            "username": username,
+            "joined_at": joined_at or datetime.utcnow(),
+        }))
+
+    async def record_leave(
+        self,
+        meeting_id: int,
+        username: str,
+        joined_at: Optional[datetime] = None,
+        left_at: Optional[datetime] = None,
+    ):
+        """
+        MeetingParticipant의 나감 시간 기록 예약
+
+        joined_at(record_join에 넘긴 참가 시간)이 있으면 그 행을 조회 없이 바로 UPDATE,
+        없으면 가장 최근 참가 기록을 조회해서 갱신
+        """
+        await self._put((OP_LEAVE, {
+            "meeting_id": meeting_id,
+            "username": username,
+            "joined_at": joined_at,
+            "left_at": left_at or datetime.utcnow(),
+        }))
+
+    async def record_meeting_end(self, meeting_id: int, ended_at: Optional[datetime] = None):
+        """
+        회의 종료(is_active/ended_at/duration_seconds) 기록 예약 (같은 배치의 나감 기록 뒤에 처리)
+
+        ended_at은 마지막 참가자를 방에서 빼기 전 시각 (그 뒤에 다시 활성화된 회의는 끝내지 않음)
+        """
+        await self._put((OP_MEETING_END, {
+            "meeting_id": meeting_id,
+            "ended_at": ended_at or datetime.utcnow(),
+        }))
+
+    async def _put(self, op: Tuple[str, object]):
+        if not self._task or self._task.done():
+            await self.start()
+        # 큐가 가득 차면 여기서 대기 (back-pressure)
+        await self._queue.put(op)
+        if op[0] in (_OP_FLUSH, _OP_STOP) or self._queue.qsize() >= self.max_batch:
+            self._batch_ready.set()
+
+    async def _run(self):
+        """배치 수집 및 커밋 루프"""
+        stopping = False
+        while not stopping:
+            batch = [await self._queue.get()]
+            # 이미 들어온 작업을 꺼내기 전에 알림을 지움 (그 뒤에 들어온 flush/stop은 다시 알림)
+            self._batch_ready.clear()
+            self._drain(batch)
+            # 크기 임계값에 도달하지 않았고 flush/stop도 없으면 시간 임계값까지 더 모음
+            if len(batch) < self.max_batch and all(op[0] not in (_OP_FLUSH, _OP_STOP) for op in batch):
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._drain(batch)
+            stopping = await self._process(batch)
+            if stopping:
+                # 종료 요청 이후 들어온 작업까지 모두 기록
+                while not self._queue.empty():
+                    rest = []
+                    self._drain(rest)
+                    await self._process(rest)
+
+    def _drain(self, batch: List[Tuple[str, object]]):
+        """큐에 있는 작업을 max_batch개까지 배치에 추가"""
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _process(self, batch: List[Tuple[str, object]]) -> bool:
+        """
+        배치의 작업을 기록한 뒤 flush 대기를 풀어줌 (반환: 종료 요청이 있었는지)
+
+        예상하지 못한 오류도 이 배치만 실패로 처리해서 루프가 죽지 않게 하고, 취소되어도 flush 대기는 풀어줌
+        """
+        stopping = False
+        ops = [op for op in batch if op[0] not in (_OP_FLUSH, _OP_STOP)]
+        try:
+            if ops:
+                await self._write(ops)
+        except Exception as e:
+            logger.exception("이벤트 저널 배치 처리 실패 (%s건): %s", len(ops), e)
+            self.failed_ops += len(ops)
+        finally:
+            for kind, payload in batch:
+                if kind == _OP_FLUSH and not payload.done():
+                    payload.set_result(None)
+                elif kind == _OP_STOP:
+                    stopping = True
+        return stopping
+
+    async def _write(self, ops: List[Tuple[str, Dict]]):
+        """작업 묶음을 하나의 트랜잭션으로 커밋"""
+        async with self.session_factory() as db:
+            try:
+                # 같은 배치 안에서 참가 후 바로 나간 경우를 위해 추가한 참가자 객체를 추적
+                joined: Dict[Tuple[int, str], MeetingParticipant] = {}
+                leaves: List[Dict] = []
+                ended: Dict[int, datetime] = {}
+                for kind, fields in ops:
+                    if kind == OP_EVENT:
+                        db.add(MeetingEvent(**fields))
+                    elif kind == OP_JOIN:
+                        participant = MeetingParticipant(**fields)
+                        db.add(participant)
+                        joined[(fields["meeting_id"], fields["username"])] = participant
+                    elif kind == OP_MEETING_END:
+                        ended[fields["meeting_id"]] = fields["ended_at"]
+                    elif kind == OP_LEAVE:
+                        key = (fields["meeting_id"], fields["username"])
+                        participant = joined.get(key)
+                        joined_at = fields["joined_at"]
+                        if participant is not None and joined_at is not None and participant.joined_at != joined_at:
+                            participant = None
+                        if participant is None and joined_at is not None:
+                            leaves.append({
+                                "b_meeting_id": fields["meeting_id"],
+                                "b_username": fields["username"],
+                                "b_joined_at": joined_at,
+                                "b_left_at": fields["left_at"],
+                                "b_duration": int((fields["left_at"] - joined_at).total_seconds()),
+                            })
+                            continue
+                        if participant is None:
+                            result = await db.execute(
+                                select(MeetingParticipant).where(
+                                    MeetingParticipant.meeting_id == fields["meeting_id"],
+                                    MeetingParticipant.username == fields["username"]
+                                ).order_by(MeetingParticipant.joined_at.desc()).limit(1)
+                            )
+                            participant = result.scalars().first()
+                        if participant is None:
+                            logger.warning("참가자 정보를 찾을 수 없음: username=%s, meeting_id=%s", fields['username'], fields['meeting_id'])
+                        elif not participant.left_at:
+                            participant.left_at = fields["left_at"]
+                            if participant.joined_at:
+                                duration = (fields["left_at"] - participant.joined_at).total_seconds()
+                                participant.duration_seconds = int(duration)
+                if leaves:
+                    await db.execute(_LEAVE_UPDATE, leaves)
+                if ended:
+                    await self._end_meetings(db, ended)
+                await db.commit()
+                self.committed_ops += len(ops)
+            except Exception as e:
+                logger.exception("이벤트 저널 커밋 실패 (%s건): %s", len(ops), e)
+                await db.rollback()
+                self.failed_ops += len(ops)
+
+    @staticmethod
+    async def _end_meetings(db, ended: Dict[int, datetime]):
+        """
+        배치의 회의 종료를 한 번의 조회와 한 번의 executemany로 처리
+
+        종료 여부는 UPDATE 조건(_MEETING_END)으로 DB에서 판단하므로 여러 워커가 같은 회의를 써도
+        다른 워커의 참가 뒤에 커밋된 종료가 회의를 끝내지 않음 (이미 끝난 회의도 건너뜀)
+        """
+        await db.flush()
+        result = await db.execute(
+            select(Meeting.id, Meeting.started_at).where(Meeting.id.in_(ended), Meeting.is_active.is_(True))
+        )
+        params = [{
+            "b_meeting_id": meeting_id,
+            "b_ended_at": ended[meeting_id],
+            "b_duration": int((ended[meeting_id] - started_at).total_seconds()) if started_at else None,
+        } for meeting_id, started_at in result]
+        if params:
+            await db.execute(_MEETING_END, params)
@@ -0,0 +1,111 @@
+"""
+구조화 로깅 설정
+로그 레코드는 큐에 넣기만 하고 별도 스레드(QueueListener)가 출력하므로 요청 처리 경로에서 stdout I/O를 하지 않음
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# 로깅 설정 (환경 변수로 조정 가능)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # DEBUG로 설정하면 시그널링 상세 로그 출력
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # text 또는 json (한 줄에 JSON 객체 하나)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # 큐가 가득 차면 해당 로그는 버림
+
+ROOT_LOGGER = "zoom"
+
+# extra로 넘긴 필드를 구분하기 위한 LogRecord 기본 속성
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[QueueHandler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 포맷 (extra 필드 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    큐가 가득 차면 기다리지 않고 버리는 QueueHandler
+
+    메시지 포맷팅(% 치환)은 레벨을 통과한 레코드에만 한 번 수행하고, 출력 형식은 리스너 쪽 포맷터에 맡김
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    """zoom.* 로거에 큐 기반 핸들러 설정 (여러 번 호출해도 한 번만 적용)"""
+    global _listener, _handler
+    if _listener is not None:
+        return
+    if fmt == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    _handler = _NonBlockingQueueHandler(log_queue)
+    root.addHandler(_handler)
+    root.propagate = False
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 출력하고 리스너 종료"""
+    global _listener, _handler
+    if _listener is not None:
+        logging.getLogger(ROOT_LOGGER).removeHandler(_handler)
+        _listener.stop()
+        _listener = None
+        _handler = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """모듈별 로거 (zoom.<name>)"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,122 @@
+"""
+방 없는 직접 연결(start_connection)용 매칭 엔진
+자동 매칭용 FIFO 큐와 대상 사용자별 대기 인덱스로 매칭/취소를 O(1)에 처리
+"""
+import itertools
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class Waiter:
+    """매칭 대기 중인 연결"""
+
+    __slots__ = ("sid", "username", "target_username", "seq")
+
+    def __init__(self, sid: str, username: str, target_username: Optional[str] = None, seq: int = 0):
+        self.sid = sid
+        self.username = username
+        self.target_username = target_username  # None이면 아무나와 자동 매칭
+        self.seq = seq  # 대기 시작 순번 (작을수록 먼저 기다린 연결)
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Waiter":
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+
+def _head(queue: Optional[OrderedDict]) -> Optional[Waiter]:
+    """큐의 가장 오래된 대기자 (O(1))"""
+    if not queue:
+        return None
+    return next(iter(queue.values()))
+
+
+def _earliest(*candidates: Optional[Waiter]) -> Optional[Waiter]:
+    """먼저 기다리기 시작한 대기자 선택 (공정한 순서)"""
+    found = [waiter for waiter in candidates if waiter is not None]
+    return min(found, key=lambda waiter: waiter.seq) if found else None
+
+
+class Matchmaker:
+    """
+    단일 프로세스 매칭 엔진
+
+    대기자는 sid로 구분되므로 같은 이름의 사용자가 여러 명이어도 서로 덮어쓰지 않음
+
+    - anonymous: 대상 없이 기다리는 대기자 FIFO
+    - by_target[T]: T를 기다리는 대기자 FIFO
+    - by_pair[(이름, 대상)]: 특정 이름의 대기자를 대상별로 나눈 FIFO (지정 연결 시 사용)
+
+    매칭 규칙
+    - 자동 매칭: 대상 없는 대기자 또는 나를 기다리는 대기자 중 가장 오래 기다린 사람
+    - 지정 연결(T): 이름이 T이고, 대상이 없거나 나를 기다리는 대기자 중 가장 오래 기다린 사람
+      (예전에는 이름만 T면 다른 사람을 기다리던 대기자도 가로챘지만, 이제는 그 대기자를 건드리지 않고 대기열에 추가)
+    """
+
+    def __init__(self):
+        self._seq = itertools.count(1)
+        self.waiters: Dict[str, Waiter] = {}
+        self.anonymous: "OrderedDict[str, Waiter]" = OrderedDict()
+        self.by_target: Dict[str, "OrderedDict[str, Waiter]"] = {}
+        self.by_pair: Dict[Tuple[str, Optional[str]], "OrderedDict[str, Waiter]"] = {}
+
+    def __len__(self) -> int:
+        return len(self.waiters)
+
+    def __contains__(self, sid: str) -> bool:
+        return sid in self.waiters
+
+    def find_match(self, username: str, target_username: Optional[str] = None) -> Optional[Waiter]:
+        """매칭 가능한 대기자 조회 (큐에서 제거하지 않음)"""
+        if target_username:
+            return _earliest(
+                _head(self.by_pair.get((target_username, None))),
+                _head(self.by_pair.get((target_username, username))),
+            )
+        return _earliest(_head(self.anonymous), _head(self.by_target.get(username)))
+
+    def match_or_wait(self, sid: str, username: str, target_username: Optional[str] = None) -> Optional[Waiter]:
+        """
+        매칭 상대가 있으면 대기열에서 꺼내 반환하고, 없으면 대기열에 추가한 뒤 None 반환
+        """
+        # 같은 sid가 다시 요청한 경우 이전 대기 취소
+        self.cancel(sid)
+        matched = self.find_match(username, target_username)
+        if matched is not None:
+            self.cancel(matched.sid)
+            return matched
+        self.add(Waiter(sid, username, target_username or None))
+        return None
+
+    def add(self, waiter: Waiter):
+        """대기열에 추가"""
+        if not waiter.seq:
+            waiter.seq = next(self._seq)
+        self.waiters[waiter.sid] = waiter
+        if waiter.target_username is None:
+            self.anonymous[waiter.sid] = waiter
+        else:
+            self.by_target.setdefault(waiter.target_username, OrderedDict())[waiter.sid] = waiter
+        self.by_pair.setdefault((waiter.username, waiter.target_username), OrderedDict())[waiter.sid] = waiter
+
+    def cancel(self, sid: str) -> Optional[Waiter]:
+        """대기 취소 (연결 해제 시 호출)"""
+        waiter = self.waiters.pop(sid, None)
+        if waiter is None:
+            return None
+        if waiter.target_username is None:
+            self.anonymous.pop(sid, None)
+        else:
+            self._discard(self.by_target, waiter.target_username, sid)
+        self._discard(self.by_pair, (waiter.username, waiter.target_username), sid)
+        return waiter
+
+    @staticmethod
+    def _discard(index: Dict, key, sid: str):
+        queue = index.get(key)
+        if queue is not None:
+            queue.pop(sid, None)
+            if not queue:
+                del index[key]
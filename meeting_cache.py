@@ -0,0 +1,75 @@
+"""
+회의실 ID → 회의(Meeting) ID 캐시
+참가할 때마다 DB에서 회의를 찾지 않도록 진행 중인 회의의 ID를 메모리에 보관
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+from logger import get_logger
+
+logger = get_logger("meeting_cache")
+
+# 회의를 만들거나 다시 활성화하고 meeting_id를 반환 (한 트랜잭션)
+Activate = Callable[[], Awaitable[int]]
+
+
+class MeetingCache:
+    """
+    진행 중인 회의의 room_id → meeting_id
+
+    - resolve()는 캐시에 있으면 DB 없이 바로 반환, 없으면 activate()로 회의를 만들거나 다시 활성화
+    - 같은 회의실에 동시에 들어온 참가는 진행 중인 activate() 하나를 함께 기다림 (회의실당 한 번만 실행)
+    - 회의가 끝나면 discard()로 지워서 다음 참가가 회의를 다시 활성화하도록 함
+    - 워커 메모리에 보관하므로 REDIS_URL로 여러 워커를 쓰면 다른 워커에서 끝난 회의를 모를 수 있음
+      (호출하는 쪽에서 방에 다른 참가자가 있을 때만 reuse=True로 캐시를 씀)
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._activating: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.activations = 0
+
+    def get(self, room_id: str) -> Optional[int]:
+        """캐시된 meeting_id (없으면 None)"""
+        return self._ids.get(room_id)
+
+    async def resolve(self, room_id: str, activate: Activate, reuse: bool = True) -> int:
+        """
+        회의실의 meeting_id
+
+        reuse=False면 캐시를 건너뛰고 activate()를 실행 (회의가 끝났을 수 있는 경우)
+        """
+        if reuse:
+            meeting_id = self._ids.get(room_id)
+            if meeting_id is not None:
+                self.hits += 1
+                return meeting_id
+        activating = self._activating.get(room_id)
+        if activating is not None:
+            meeting_id = await asyncio.shield(activating)
+            if meeting_id is not None:
+                return meeting_id
+            # 먼저 실행한 쪽이 실패하면 직접 다시 시도
+            return await self._activate(room_id, activate)
+        activating = self._activating[room_id] = asyncio.get_running_loop().create_future()
+        try:
+            meeting_id = await self._activate(room_id, activate)
+        except BaseException:
+            activating.set_result(None)
+            raise
+        finally:
+            self._activating.pop(room_id, None)
+        activating.set_result(meeting_id)
+        return meeting_id
+
+    def discard(self, room_id: str):
+        """회의 종료 시 캐시에서 삭제"""
+        self._ids.pop(room_id, None)
+
+    async def _activate(self, room_id: str, activate: Activate) -> int:
+        meeting_id = await activate()
+        self.activations += 1
+        self._ids[room_id] = meeting_id
+        logger.debug("회의 활성화: room_id=%s, meeting_id=%s", room_id, meeting_id)
+        return meeting_id
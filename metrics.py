@@ -0,0 +1,317 @@
+"""
+Prometheus 텍스트 형식 메트릭
+외부 의존성 없이 카운터/게이지/히스토그램을 제공하고 Socket.IO 핸들러, emit, DB 세션, 이벤트 루프 지연을 계측
+"""
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from logger import get_logger
+
+logger = get_logger("metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 지연 시간(초) 버킷
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# emit 수신자 수 버킷
+FANOUT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """라벨별 값을 가진 메트릭 공통 부분"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple, object] = {}
+
+    def labels(self, *values):
+        """라벨 값에 해당하는 자식 메트릭 (없으면 생성)"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        return self.labels()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> Iterable[str]:
+        yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self, lock: threading.Lock):
+        self.value = 0
+        self._lock = lock
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value(self._lock)
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    """현재 값 게이지"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value(self._lock)
+
+    def set(self, value: float):
+        self._default().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...], lock: threading.Lock):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = lock
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets, self._lock)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def _render_child(self, values, child) -> Iterable[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, ("le", _format_value(float(bound))))
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = _format_labels(self.labelnames, values)
+        yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+        yield f"{self.name}_count{labels} {child.count}"
+
+
+class Registry:
+    """메트릭 모음 (텍스트 형식 출력)"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Socket.IO 핸들러
+SIO_EVENTS = REGISTRY.register(Counter(
+    "zoom_sio_events_total", "처리한 Socket.IO 이벤트 수", ("event",)))
+SIO_EVENT_ERRORS = REGISTRY.register(Counter(
+    "zoom_sio_event_errors_total", "예외로 끝난 Socket.IO 이벤트 수", ("event",)))
+SIO_EVENT_DURATION = REGISTRY.register(Histogram(
+    "zoom_sio_event_duration_seconds", "Socket.IO 핸들러 처리 시간", ("event",)))
+SIO_EMIT_RECIPIENTS = REGISTRY.register(Histogram(
+    "zoom_sio_emit_recipients", "emit 한 번의 수신자 수 (이 워커 기준)", ("event",), FANOUT_BUCKETS))
+SIO_RELAY_REJECTED = REGISTRY.register(Counter(
+    "zoom_sio_relay_rejected_total", "검증에 실패해 전달하지 않은 시그널링 메시지 수", ("event", "reason")))
+SIO_RATE_LIMITED = REGISTRY.register(Counter(
+    "zoom_sio_rate_limited_total", "속도 제한으로 버리거나 합친 이벤트 수", ("event", "action")))
+SIO_SLOW_CONSUMER_SKIPS = REGISTRY.register(Counter(
+    "zoom_sio_slow_consumer_skips_total", "송신 대기열이 밀린 수신자를 건너뛴 횟수", ("event",)))
+
+# DB 세션
+DB_TRANSACTION_DURATION = REGISTRY.register(Histogram(
+    "zoom_db_transaction_duration_seconds", "세션 트랜잭션 시작부터 종료까지 시간 (커넥션 점유 시간)", ("session",)))
+DB_COMMIT_DURATION = REGISTRY.register(Histogram(
+    "zoom_db_commit_duration_seconds", "세션 커밋 시간", ("session",)))
+
+# 이벤트 루프
+EVENT_LOOP_LAG = REGISTRY.register(Histogram(
+    "zoom_event_loop_lag_seconds", "이벤트 루프 지연 (예정 시각 대비 늦게 깨어난 시간)"))
+
+# 현재 상태 (스크레이프 시 갱신)
+ACTIVE_ROOMS = REGISTRY.register(Gauge("zoom_active_rooms", "활성 회의실 수"))
+CONNECTED_SIDS = REGISTRY.register(Gauge("zoom_connected_sids", "연결된 사용자(sid) 수"))
+WAITING_USERS = REGISTRY.register(Gauge("zoom_waiting_users", "직접 연결 매칭 대기 중인 사용자 수"))
+JOURNAL_PENDING = REGISTRY.register(Gauge("zoom_journal_pending_ops", "아직 커밋되지 않은 저널 작업 수"))
+
+
+def _instrument_handler(name: str, handler):
+    """핸들러 호출 수/처리 시간/오류 수 기록"""
+    if getattr(handler, "_instrumented", False):
+        return handler
+    code = getattr(handler, "__code__", None)
+    # socketio는 인자 개수가 맞지 않으면 TypeError 후 다른 시그니처로 다시 호출하므로 그 시도는 계측하지 않음
+    max_args = None if code is None or code.co_flags & 0x04 else code.co_argcount
+    events = SIO_EVENTS.labels(name)
+    errors = SIO_EVENT_ERRORS.labels(name)
+    duration = SIO_EVENT_DURATION.labels(name)
+
+    @functools.wraps(handler)
+    async def wrapper(*args):
+        if max_args is not None and len(args) > max_args:
+            raise TypeError(f"{name}() takes {max_args} positional arguments")
+        started = time.perf_counter()
+        try:
+            return await handler(*args)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            events.inc()
+            duration.observe(time.perf_counter() - started)
+
+    wrapper._instrumented = True
+    return wrapper
+
+
+def _recipient_count(sio, room, skip_sid, namespace) -> int:
+    """emit 대상 방의 로컬 참가자 수"""
+    participants = sio.manager.rooms.get(namespace or "/", {}).get(room)
+    if not participants:
+        return 0
+    count = len(participants)
+    if skip_sid is not None:
+        skipped = skip_sid if isinstance(skip_sid, (list, tuple, set)) else (skip_sid,)
+        count -= sum(1 for sid in skipped if sid in participants)
+    return count
+
+
+def instrument_socketio(sio):
+    """등록된 모든 Socket.IO 핸들러와 emit 계측 (핸들러 등록이 끝난 뒤 호출, 여러 번 호출해도 안전)"""
+    for namespace_handlers in sio.handlers.values():
+        for name, handler in list(namespace_handlers.items()):
+            namespace_handlers[name] = _instrument_handler(name, handler)
+
+    emit = sio.emit
+    if getattr(emit, "_instrumented", False):
+        return
+
+    @functools.wraps(emit)
+    async def instrumented_emit(event_name, data=None, to=None, room=None, skip_sid=None, namespace=None, **kwargs):
+        target = to if to is not None else room
+        SIO_EMIT_RECIPIENTS.labels(event_name).observe(_recipient_count(sio, target, skip_sid, namespace))
+        return await emit(event_name, data, to=to, room=room, skip_sid=skip_sid, namespace=namespace, **kwargs)
+
+    instrumented_emit._instrumented = True
+    sio.emit = instrumented_emit
+
+
+def instrument_sessions(session_class, labels: Dict[object, str]):
+    """
+    SQLAlchemy 세션의 트랜잭션/커밋 시간 기록
+
+    labels: 엔진 → 라벨 값 (예: {engine: "sync", async_engine.sync_engine: "async"})
+    """
+    if getattr(session_class, "_metrics_instrumented", False):
+        return
+    session_class._metrics_instrumented = True
+
+    def label_of(session):
+        return labels.get(session.bind, "other")
+
+    @event.listens_for(session_class, "after_transaction_create")
+    def _transaction_started(session, transaction):
+        if transaction.parent is None:
+            session.info["_metrics_tx_started"] = time.perf_counter()
+
+    @event.listens_for(session_class, "after_transaction_end")
+    def _transaction_ended(session, transaction):
+        if transaction.parent is None:
+            started = session.info.pop("_metrics_tx_started", None)
+            if started is not None:
+                DB_TRANSACTION_DURATION.labels(label_of(session)).observe(time.perf_counter() - started)
+
+    @event.listens_for(session_class, "before_commit")
+    def _commit_started(session):
+        session.info["_metrics_commit_started"] = time.perf_counter()
+
+    @event.listens_for(session_class, "after_commit")
+    def _commit_ended(session):
+        started = session.info.pop("_metrics_commit_started", None)
+        if started is not None:
+            DB_COMMIT_DURATION.labels(label_of(session)).observe(time.perf_counter() - started)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """주기적으로 잠들었다 깨어나며 예정보다 늦어진 시간을 기록 (취소될 때까지 실행)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - scheduled))
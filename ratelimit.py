@@ -0,0 +1,238 @@
+"""
+Socket.IO 이벤트 속도 제한
+(sid, 이벤트)별 토큰 버킷으로 한 클라이언트가 방 전체 fan-out과 DB 저널을 밀어내지 못하게 하고,
+한도를 넘은 이벤트는 큐에 쌓지 않고 정책에 따라 버리거나 최신 값 하나로 합침
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import metrics
+from logger import get_logger
+
+logger = get_logger("ratelimit")
+
+# 보류된 처리를 sio.handlers의 (계측된) 핸들러로 다시 부를 때 속도 제한을 한 번 더 거치지 않도록 표시
+_deferred = contextvars.ContextVar("rate_limit_deferred", default=False)
+
+# 초과 시 처리 방식
+POLICY_DROP = "drop"  # 버림
+POLICY_NOTIFY = "notify"  # 버리고 보낸 사람에게 error 이벤트로 알림 (사용자가 직접 보낸 채팅 등)
+POLICY_COALESCE = "coalesce"  # 마지막 값만 보관했다가 토큰이 생기면 한 번 처리 (상태 토글 등)
+
+# 이벤트별 기본 한도: (초당 토큰, 버스트, 정책)
+DEFAULT_LIMITS: Dict[str, Tuple[float, float, str]] = {
+    "message": (5, 10, POLICY_NOTIFY),
+    "whiteboard_draw": (60, 120, POLICY_DROP),
+    "whiteboard_clear": (1, 3, POLICY_DROP),
+    "whiteboard_sync": (1, 3, POLICY_DROP),
+    "toggle_video": (2, 4, POLICY_COALESCE),
+    "toggle_audio": (2, 4, POLICY_COALESCE),
+    "screen_share": (1, 3, POLICY_COALESCE),
+    # 연결 수립에 꼭 필요하므로 큰 방에 들어가 모두에게 한꺼번에 보내도 넘지 않게 잡고, 넘으면 알림
+    "offer": (20, 200, POLICY_NOTIFY),
+    "answer": (20, 200, POLICY_NOTIFY),
+    "ice_candidate": (50, 200, POLICY_DROP),
+}
+
+# 낮은 우선순위 브로드캐스트(whiteboard-draw 등)에서 건너뛸 느린 수신자 기준 (engine.io 송신 대기 패킷 수)
+SIO_SLOW_CONSUMER_QUEUE = int(os.getenv("SIO_SLOW_CONSUMER_QUEUE", "256"))
+
+
+def parse_limits(spec: Optional[str], defaults: Dict[str, Tuple[float, float, str]] = DEFAULT_LIMITS):
+    """
+    RATE_LIMITS 환경 변수 해석
+
+    형식: "이벤트=초당/버스트[/정책],..." (예: "message=2/5,whiteboard_draw=30/60/drop")
+    초당 토큰이 0이면 그 이벤트는 제한하지 않음, "off"면 전부 제한하지 않음
+    """
+    limits = dict(defaults)
+    if not spec:
+        return limits
+    if spec.strip().lower() == "off":
+        return {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            name, value = item.split("=", 1)
+            parts = value.split("/")
+            rate = float(parts[0])
+            burst = float(parts[1]) if len(parts) > 1 else max(rate, 1.0)
+            policy = parts[2] if len(parts) > 2 else limits.get(name, (0, 0, POLICY_DROP))[2]
+            if policy not in (POLICY_DROP, POLICY_NOTIFY, POLICY_COALESCE):
+                raise ValueError(f"알 수 없는 정책: {policy}")
+        except ValueError as e:
+            logger.warning("RATE_LIMITS 항목 무시: %r (%s)", item, e)
+            continue
+        name = name.strip()
+        if rate <= 0:
+            limits.pop(name, None)
+        else:
+            limits[name] = (rate, burst, policy)
+    return limits
+
+
+RATE_LIMITS = parse_limits(os.getenv("RATE_LIMITS"))
+
+
+class TokenBucket:
+    """초당 rate개씩 최대 burst개까지 차는 토큰 버킷"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        """토큰 하나 사용 (없으면 False)"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """다음 토큰까지 남은 시간 (초)"""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    (sid, 이벤트)별 토큰 버킷 모음
+
+    - install(sio)로 한도가 설정된 핸들러를 감싸 호출 전에 토큰을 확인
+    - coalesce 정책은 sid/이벤트당 마지막 인자 하나만 보관하고 토큰이 생기는 시점에 한 번 처리
+    - 연결이 끊긴 sid는 discard()로 버킷과 보류 중인 처리를 버림
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float, str]] = RATE_LIMITS, clock=time.monotonic):
+        self.limits = limits
+        self.clock = clock
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        # 모두 sid별로 보관해서 연결 해제 시 다른 sid를 훑지 않고 바로 삭제
+        self._pending: Dict[str, Dict[str, tuple]] = {}  # sid → {이벤트: 보류 중인 마지막 인자}
+        self._timers: Dict[str, Dict[str, asyncio.Task]] = {}
+        self._notified: Dict[str, set] = {}  # sid → 이미 초과 알림을 보낸 이벤트 (다시 허용될 때까지 알리지 않음)
+
+    def allow(self, sid: str, event_name: str) -> bool:
+        """이벤트를 지금 처리해도 되는지 (토큰 하나 사용)"""
+        limit = self.limits.get(event_name)
+        if limit is None:
+            return True
+        now = self.clock()
+        buckets = self._buckets.get(sid)
+        if buckets is None:
+            buckets = self._buckets[sid] = {}
+        bucket = buckets.get(event_name)
+        if bucket is None:
+            bucket = buckets[event_name] = TokenBucket(limit[0], limit[1], now)
+        return bucket.take(now)
+
+    def discard(self, sid: str):
+        """sid의 버킷과 보류 중인 처리 삭제 (연결 해제 시)"""
+        self._buckets.pop(sid, None)
+        self._notified.pop(sid, None)
+        self._pending.pop(sid, None)
+        for timer in self._timers.pop(sid, {}).values():
+            timer.cancel()
+
+    def install(self, sio):
+        """한도가 설정된 Socket.IO 핸들러 감싸기 (metrics.instrument_socketio보다 먼저 호출, 여러 번 호출해도 안전)"""
+        for namespace, namespace_handlers in sio.handlers.items():
+            for name, handler in list(namespace_handlers.items()):
+                if name in self.limits and not getattr(handler, "_rate_limited", False):
+                    namespace_handlers[name] = self.wrap(sio, name, handler, namespace)
+
+    def wrap(self, sio, name: str, handler, namespace: str = "/"):
+        """핸들러 하나를 속도 제한으로 감싸기"""
+        policy = self.limits[name][2]
+        dropped = metrics.SIO_RATE_LIMITED.labels(name, "dropped")
+        coalesced = metrics.SIO_RATE_LIMITED.labels(name, "coalesced")
+
+        @functools.wraps(handler)
+        async def wrapper(sid, *args):
+            if _deferred.get():
+                # 토큰을 이미 쓴 보류 처리 (_run_later)
+                return await handler(sid, *args)
+            pending = self._pending.get(sid)
+            if policy == POLICY_COALESCE and pending is not None and name in pending:
+                # 이미 보류 중이면 최신 값으로 교체 (순서 유지를 위해 바로 처리하지 않음)
+                pending[name] = args
+                coalesced.inc()
+                return None
+            if self.allow(sid, name):
+                notified = self._notified.get(sid)
+                if notified is not None:
+                    notified.discard(name)
+                return await handler(sid, *args)
+            if policy == POLICY_COALESCE:
+                self._pending.setdefault(sid, {})[name] = args
+                self._timers.setdefault(sid, {})[name] = asyncio.create_task(
+                    self._run_later(sio, namespace, sid, name, handler)
+                )
+                coalesced.inc()
+                return None
+            dropped.inc()
+            logger.debug("속도 제한으로 %s 이벤트 버림: sid=%s", name, sid)
+            if policy == POLICY_NOTIFY:
+                notified = self._notified.setdefault(sid, set())
+                if name not in notified:
+                    notified.add(name)
+                    await sio.emit("error", {"message": "너무 빠르게 보내고 있습니다. 잠시 후 다시 시도해주세요"}, room=sid)
+            return None
+
+        wrapper._rate_limited = True
+        return wrapper
+
+    async def _run_later(self, sio, namespace: str, sid: str, name: str, handler):
+        """토큰이 생기면 마지막 인자로 처리 (호출 시점의 sio.handlers 핸들러로 불러서 메트릭 계측도 거침)"""
+        bucket = self._buckets.get(sid, {}).get(name)
+        try:
+            while bucket is not None and not bucket.take(self.clock()):
+                await asyncio.sleep(bucket.wait_time())
+            args = self._pop(self._pending, sid, name)
+            self._pop(self._timers, sid, name)
+            if args is not None:
+                current = sio.handlers.get(namespace, {}).get(name, handler)
+                token = _deferred.set(True)
+                try:
+                    await current(sid, *args)
+                finally:
+                    _deferred.reset(token)
+        except Exception as e:
+            logger.warning("보류된 %s 이벤트 처리 실패: sid=%s: %s", name, sid, e)
+
+    @staticmethod
+    def _pop(by_sid: Dict[str, Dict], sid: str, name: str):
+        """sid별 사전에서 이벤트 항목 꺼내기 (비면 sid 항목도 삭제)"""
+        entries = by_sid.get(sid)
+        if entries is None:
+            return None
+        value = entries.pop(name, None)
+        if not entries:
+            del by_sid[sid]
+        return value
+
+
+def slow_consumers(sio, room: str, namespace: str = "/", threshold: int = SIO_SLOW_CONSUMER_QUEUE):
+    """방의 로컬 참가자 중 송신 대기 패킷이 threshold개 이상 쌓인 sid 목록 (낮은 우선순위 emit에서 건너뜀)"""
+    participants = sio.manager.rooms.get(namespace, {}).get(room)
+    if not participants:
+        return []
+    sockets = sio.eio.sockets
+    slow = []
+    for sid, eio_sid in participants.items():
+        socket = sockets.get(eio_sid)
+        if socket is not None and socket.queue.qsize() >= threshold:
+            slow.append(sid)
+    return slow
+
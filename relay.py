@@ -0,0 +1,228 @@
+"""
+WebRTC 시그널링(offer/answer/ice_candidate) 릴레이 검증
+- 페이로드 크기/형식 제한과 보낸 사람-대상 관계(같은 방 또는 매칭 상대) 확인
+- 받은 JSON 텍스트를 다시 인코딩하지 않고 그대로 전달하기 위한 Socket.IO용 JSON 모듈
+  (pub/sub 매니저는 emit을 일반 json으로 발행하므로 REDIS_URL을 쓰면 원본 텍스트 전달을 끔)
+"""
+import json
+import os
+from json.decoder import WHITESPACE, scanstring
+from typing import Any, Dict, Optional, Tuple
+
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+# 크기 제한 (환경 변수로 조정 가능, JSON 텍스트 기준)
+RELAY_MAX_SDP_BYTES = int(os.getenv("RELAY_MAX_SDP_BYTES", "65536"))  # offer/answer 한 건
+RELAY_MAX_CANDIDATE_BYTES = int(os.getenv("RELAY_MAX_CANDIDATE_BYTES", "2048"))  # ICE candidate 한 건
+# engine.io 메시지 한 개의 최대 크기 (가장 큰 정상 패킷인 offer/answer + 이벤트 봉투/폴링 묶음 여유)
+# AsyncServer(max_http_buffer_size=...)로 넘겨 JSON 디코딩 전에 연결 단계에서 거절
+RELAY_MAX_PACKET_BYTES = int(os.getenv("RELAY_MAX_PACKET_BYTES", str(RELAY_MAX_SDP_BYTES + 16384)))
+RELAY_RAW_MIN_BYTES = int(os.getenv("RELAY_RAW_MIN_BYTES", "1024"))  # 이 크기 이상인 패킷만 원본 텍스트 그대로 전달
+
+# 원본 JSON을 보관하는 릴레이 이벤트
+RELAY_EVENTS = ("offer", "answer", "ice_candidate")
+
+# 거절 사유 (메트릭 라벨 겸용)
+REJECT_INVALID = "invalid"  # 형식 오류
+REJECT_TOO_LARGE = "too_large"  # 크기 초과
+REJECT_FORBIDDEN = "forbidden"  # 같은 방/매칭 상대가 아님
+
+_DESCRIPTION_TYPES = {
+    "offer": {"offer"},
+    "answer": {"answer", "pranswer"},
+}
+
+
+class RawJSON(str):
+    """이미 직렬화된 JSON 값 (emit 시 다시 인코딩하지 않고 그대로 출력)"""
+
+    __slots__ = ()
+
+
+class RelayData(dict):
+    """릴레이 이벤트 인자 (일반 dict처럼 쓰고, raw에 필드별 원본 JSON 텍스트를 함께 보관)"""
+
+    __slots__ = ("raw",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.raw: Dict[str, str] = {}
+
+
+# ----------------------------------------------------------------------------
+# Socket.IO JSON 모듈 (AsyncServer(json=RelayJSON))
+# ----------------------------------------------------------------------------
+
+_decoder = json.JSONDecoder()
+_RELAY_PREFIXES = tuple(f'["{name}",' for name in RELAY_EVENTS)
+
+
+def _skip(s: str, index: int) -> int:
+    return WHITESPACE.match(s, index).end()
+
+
+def _loads_relay(s: str):
+    """["이벤트",{...}] 형식을 디코딩하면서 최상위 필드별 원본 텍스트를 기록"""
+    comma = s.index(",")
+    event_name = s[2:comma - 1]
+    index = _skip(s, comma + 1)
+    if s[index:index + 1] != "{":
+        raise ValueError("릴레이 페이로드가 객체가 아님")
+    data = RelayData()
+    index = _skip(s, index + 1)
+    if s[index:index + 1] == "}":
+        index += 1
+    else:
+        while True:
+            if s[index:index + 1] != '"':
+                raise ValueError("잘못된 키")
+            key, index = scanstring(s, index + 1)
+            index = _skip(s, index)
+            if s[index:index + 1] != ":":
+                raise ValueError("':' 없음")
+            start = _skip(s, index + 1)
+            value, index = _decoder.raw_decode(s, start)
+            data[key] = value
+            data.raw[key] = s[start:index]
+            index = _skip(s, index)
+            separator = s[index:index + 1]
+            index += 1
+            if separator == "}":
+                break
+            if separator != ",":
+                raise ValueError("',' 없음")
+            index = _skip(s, index)
+    index = _skip(s, index)
+    if s[index:] != "]":
+        # 추가 인자 등 예상과 다른 형식은 일반 디코딩으로 처리
+        raise ValueError("예상하지 못한 형식")
+    return [event_name, data]
+
+
+def _encode_value(value, separators: Tuple[str, str], kwargs) -> str:
+    if type(value) is RawJSON:
+        return value
+    if type(value) is list and any(type(item) is RawJSON for item in value):
+        return "[" + separators[0].join(_encode_value(item, separators, kwargs) for item in value) + "]"
+    return json.dumps(value, separators=separators, **kwargs)
+
+
+def _payload_has_raw(obj) -> bool:
+    """[이벤트, {필드: RawJSON 또는 RawJSON 목록}] 형식인지 확인 (일반 emit은 바로 False)"""
+    if type(obj) is not list or len(obj) < 2 or type(obj[1]) is not dict:
+        return False
+    for value in obj[1].values():
+        if type(value) is RawJSON or (type(value) is list and any(type(item) is RawJSON for item in value)):
+            return True
+    return False
+
+
+class RelayJSON:
+    """
+    Socket.IO/Engine.IO용 json 모듈 대체
+
+    - loads: RELAY_RAW_MIN_BYTES 이상인 릴레이 이벤트는 최상위 필드별 원본 텍스트를 RelayData.raw에 함께 보관
+      (작은 패킷은 직접 훑는 비용이 더 커서 일반 디코딩)
+    - dumps: 페이로드 필드 값(또는 목록 항목)이 RawJSON이면 다시 인코딩하지 않고 그대로 이어 붙임
+    """
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        if isinstance(s, str) and len(s) >= RELAY_RAW_MIN_BYTES and s.startswith(_RELAY_PREFIXES):
+            try:
+                return _loads_relay(s)
+            except (ValueError, IndexError):
+                pass
+        return json.loads(s, *args, **kwargs)
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        if args or not _payload_has_raw(obj):
+            return json.dumps(obj, *args, **kwargs)
+        separators = kwargs.pop("separators", None) or (", ", ": ")
+        item_sep, key_sep = separators
+        payload = item_sep.join(
+            json.dumps(str(key)) + key_sep + _encode_value(value, separators, kwargs)
+            for key, value in obj[1].items()
+        )
+        items = [json.dumps(item, separators=separators, **kwargs) if i != 1 else "{" + payload + "}"
+                 for i, item in enumerate(obj)]
+        return "[" + item_sep.join(items) + "]"
+
+
+# ----------------------------------------------------------------------------
+# 검증
+# ----------------------------------------------------------------------------
+
+def _field(data: Dict, key: str) -> Tuple[Any, Optional[str]]:
+    """필드 값과 원본 JSON 텍스트 (원본이 없으면 None)"""
+    raw = data.raw.get(key) if isinstance(data, RelayData) else None
+    return data.get(key), raw
+
+
+def _encoded_size(value: Dict, raw: Optional[str], field: str) -> int:
+    """
+    크기 확인용 길이
+
+    원본 텍스트가 있으면 그 길이, 없으면(RELAY_RAW_MIN_BYTES 미만의 작은 패킷) 주요 필드 길이로 대신함
+    """
+    if raw is not None:
+        return len(raw)
+    return len(value[field])
+
+
+def allows_raw(manager) -> bool:
+    """
+    RawJSON을 emit해도 되는 클라이언트 매니저인지
+
+    pub/sub 매니저(AsyncRedisManager 등)는 emit 인자를 메시지 dict에 넣어 매니저의 json으로 발행하므로
+    RawJSON(str)이 JSON 문자열로 인코딩되어 다른 워커의 수신자에게 객체가 아닌 문자열로 도착함
+    """
+    return not isinstance(manager, AsyncPubSubManager)
+
+
+def check_description(event_name: str, data: Dict, raw_ok: bool = True) -> Tuple[Optional[Any], Optional[str]]:
+    """
+    offer/answer 페이로드 확인
+
+    반환: (전달할 값, 거절 사유) - 정상이면 원본 텍스트가 있고 raw_ok일 때 RawJSON을 돌려줌
+    """
+    value, raw = _field(data, event_name)
+    if not isinstance(value, dict):
+        return None, REJECT_INVALID
+    if not isinstance(value.get("sdp"), str) or value.get("type") not in _DESCRIPTION_TYPES[event_name]:
+        return None, REJECT_INVALID
+    if _encoded_size(value, raw, "sdp") > RELAY_MAX_SDP_BYTES:
+        return None, REJECT_TOO_LARGE
+    return (RawJSON(raw) if raw is not None and raw_ok else value), None
+
+
+def check_candidate(data: Dict, raw_ok: bool = True) -> Tuple[Optional[Any], Optional[str]]:
+    """ICE candidate 페이로드 확인 (RTCIceCandidateInit 형식, raw_ok는 check_description과 같음)"""
+    value, raw = _field(data, "candidate")
+    if not isinstance(value, dict) or not isinstance(value.get("candidate"), str):
+        return None, REJECT_INVALID
+    mid = value.get("sdpMid")
+    index = value.get("sdpMLineIndex")
+    if (mid is not None and not isinstance(mid, str)) or (index is not None and not isinstance(index, int)):
+        return None, REJECT_INVALID
+    if _encoded_size(value, raw, "candidate") > RELAY_MAX_CANDIDATE_BYTES:
+        return None, REJECT_TOO_LARGE
+    return (RawJSON(raw) if raw is not None and raw_ok else value), None
+
+
+async def can_relay(store, sid: str, target_sid: Optional[str]) -> bool:
+    """보낸 사람과 대상이 같은 방에 있거나 서로 매칭된 상대인지 확인"""
+    if not isinstance(target_sid, str) or target_sid == sid:
+        return False
+    sender = await store.get_user(sid)
+    if sender is None:
+        return False
+    if sender.peer_sid == target_sid:
+        return True
+    target = await store.get_user(target_sid)
+    if target is None:
+        return False
+    if sender.room_id is not None and sender.room_id == target.room_id:
+        return True
+    return target.peer_sid == sid
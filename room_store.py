@@ -0,0 +1,489 @@
+"""
+회의실/접속자 상태 저장소
+단일 프로세스용 메모리 저장소와 여러 워커가 공유하는 Redis 저장소를 같은 인터페이스로 제공
+"""
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from matchmaking import Matchmaker, Waiter
+
+# 설정되어 있으면 Redis 저장소와 Socket.IO Redis 매니저를 사용 (여러 워커/노드 간 상태 공유)
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "zoom:")
+
+
+class Connection:
+    """접속(sid)별 사용자 정보 (__slots__로 접속당 메모리 최소화)"""
+
+    __slots__ = ("sid", "username", "room_id", "user_id", "joined_at", "target_username", "peer_sid", "meeting_id")
+
+    def __init__(
+        self,
+        sid: str,
+        username: str,
+        room_id: Optional[str] = None,
+        user_id: Optional[int] = None,
+        joined_at: Optional[str] = None,
+        target_username: Optional[str] = None,
+        peer_sid: Optional[str] = None,
+        meeting_id: Optional[int] = None,
+    ):
+        self.sid = sid
+        self.username = username
+        self.room_id = room_id  # None이면 방 없는 직접 연결
+        self.user_id = user_id
+        self.joined_at = joined_at or datetime.utcnow().isoformat()  # UTC, 방 참가자는 MeetingParticipant.joined_at과 같은 값
+        self.target_username = target_username
+        self.peer_sid = peer_sid  # 직접 연결에서 매칭된 상대 sid
+        self.meeting_id = meeting_id  # 방 참가 시 DB 회의 ID (나갈 때 참가자 행을 조회 없이 갱신)
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Connection":
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+
+class Room:
+    """
+    회의실 정보
+
+    members는 {sid: {"sid", "username"}} 딕셔너리로, 참가/나감/포함 여부 확인이 O(1)이고
+    참가 순서가 유지되며, existing-users 목록을 사용자 정보 조회나 항목 생성 없이 바로 복사해 만들 수 있음
+    """
+
+    __slots__ = ("id", "created_at", "db_id", "members")
+
+    def __init__(self, room_id: str, db_id: Optional[int] = None, created_at: Optional[str] = None):
+        self.id = room_id
+        self.created_at = created_at or datetime.now().isoformat()
+        self.db_id = db_id  # DB 회의 ID
+        self.members: Dict[str, Dict] = {}
+
+
+class RoomStore:
+    """
+    회의실/접속자 상태 저장소 인터페이스
+
+    - 접속자(sid별 Connection): set_user / get_user / remove_user / count_users
+    - 회의실(Room 및 참가자 목록): ensure_room / get_room / add_member / remove_member / get_members / count_rooms
+    - 방 없는 직접 연결 매칭: match_or_wait / cancel_waiting / count_waiting
+    - 공유 파일 정보: set_file / get_file / remove_file / list_files
+    - 공유 파일 blob 참조 수: add_blob_ref / get_blob_ref
+    """
+
+    async def set_user(self, conn: Connection):
+        raise NotImplementedError
+
+    async def get_user(self, sid: str) -> Optional[Connection]:
+        raise NotImplementedError
+
+    async def remove_user(self, sid: str) -> Optional[Connection]:
+        raise NotImplementedError
+
+    async def count_users(self) -> int:
+        raise NotImplementedError
+
+    async def ensure_room(self, room_id: str, meeting_id: int) -> Room:
+        """방이 없으면 만들고, 있으면 DB 회의 ID(db_id)를 동기화한 뒤 방 정보를 반환"""
+        raise NotImplementedError
+
+    async def get_room(self, room_id: str) -> Optional[Room]:
+        """방 정보 조회 (members는 채워지지 않을 수 있음 - get_members 사용)"""
+        raise NotImplementedError
+
+    async def add_member(self, room_id: str, sid: str, username: str) -> bool:
+        """방에 sid 추가 (이미 있으면 False)"""
+        raise NotImplementedError
+
+    async def remove_member(self, room_id: str, sid: str) -> int:
+        """방에서 sid 제거 후 남은 참가자 수 반환"""
+        raise NotImplementedError
+
+    async def get_members(self, room_id: str, exclude_sid: Optional[str] = None) -> List[Dict]:
+        """방 참가자 {"sid", "username"} 목록 (exclude_sid 제외)"""
+        raise NotImplementedError
+
+    async def count_members(self, room_id: str) -> int:
+        """방 참가자 수 (목록을 가져오지 않음)"""
+        raise NotImplementedError
+
+    async def count_rooms(self) -> int:
+        raise NotImplementedError
+
+    async def match_or_wait(self, sid: str, username: str, target_username: Optional[str] = None) -> Optional[Waiter]:
+        """매칭 상대가 있으면 대기열에서 꺼내 반환, 없으면 대기열에 추가하고 None 반환 (규칙은 Matchmaker 참고)"""
+        raise NotImplementedError
+
+    async def cancel_waiting(self, sid: str) -> Optional[Waiter]:
+        """대기 취소 (대기 중이 아니었으면 None)"""
+        raise NotImplementedError
+
+    async def count_waiting(self) -> int:
+        raise NotImplementedError
+
+    async def set_file(self, file_id: str, info: Dict):
+        raise NotImplementedError
+
+    async def get_file(self, file_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    async def remove_file(self, file_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    async def list_files(self, room_id: str) -> List[Dict]:
+        raise NotImplementedError
+
+    async def add_blob_ref(self, digest: str, delta: int) -> int:
+        """blob(sha256) 참조 수 증감 후 현재 값 반환 (0이 되면 항목 삭제)"""
+        raise NotImplementedError
+
+    async def get_blob_ref(self, digest: str) -> int:
+        raise NotImplementedError
+
+    async def close(self):
+        """연결 정리"""
+
+
+class MemoryRoomStore(RoomStore):
+    """단일 프로세스용 메모리 저장소 (기본값)"""
+
+    def __init__(self):
+        self.rooms: Dict[str, Room] = {}
+        self.users: Dict[str, Connection] = {}
+        self.matchmaker = Matchmaker()
+        self.shared_files: Dict[str, Dict] = {}
+        self.blob_refs: Dict[str, int] = {}
+
+    async def set_user(self, conn):
+        self.users[conn.sid] = conn
+
+    async def get_user(self, sid):
+        return self.users.get(sid)
+
+    async def remove_user(self, sid):
+        return self.users.pop(sid, None)
+
+    async def count_users(self):
+        return len(self.users)
+
+    async def ensure_room(self, room_id, meeting_id):
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = Room(room_id, meeting_id)
+        else:
+            room.db_id = meeting_id
+        return room
+
+    async def get_room(self, room_id):
+        return self.rooms.get(room_id)
+
+    async def add_member(self, room_id, sid, username):
+        members = self.rooms[room_id].members
+        if sid in members:
+            return False
+        members[sid] = {"sid": sid, "username": username}
+        return True
+
+    async def remove_member(self, room_id, sid):
+        room = self.rooms.get(room_id)
+        if room is None:
+            return 0
+        room.members.pop(sid, None)
+        return len(room.members)
+
+    async def get_members(self, room_id, exclude_sid=None):
+        room = self.rooms.get(room_id)
+        if room is None:
+            return []
+        if exclude_sid in room.members:
+            return [member for sid, member in room.members.items() if sid != exclude_sid]
+        return list(room.members.values())
+
+    async def count_members(self, room_id):
+        room = self.rooms.get(room_id)
+        return len(room.members) if room is not None else 0
+
+    async def count_rooms(self):
+        return len(self.rooms)
+
+    async def match_or_wait(self, sid, username, target_username=None):
+        return self.matchmaker.match_or_wait(sid, username, target_username)
+
+    async def cancel_waiting(self, sid):
+        return self.matchmaker.cancel(sid)
+
+    async def count_waiting(self):
+        return len(self.matchmaker)
+
+    async def set_file(self, file_id, info):
+        self.shared_files[file_id] = info
+
+    async def get_file(self, file_id):
+        return self.shared_files.get(file_id)
+
+    async def remove_file(self, file_id):
+        return self.shared_files.pop(file_id, None)
+
+    async def list_files(self, room_id):
+        return [info for info in self.shared_files.values() if info.get("room_id") == room_id]
+
+    async def add_blob_ref(self, digest, delta):
+        count = self.blob_refs.get(digest, 0) + delta
+        if count > 0:
+            self.blob_refs[digest] = count
+        else:
+            self.blob_refs.pop(digest, None)
+        return max(count, 0)
+
+    async def get_blob_ref(self, digest):
+        return self.blob_refs.get(digest, 0)
+
+
+# Redis 매칭 대기열 (Matchmaker와 같은 규칙)
+# - mm-waiters: {sid: "username\ntarget"} / mm-seq: 대기 순번
+# - mm-anon, mm-target:{대상}, mm-pair:{이름}\n{대상}: 대기 순번을 점수로 하는 sorted set (FIFO)
+_WAITER_LUA = """
+local prefix = ARGV[1]
+local waiters = prefix .. 'mm-waiters'
+local function queues(name, target)
+  local primary = prefix .. 'mm-anon'
+  if target ~= '' then primary = prefix .. 'mm-target:' .. target end
+  return primary, prefix .. 'mm-pair:' .. name .. '\\n' .. target
+end
+local function remove(sid)
+  local raw = redis.call('HGET', waiters, sid)
+  if not raw then return false end
+  local sep = string.find(raw, '\\n', 1, true)
+  local primary, pair = queues(string.sub(raw, 1, sep - 1), string.sub(raw, sep + 1))
+  redis.call('ZREM', primary, sid)
+  redis.call('ZREM', pair, sid)
+  redis.call('HDEL', waiters, sid)
+  return raw
+end
+"""
+
+_MATCH_LUA = """
+local sid, username, target = ARGV[2], ARGV[3], ARGV[4]
+remove(sid)
+local candidates
+if target ~= '' then
+  local _, anyone = queues(target, '')
+  local _, me = queues(target, username)
+  candidates = {anyone, me}
+else
+  candidates = {prefix .. 'mm-anon', prefix .. 'mm-target:' .. username}
+end
+local best, best_seq
+for _, key in ipairs(candidates) do
+  local head = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+  if head[1] and (not best_seq or tonumber(head[2]) < best_seq) then
+    best, best_seq = head[1], tonumber(head[2])
+  end
+end
+if best then
+  return {best, remove(best)}
+end
+local seq = redis.call('INCR', prefix .. 'mm-seq')
+local primary, pair = queues(username, target)
+redis.call('HSET', waiters, sid, username .. '\\n' .. target)
+redis.call('ZADD', primary, seq, sid)
+redis.call('ZADD', pair, seq, sid)
+return false
+"""
+
+
+# blob 참조 수 증감 (0 이하가 되면 항목 삭제, 증감과 삭제를 원자적으로)
+_BLOB_REF_LUA = """
+local count = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+if count <= 0 then
+  redis.call('HDEL', KEYS[1], ARGV[1])
+  return 0
+end
+return count
+"""
+
+
+class RedisRoomStore(RoomStore):
+    """
+    여러 워커/노드가 공유하는 Redis 저장소
+
+    redis.asyncio 호환 클라이언트라면 무엇이든 사용할 수 있음
+    (테스트에서는 fakeredis.aioredis.FakeRedis 등 로컬 대체 구현을 주입)
+    """
+
+    def __init__(self, client, prefix: str = REDIS_KEY_PREFIX):
+        self.redis = client
+        self.prefix = prefix
+        self._match = None
+        self._cancel = None
+        self._blob_ref = None
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = REDIS_KEY_PREFIX) -> "RedisRoomStore":
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("REDIS_URL을 사용하려면 redis 패키지가 필요합니다 (pip install redis)")
+        return cls(aioredis.from_url(url, decode_responses=True), prefix)
+
+    def _key(self, *parts: str) -> str:
+        return self.prefix + ":".join(parts)
+
+    @staticmethod
+    def _load(raw) -> Optional[Dict]:
+        return json.loads(raw) if raw is not None else None
+
+    async def set_user(self, conn):
+        pipe = self.redis.pipeline()
+        pipe.set(self._key("user", conn.sid), json.dumps(conn.to_dict()))
+        pipe.sadd(self._key("users"), conn.sid)
+        await pipe.execute()
+
+    async def get_user(self, sid):
+        raw = await self.redis.get(self._key("user", sid))
+        return Connection.from_dict(json.loads(raw)) if raw is not None else None
+
+    async def remove_user(self, sid):
+        pipe = self.redis.pipeline()
+        pipe.get(self._key("user", sid))
+        pipe.delete(self._key("user", sid))
+        pipe.srem(self._key("users"), sid)
+        raw, _, _ = await pipe.execute()
+        return Connection.from_dict(json.loads(raw)) if raw is not None else None
+
+    async def count_users(self):
+        return await self.redis.scard(self._key("users"))
+
+    async def ensure_room(self, room_id, meeting_id):
+        key = self._key("room", room_id)
+        pipe = self.redis.pipeline()
+        # 방이 처음 만들어질 때만 created_at 설정, db_id는 항상 DB 회의 기준으로 동기화
+        pipe.hsetnx(key, "created_at", datetime.now().isoformat())
+        pipe.hset(key, "db_id", meeting_id)
+        pipe.sadd(self._key("rooms"), room_id)
+        pipe.hgetall(key)
+        return self._room(room_id, (await pipe.execute())[-1])
+
+    @staticmethod
+    def _room(room_id: str, raw: Dict) -> Optional[Room]:
+        if not raw:
+            return None
+        db_id = raw.get("db_id")
+        return Room(room_id, int(db_id) if db_id is not None else None, raw.get("created_at"))
+
+    async def get_room(self, room_id):
+        return self._room(room_id, await self.redis.hgetall(self._key("room", room_id)))
+
+    async def add_member(self, room_id, sid, username):
+        return bool(await self.redis.hsetnx(self._key("members", room_id), sid, username))
+
+    async def remove_member(self, room_id, sid):
+        pipe = self.redis.pipeline()
+        pipe.hdel(self._key("members", room_id), sid)
+        pipe.hlen(self._key("members", room_id))
+        _, remaining = await pipe.execute()
+        return remaining
+
+    async def get_members(self, room_id, exclude_sid=None):
+        members = await self.redis.hgetall(self._key("members", room_id))
+        return [{"sid": sid, "username": username} for sid, username in members.items() if sid != exclude_sid]
+
+    async def count_members(self, room_id):
+        return await self.redis.hlen(self._key("members", room_id))
+
+    async def count_rooms(self):
+        return await self.redis.scard(self._key("rooms"))
+
+    async def match_or_wait(self, sid, username, target_username=None):
+        # 여러 워커가 동시에 요청해도 서로를 놓치거나 같은 대기자를 두 번 가져가지 않도록 Lua 스크립트로 원자적으로 처리
+        result = await self._match_script(args=[self.prefix, sid, username, target_username or ""])
+        if not result:
+            return None
+        waiter_sid, raw = result
+        return self._waiter(waiter_sid, raw)
+
+    async def cancel_waiting(self, sid):
+        raw = await self._cancel_script(args=[self.prefix, sid])
+        return self._waiter(sid, raw) if raw else None
+
+    @staticmethod
+    def _waiter(sid: str, raw: str) -> Waiter:
+        username, _, target_username = raw.partition("\n")
+        return Waiter(sid, username, target_username or None)
+
+    @property
+    def _match_script(self):
+        if self._match is None:
+            self._match = self.redis.register_script(_WAITER_LUA + _MATCH_LUA)
+        return self._match
+
+    @property
+    def _cancel_script(self):
+        if self._cancel is None:
+            self._cancel = self.redis.register_script(_WAITER_LUA + "return remove(ARGV[2])")
+        return self._cancel
+
+    @property
+    def _blob_ref_script(self):
+        if self._blob_ref is None:
+            self._blob_ref = self.redis.register_script(_BLOB_REF_LUA)
+        return self._blob_ref
+
+    async def count_waiting(self):
+        return await self.redis.hlen(self._key("mm-waiters"))
+
+    async def set_file(self, file_id, info):
+        pipe = self.redis.pipeline()
+        pipe.set(self._key("file", file_id), json.dumps(info))
+        if info.get("room_id"):
+            pipe.sadd(self._key("room-files", info["room_id"]), file_id)
+        await pipe.execute()
+
+    async def get_file(self, file_id):
+        return self._load(await self.redis.get(self._key("file", file_id)))
+
+    async def remove_file(self, file_id):
+        info = await self.get_file(file_id)
+        if info is None:
+            return None
+        pipe = self.redis.pipeline()
+        pipe.delete(self._key("file", file_id))
+        if info.get("room_id"):
+            pipe.srem(self._key("room-files", info["room_id"]), file_id)
+        await pipe.execute()
+        return info
+
+    async def list_files(self, room_id):
+        file_ids = list(await self.redis.smembers(self._key("room-files", room_id)))
+        if not file_ids:
+            return []
+        raws = await self.redis.mget([self._key("file", file_id) for file_id in file_ids])
+        return [json.loads(raw) for raw in raws if raw is not None]
+
+    async def add_blob_ref(self, digest, delta):
+        return int(await self._blob_ref_script(keys=[self._key("blob-refs")], args=[digest, delta]))
+
+    async def get_blob_ref(self, digest):
+        return int(await self.redis.hget(self._key("blob-refs"), digest) or 0)
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_room_store() -> RoomStore:
+    """환경 설정에 맞는 저장소 생성 (REDIS_URL이 있으면 Redis, 없으면 메모리)"""
+    if REDIS_URL:
+        return RedisRoomStore.from_url(REDIS_URL)
+    return MemoryRoomStore()
+
+
+def create_client_manager():
+    """저장소와 짝이 되는 Socket.IO 클라이언트 매니저 (Redis 사용 시 워커 간 emit 전달)"""
+    if REDIS_URL:
+        import socketio
+        return socketio.AsyncRedisManager(REDIS_URL, channel=REDIS_KEY_PREFIX + "socketio")
+    return None
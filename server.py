@@ -2,34 +2,95 @@
 ZOOM 클론 - FastAPI 백엔드 서버
 WebRTC 시그널링 및 Socket.io 통신 처리
 """
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, status, UploadFile, File, Header
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, status, UploadFile, File, Header, Query, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from starlette.requests import ClientDisconnect
+from sqlalchemy import select, func, distinct, or_, and_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 import socketio
 import uvicorn
+from contextlib import asynccontextmanager
+import asyncio
+import base64
 import json
+import logging
 import os
 import shutil
 import uuid
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from database import init_db, get_db, User, SessionLocal, Meeting, MeetingParticipant, MeetingEvent
+from database import (
+    init_db, get_db, engine, async_engine, User, SessionLocal, AsyncSessionLocal, Meeting, MeetingParticipant, MeetingEvent
+)
 from auth import (
-    authenticate_user, 
-    create_user, 
+    authenticate_user_async,
+    create_user_async,
+    password_hasher,
+    PasswordHasherBusy,
     create_access_token, 
     verify_token,
     get_user_by_username,
     get_user_by_email,
-    get_user_by_id
+    get_user_context,
+    UserContext
+)
+from chat_history import ChatHistory
+from blob_store import BLOB_GC_INTERVAL, BlobStore
+from file_share import FileShare, UploadConflict, parse_content_range
+from ice_batch import IceCandidateBatcher
+from journal import EventJournal
+from meeting_cache import MeetingCache
+from logger import get_logger, setup_logging
+import metrics
+from ratelimit import RateLimiter, slow_consumers
+from relay import (
+    RELAY_MAX_PACKET_BYTES, RelayJSON, REJECT_FORBIDDEN, REJECT_INVALID,
+    allows_raw, can_relay, check_candidate, check_description
 )
+from static_assets import StaticAssets
+from whiteboard import WhiteboardEngine
+from room_store import Connection, create_room_store, create_client_manager
+
+# 로깅 설정 (LOG_LEVEL, LOG_FORMAT 환경 변수)
+setup_logging()
+logger = get_logger("server")
+
+# DB 세션 트랜잭션/커밋 시간 계측 (동기 SessionLocal과 비동기 세션 모두)
+metrics.instrument_sessions(Session, {engine: "sync", async_engine.sync_engine: "async"})
+
+# 회의 이벤트 write-behind 저널 (채팅/참가/나감 기록을 모아서 일괄 커밋)
+journal = EventJournal()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """애플리케이션 시작/종료 처리"""
+    # 모든 핸들러가 등록된 뒤이므로 여기서 속도 제한과 Socket.IO 계측 적용 (계측이 바깥쪽)
+    rate_limiter.install(sio)
+    metrics.instrument_socketio(sio)
+    # app.js/style.css 지문 + 미리 압축, index.html/sw.js 생성
+    static_assets.build()
+    loop_lag_task = asyncio.create_task(metrics.monitor_event_loop_lag())
+    blob_gc_task = asyncio.create_task(blob_store.run_gc()) if BLOB_GC_INTERVAL > 0 else None
+    await journal.start()
+    yield
+    loop_lag_task.cancel()
+    if blob_gc_task is not None:
+        blob_gc_task.cancel()
+    await ice_batcher.flush_all()
+    await whiteboard.flush_all()
+    # 종료 시 버퍼에 남은 이벤트를 모두 기록
+    await journal.stop()
+    await store.close()
+    password_hasher.shutdown()
 
 # FastAPI 앱 생성
-app = FastAPI(title="ZOOM Clone")
+app = FastAPI(title="ZOOM Clone", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -40,8 +101,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Socket.io 서버 생성
-sio = socketio.AsyncServer(cors_allowed_origins="*", async_mode='asgi')
+# Socket.io 서버 생성 (REDIS_URL 설정 시 Redis 매니저로 워커 간 emit 전달)
+# RelayJSON: offer/answer/candidate는 받은 JSON 텍스트를 다시 인코딩하지 않고 그대로 전달
+# max_http_buffer_size: 너무 큰 메시지는 디코딩하기 전에 engine.io에서 거절 (기본값 1MB 대신 릴레이 제한에 맞춤)
+sio = socketio.AsyncServer(
+    cors_allowed_origins="*",
+    async_mode='asgi',
+    client_manager=create_client_manager(),
+    json=RelayJSON,
+    max_http_buffer_size=RELAY_MAX_PACKET_BYTES
+)
+# 원본 JSON 그대로 전달은 로컬 매니저에서만 (Redis 매니저는 발행 시 일반 json으로 인코딩함)
+RELAY_RAW = allows_raw(sio.manager)
 # FastAPI 앱에 Socket.io 마운트
 app.mount("/socket.io", socketio.ASGIApp(sio))
 # Socket.io가 포함된 앱 (하위 호환성을 위해 유지)
@@ -58,52 +129,181 @@ async def favicon():
         # favicon이 없으면 빈 응답 반환
         return Response(content=b"", status_code=200, media_type="image/x-icon")
 
-# 정적 파일 서빙
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
 # 데이터베이스 초기화
-print(f"[DEBUG] 애플리케이션 시작: 데이터베이스 초기화 중...")
+logger.debug("애플리케이션 시작: 데이터베이스 초기화 중...")
 try:
     init_db()
-    print(f"[DEBUG] 데이터베이스 초기화 완료")
+    logger.debug("데이터베이스 초기화 완료")
 except Exception as e:
-    print(f"[ERROR] 데이터베이스 초기화 실패: {e}")
-    import traceback
-    print(f"[ERROR] 상세 오류:\n{traceback.format_exc()}")
+    logger.exception("데이터베이스 초기화 실패: %s", e)
+
+# 회의실, 사용자, 대기 목록, 공유 파일 정보 관리
+# (기본은 메모리 저장소, REDIS_URL 설정 시 여러 워커가 공유하는 Redis 저장소)
+store = create_room_store()
+
+# ice-candidates 묶음 프레임을 처리할 수 있다고 알린 클라이언트 (연결 시 auth={"ice_batch": true})
+# 이 워커에 연결된 sid만 알 수 있으므로 다른 워커에 연결된 대상에게는 기존처럼 개별 전송
+ice_batch_sids = set()
+
+# whiteboard-draw 구간 형식({from, g, segments})을 처리할 수 있다고 알린 클라이언트 (연결 시 auth={"whiteboard_segments": true})
+# 알리지 않은 클라이언트는 기존처럼 보낸 그리기 이벤트를 그대로 받음
+whiteboard_segment_sids = set()
+
+
+def _whiteboard_room(room_id: str, segments: bool) -> str:
+    """형식별 화이트보드 수신 방 (참가 시 들어가므로 다른 워커의 참가자도 형식에 맞게 받음)"""
+    return f"{room_id}:whiteboard-{'segments' if segments else 'legacy'}"
+
+
+async def _send_ice_candidates(from_sid: str, to_sid: str, candidates: List[Dict]):
+    await sio.emit("ice-candidates", {
+        "candidates": candidates,
+        "from": from_sid
+    }, room=to_sid)
+
+
+# (보낸 sid, 받는 sid) 쌍별 ICE candidate 묶음 전송 (ICE_BATCH_WINDOW_MS)
+ice_batcher = IceCandidateBatcher(_send_ice_candidates)
+
+async def _send_whiteboard_segments(room_id: str, author_sid: str, segments: List[Dict]):
+    # 송신 대기열이 밀린 수신자는 건너뜀 (구간 번호로 빠진 부분을 알아채고 whiteboard_sync로 다시 받음)
+    room = _whiteboard_room(room_id, True)
+    slow = slow_consumers(sio, room)
+    if slow:
+        metrics.SIO_SLOW_CONSUMER_SKIPS.labels("whiteboard-draw").inc(len(slow))
+    await sio.emit("whiteboard-draw", {
+        "from": author_sid,
+        "g": whiteboard.grid,
+        "segments": segments
+    }, room=room, skip_sid=[author_sid] + slow)
+
+
+# 회의실별 화이트보드 상태 (획 기록/스냅샷, WHITEBOARD_BATCH_MS마다 구간 묶음 전송)
+whiteboard = WhiteboardEngine(_send_whiteboard_segments)
+
+def _chat_message(username: str, message: str, sent_at: datetime) -> Dict:
+    """클라이언트에 보낼 채팅 메시지 (sent_at은 DB와 같은 UTC, 표시 시각은 서버 현지 시각)"""
+    local_time = sent_at.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return {
+        "username": username,
+        "message": message,
+        "timestamp": local_time.isoformat()
+    }
+
+
+async def _load_chat_history(room_id: str, limit: int):
+    """회의실의 최근 채팅을 DB에서 읽기 (회의실당 처음 한 번, 저널에 남은 메시지를 먼저 커밋)"""
+    room = await store.get_room(room_id)
+    if room is None or not room.db_id:
+        return []
+    await journal.flush()
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(MeetingEvent.username, MeetingEvent.message, MeetingEvent.timestamp)
+            .where(MeetingEvent.meeting_id == room.db_id, MeetingEvent.event_type == "chat")
+            .order_by(MeetingEvent.timestamp.desc(), MeetingEvent.id.desc())
+            .limit(limit)
+        )
+        rows = result.all()
+    return [
+        ((username, message, timestamp), _chat_message(username, message, timestamp))
+        for username, message, timestamp in reversed(rows)
+    ]
+
 
-# 회의실 및 사용자 관리
-rooms: Dict[str, Dict] = {}
-users: Dict[str, Dict] = {}
+# 회의실별 최근 채팅 (참가 시 chat-history로 전송, CHAT_HISTORY_SIZE)
+chat_history = ChatHistory(_load_chat_history)
+
+
+async def _activate_meeting(room_id: str, user_id: Optional[int]) -> int:
+    """
+    회의실의 회의를 만들거나 다시 활성화하고 meeting_id 반환
+
+    room_id가 unique이므로 INSERT ... ON CONFLICT DO UPDATE ... RETURNING 한 문장으로 처리
+    (동시에 같은 방에 들어와도 회의가 둘 생기지 않음, started_at/created_by는 처음 값 유지)
+    activated_at을 갱신해서 이보다 먼저 나간 참가자가 남긴 종료 기록이 나중에 커밋되어도 회의를 끝내지 않음
+    """
+    now = datetime.utcnow()
+    insert = postgresql.insert if async_engine.dialect.name == "postgresql" else sqlite.insert
+    statement = insert(Meeting).values(
+        room_id=room_id, created_by=user_id, started_at=now, activated_at=now, is_active=True
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[Meeting.room_id], set_={"is_active": True, "ended_at": None, "activated_at": now}
+    ).returning(Meeting.id)
+    async with AsyncSessionLocal() as db:
+        meeting_id = (await db.execute(statement)).scalar_one()
+        await db.commit()
+    return meeting_id
+
+
+# 진행 중인 회의의 room_id → meeting_id (참가 시 DB 조회 생략)
+meetings = MeetingCache()
+
+# (sid, 이벤트)별 속도 제한 (RATE_LIMITS 환경 변수로 조정)
+rate_limiter = RateLimiter()
+
+# 지문/압축을 적용한 정적 자산 (lifespan 시작 시 build)
+static_assets = StaticAssets()
 
 # 파일 공유 디렉토리 설정
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
+# 공유 파일 내용은 sha256 blob으로 한 벌만 저장 (참조가 없어진 blob은 GC가 삭제)
+blob_store = BlobStore(store, UPLOAD_DIR)
+# 청크 업로드/다운로드 (파일 정보는 store에 회의실별로 보관)
+file_share = FileShare(store, UPLOAD_DIR, blob_store)
 
-# 파일 정보 저장 (메모리 기반, 실제로는 DB 사용 권장)
-shared_files: Dict[str, Dict] = {}
+def _static_asset(request: Request, path: str) -> Response:
+    """시작 시 준비한 정적 자산 응답 (압축/ETag/304)"""
+    response = static_assets.response(
+        path, request.headers.get("accept-encoding"), request.headers.get("if-none-match")
+    )
+    if response is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="파일을 찾을 수 없습니다")
+    return response
 
 @app.get("/")
-async def read_root():
-    """메인 페이지"""
-    return FileResponse("static/index.html")
+async def read_root(request: Request):
+    """메인 페이지 (app.js/style.css 경로는 지문이 붙은 /assets/ URL로 바뀜)"""
+    return _static_asset(request, "/")
 
+@app.get("/manifest.json")
 @app.get("/static/manifest.json")
-async def get_manifest():
+async def get_manifest(request: Request):
     """PWA 매니페스트"""
-    return FileResponse("static/manifest.json", media_type="application/json")
+    return _static_asset(request, "/manifest.json")
 
+@app.get("/sw.js")
 @app.get("/static/sw.js")
-async def get_service_worker():
-    """Service Worker"""
-    return FileResponse("static/sw.js", media_type="application/javascript")
+async def get_service_worker(request: Request):
+    """Service Worker (CACHE_NAME과 캐시 목록은 정적 자산 지문으로 생성)"""
+    return _static_asset(request, "/sw.js")
+
+@app.get("/assets/{name}")
+async def get_asset(name: str, request: Request):
+    """지문이 붙은 정적 자산 (immutable 캐시)"""
+    return _static_asset(request, f"/assets/{name}")
+
+# 나머지 정적 파일 서빙 (위 경로가 먼저 매칭되도록 라우트 등록 뒤에 마운트)
+app.mount("/static", StaticFiles(directory="static"), name="static")
 
 @app.get("/health")
 async def health_check():
     """헬스 체크"""
-    print(f"[DEBUG] Health check 요청: {datetime.now().isoformat()}")
-    print(f"[DEBUG] 현재 상태 - 방 개수: {len(rooms)}, 연결된 사용자 수: {len(users)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Health check 요청: 방 개수=%s, 연결된 사용자 수=%s", await store.count_rooms(), await store.count_users())
     return {"status": "ok", "timestamp": datetime.now().isoformat()}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus 텍스트 형식 메트릭"""
+    metrics.ACTIVE_ROOMS.set(await store.count_rooms())
+    metrics.CONNECTED_SIDS.set(await store.count_users())
+    metrics.WAITING_USERS.set(await store.count_waiting())
+    metrics.JOURNAL_PENDING.set(journal.pending)
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 # 인증 API
 class UserRegister(BaseModel):
     username: str
@@ -119,15 +319,23 @@ class TokenResponse(BaseModel):
     token_type: str = "bearer"
     user: dict
 
+def _hasher_busy_error() -> HTTPException:
+    """비밀번호 해싱 워커 풀이 가득 찼을 때의 응답 (대기열에 쌓지 않고 즉시 실패)"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="요청이 많아 잠시 후 다시 시도해주세요",
+        headers={"Retry-After": "1"},
+    )
+
 @app.post("/api/register", response_model=TokenResponse)
 async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     """회원가입"""
-    print(f"[DEBUG] ===== 회원가입 요청 =====")
-    print(f"[DEBUG] username={user_data.username}, email={user_data.email}")
+    logger.debug("===== 회원가입 요청 =====")
+    logger.debug("username=%s", user_data.username)
     
     # 사용자명 중복 확인
     if get_user_by_username(db, user_data.username):
-        print(f"[WARNING] 사용자명 중복: {user_data.username}")
+        logger.warning("사용자명 중복: %s", user_data.username)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="이미 사용 중인 사용자명입니다"
@@ -135,7 +343,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     
     # 이메일 중복 확인
     if get_user_by_email(db, user_data.email):
-        print(f"[WARNING] 이메일 중복: {user_data.email}")
+        logger.warning("이메일 중복: username=%s", user_data.username)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="이미 사용 중인 이메일입니다"
@@ -143,7 +351,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     
     # 비밀번호 길이 검증
     if len(user_data.password) < 6:
-        print(f"[WARNING] 비밀번호 길이 부족: {len(user_data.password)}")
+        logger.warning("비밀번호 길이 부족: %s", len(user_data.password))
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="비밀번호는 최소 6자 이상이어야 합니다"
@@ -151,20 +359,20 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     
     # 사용자 생성
     try:
-        print(f"[DEBUG] 사용자 생성 중...")
-        db_user = create_user(
+        logger.debug("사용자 생성 중...")
+        db_user = await create_user_async(
             db=db,
             username=user_data.username,
             email=user_data.email,
             password=user_data.password
         )
-        print(f"[DEBUG] 사용자 생성 완료: user_id={db_user.id}")
+        logger.debug("사용자 생성 완료: user_id=%s", db_user.id)
         
         # JWT 토큰 생성
         access_token = create_access_token(data={"sub": db_user.username, "user_id": db_user.id})
-        print(f"[DEBUG] JWT 토큰 생성 완료")
+        logger.debug("JWT 토큰 생성 완료")
         
-        print(f"[DEBUG] ===== 회원가입 완료 =====")
+        logger.debug("===== 회원가입 완료 =====")
         return TokenResponse(
             access_token=access_token,
             user={
@@ -173,10 +381,11 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
                 "email": db_user.email
             }
         )
+    except PasswordHasherBusy:
+        logger.warning("비밀번호 해싱 대기열 초과: 회원가입 거절")
+        raise _hasher_busy_error()
     except Exception as e:
-        print(f"[ERROR] 회원가입 중 오류: {e}")
-        import traceback
-        print(f"[ERROR] 상세 오류:\n{traceback.format_exc()}")
+        logger.exception("회원가입 중 오류: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"회원가입 중 오류가 발생했습니다: {str(e)}"
@@ -195,25 +404,29 @@ async def register_compat(user_data: UserRegister, db: Session = Depends(get_db)
 @app.post("/api/login", response_model=TokenResponse)
 async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """로그인"""
-    print(f"[DEBUG] ===== 로그인 요청 =====")
-    print(f"[DEBUG] username={user_data.username}")
+    logger.debug("===== 로그인 요청 =====")
+    logger.debug("username=%s", user_data.username)
     
-    # 사용자 인증
-    user = authenticate_user(db, user_data.username, user_data.password)
+    # 사용자 인증 (bcrypt 검증은 워커 풀에서 실행)
+    try:
+        user = await authenticate_user_async(db, user_data.username, user_data.password)
+    except PasswordHasherBusy:
+        logger.warning("비밀번호 해싱 대기열 초과: 로그인 거절")
+        raise _hasher_busy_error()
     if not user:
-        print(f"[WARNING] 로그인 실패: 사용자명 또는 비밀번호 오류")
+        logger.warning("로그인 실패: 사용자명 또는 비밀번호 오류")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="사용자명 또는 비밀번호가 올바르지 않습니다",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"[DEBUG] 사용자 인증 성공: user_id={user.id}, username={user.username}")
+    logger.debug("사용자 인증 성공: user_id=%s, username=%s", user.id, user.username)
     
     # JWT 토큰 생성
     access_token = create_access_token(data={"sub": user.username, "user_id": user.id})
-    print(f"[DEBUG] JWT 토큰 생성 완료")
-    print(f"[DEBUG] ===== 로그인 완료 =====")
+    logger.debug("JWT 토큰 생성 완료")
+    logger.debug("===== 로그인 완료 =====")
     
     return TokenResponse(
         access_token=access_token,
@@ -237,10 +450,10 @@ async def login_compat(user_data: UserLogin, db: Session = Depends(get_db)):
 async def get_current_user(
     authorization: Optional[str] = Header(None),
     db: Session = Depends(get_db)
-) -> User:
-    """현재 사용자 조회 (의존성)"""
+) -> UserContext:
+    """현재 사용자 조회 (의존성, 토큰 검증과 사용자 정보 모두 캐시 우선)"""
     if not authorization:
-        print(f"[WARNING] 인증 토큰 없음")
+        logger.warning("인증 토큰 없음")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="인증 토큰이 필요합니다",
@@ -251,7 +464,7 @@ async def get_current_user(
     try:
         token = authorization.replace("Bearer ", "")
     except:
-        print(f"[WARNING] 잘못된 인증 형식: {authorization[:20]}...")
+        logger.warning("잘못된 인증 형식: %s...", authorization[:20])
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="잘못된 인증 형식입니다",
@@ -261,7 +474,7 @@ async def get_current_user(
     # 토큰 검증
     payload = verify_token(token)
     if payload is None:
-        print(f"[WARNING] 토큰 검증 실패")
+        logger.warning("토큰 검증 실패")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="유효하지 않은 토큰입니다",
@@ -271,18 +484,18 @@ async def get_current_user(
     username: str = payload.get("sub")
     user_id: int = payload.get("user_id")
     if username is None or user_id is None:
-        print(f"[WARNING] 토큰 페이로드 불완전: username={username}, user_id={user_id}")
+        logger.warning("토큰 페이로드 불완전: username=%s, user_id=%s", username, user_id)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="유효하지 않은 토큰입니다",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"[DEBUG] 토큰 검증 성공: username={username}, user_id={user_id}")
+    logger.debug("토큰 검증 성공: username=%s, user_id=%s", username, user_id)
     
-    user = get_user_by_id(db, user_id)
+    user = get_user_context(db, user_id)
     if user is None:
-        print(f"[WARNING] 사용자 찾을 수 없음: user_id={user_id}")
+        logger.warning("사용자 찾을 수 없음: user_id=%s", user_id)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="사용자를 찾을 수 없습니다",
@@ -292,9 +505,9 @@ async def get_current_user(
     return user
 
 @app.get("/api/me")
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: UserContext = Depends(get_current_user)):
     """현재 로그인한 사용자 정보 조회"""
-    print(f"[DEBUG] 사용자 정보 조회: user_id={current_user.id}, username={current_user.username}")
+    logger.debug("사용자 정보 조회: user_id=%s, username=%s", current_user.id, current_user.username)
     return {
         "id": current_user.id,
         "username": current_user.username,
@@ -303,29 +516,76 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
         "last_login": current_user.last_login.isoformat() if current_user.last_login else None
     }
 
+MEETINGS_PAGE_MAX = 100  # 회의 목록 한 페이지 최대 크기
+
+
+def _encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """keyset 페이지네이션 커서 생성 (정렬 시각 + id)"""
+    raw = f"{sort_value.isoformat() if sort_value else ''}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str):
+    """커서 해석 (잘못된 커서는 400)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_text, row_id = base64.urlsafe_b64decode(padded.encode()).decode().rsplit("|", 1)
+        return (datetime.fromisoformat(sort_text) if sort_text else None), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="잘못된 커서입니다"
+        )
+
+
 @app.get("/api/meetings")
 async def get_meetings(
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 20,
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """사용자가 참가한 회의 목록 조회"""
-    print(f"[DEBUG] 회의 목록 조회 요청: user_id={current_user.id}, skip={skip}, limit={limit}")
+    """
+    사용자가 참가한 회의 목록 조회
+
+    started_at 내림차순 keyset 페이지네이션: 응답의 next_cursor를 다음 요청의 cursor로 전달
+    """
+    limit = max(1, min(limit, MEETINGS_PAGE_MAX))
+    logger.debug("회의 목록 조회 요청: user_id=%s, cursor=%s, limit=%s", current_user.id, cursor, limit)
+    
+    # 사용자가 참가한 회의 (같은 회의에 여러 번 참가해도 한 번만)
+    my_meeting_ids = select(MeetingParticipant.meeting_id).where(
+        MeetingParticipant.user_id == current_user.id
+    )
     
-    # 사용자가 참가한 회의 조회
-    meetings = db.query(Meeting).join(MeetingParticipant).filter(
+    # 회의와 참가자 수를 한 번의 집계 쿼리로 조회
+    participant_count = func.count(MeetingParticipant.id).label("participant_count")
+    query = db.query(Meeting, participant_count).outerjoin(
+        MeetingParticipant, MeetingParticipant.meeting_id == Meeting.id
+    ).filter(
+        Meeting.id.in_(my_meeting_ids)
+    ).group_by(Meeting.id)
+    
+    if cursor:
+        after_started_at, after_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            Meeting.started_at < after_started_at,
+            and_(Meeting.started_at == after_started_at, Meeting.id < after_id)
+        ))
+    
+    # 한 건 더 조회해서 다음 페이지 존재 여부 확인
+    rows = query.order_by(Meeting.started_at.desc(), Meeting.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    total = db.query(func.count(distinct(MeetingParticipant.meeting_id))).filter(
         MeetingParticipant.user_id == current_user.id
-    ).order_by(Meeting.started_at.desc()).offset(skip).limit(limit).all()
+    ).scalar()
     
-    print(f"[DEBUG] 조회된 회의 수: {len(meetings)}")
+    logger.debug("조회된 회의 수: %s, 전체: %s", len(rows), total)
     
     result = []
-    for meeting in meetings:
-        participants = db.query(MeetingParticipant).filter(
-            MeetingParticipant.meeting_id == meeting.id
-        ).all()
-        
+    for meeting, count in rows:
         result.append({
             "id": meeting.id,
             "room_id": meeting.room_id,
@@ -334,70 +594,149 @@ async def get_meetings(
             "ended_at": meeting.ended_at.isoformat() if meeting.ended_at else None,
             "duration_seconds": meeting.duration_seconds,
             "is_active": meeting.is_active,
-            "participant_count": len(participants)
+            "participant_count": count
         })
     
-    print(f"[DEBUG] 회의 목록 반환: total={len(result)}")
-    return {"meetings": result, "total": len(result)}
-
-@app.get("/api/meetings/{meeting_id}/timeline")
-async def get_meeting_timeline(
-    meeting_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """회의 타임라인 조회"""
-    print(f"[DEBUG] 타임라인 조회 요청: meeting_id={meeting_id}, user_id={current_user.id}")
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1][0]
+        next_cursor = _encode_cursor(last.started_at, last.id)
     
-    # 회의 존재 확인 및 권한 확인
+    return {"meetings": result, "total": total, "next_cursor": next_cursor}
+
+TIMELINE_PAGE_MAX = 1000  # 타임라인 한 페이지 최대 이벤트 수
+PARTICIPANTS_PAGE_MAX = 500  # 참가자 목록 한 페이지 최대 크기
+TIMELINE_PARTICIPANTS = 100  # 타임라인 첫 페이지에 함께 보내는 참가자 수
+TIMELINE_EXPORT_CHUNK = int(os.getenv("TIMELINE_EXPORT_CHUNK", "1000"))  # 내보내기 시 한 번에 가져올 행 수
+
+
+def _get_accessible_meeting(db: Session, meeting_id: int, current_user: UserContext) -> Meeting:
+    """회의 존재 및 접근 권한 확인 (참가자 또는 생성자만)"""
     meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
     if not meeting:
-        print(f"[WARNING] 회의를 찾을 수 없음: meeting_id={meeting_id}")
+        logger.warning("회의를 찾을 수 없음: meeting_id=%s", meeting_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="회의를 찾을 수 없습니다"
         )
     
-    print(f"[DEBUG] 회의 찾음: room_id={meeting.room_id}, is_active={meeting.is_active}")
+    logger.debug("회의 찾음: room_id=%s, is_active=%s", meeting.room_id, meeting.is_active)
     
     # 참가자 확인 (권한 체크)
-    participant = db.query(MeetingParticipant).filter(
+    participant = db.query(MeetingParticipant.id).filter(
         MeetingParticipant.meeting_id == meeting_id,
         MeetingParticipant.user_id == current_user.id
     ).first()
     
     if not participant and meeting.created_by != current_user.id:
-        print(f"[WARNING] 접근 권한 없음: user_id={current_user.id}, meeting_id={meeting_id}")
+        logger.warning("접근 권한 없음: user_id=%s, meeting_id=%s", current_user.id, meeting_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="이 회의에 대한 접근 권한이 없습니다"
         )
+    return meeting
+
+
+def _timeline_query(
+    meeting_id: int,
+    event_type: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """타임라인 이벤트 조회문 (시간순, 유형/기간 필터 적용)"""
+    query = select(MeetingEvent).where(MeetingEvent.meeting_id == meeting_id)
+    if event_type:
+        query = query.where(MeetingEvent.event_type.in_(event_type))
+    if since:
+        query = query.where(MeetingEvent.timestamp >= since)
+    if until:
+        query = query.where(MeetingEvent.timestamp < until)
+    return query.order_by(MeetingEvent.timestamp.asc(), MeetingEvent.id.asc())
+
+
+def _participants_page(db: Session, meeting_id: int, cursor: Optional[str], limit: int):
+    """참가 시간순 keyset 페이지 (반환: 참가자 목록, next_cursor)"""
+    query = select(MeetingParticipant).where(MeetingParticipant.meeting_id == meeting_id)
+    if cursor:
+        after_joined_at, after_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            MeetingParticipant.joined_at > after_joined_at,
+            and_(MeetingParticipant.joined_at == after_joined_at, MeetingParticipant.id > after_id)
+        ))
+    # 한 건 더 조회해서 다음 페이지 존재 여부 확인
+    rows = db.execute(
+        query.order_by(MeetingParticipant.joined_at.asc(), MeetingParticipant.id.asc()).limit(limit + 1)
+    ).scalars().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].joined_at, rows[-1].id)
+    participants = [
+        {
+            "id": p.id,
+            "username": p.username,
+            "joined_at": p.joined_at.isoformat() if p.joined_at else None,
+            "left_at": p.left_at.isoformat() if p.left_at else None,
+            "duration_seconds": p.duration_seconds
+        }
+        for p in rows
+    ]
+    return participants, next_cursor
+
+
+def _event_to_dict(event: MeetingEvent) -> Dict:
+    """타임라인 이벤트 포맷팅"""
+    return {
+        "id": event.id,
+        "type": event.event_type,
+        "username": event.username,
+        "timestamp": event.timestamp.isoformat() if event.timestamp else None,
+        "message": event.message,
+        "data": event.data
+    }
+
+
+@app.get("/api/meetings/{meeting_id}/timeline")
+async def get_meeting_timeline(
+    meeting_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 200,
+    event_type: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: UserContext = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    회의 타임라인 조회
+
+    이벤트는 시간순 keyset 페이지네이션: 응답의 next_cursor를 다음 요청의 cursor로 전달
+    event_type(여러 번 지정 가능), since/until(ISO 시각)로 필터링
+    참가자는 첫 페이지에만 TIMELINE_PARTICIPANTS명까지 포함 (나머지는 participants_next_cursor로
+    /api/meetings/{meeting_id}/participants에서 조회), 페이지마다 회의 크기에 비례하는 조회를 하지 않음
+    """
+    limit = max(1, min(limit, TIMELINE_PAGE_MAX))
+    logger.debug("타임라인 조회 요청: meeting_id=%s, user_id=%s, cursor=%s, limit=%s", meeting_id, current_user.id, cursor, limit)
     
-    # 회의 정보
-    participants = db.query(MeetingParticipant).filter(
-        MeetingParticipant.meeting_id == meeting_id
-    ).all()
-    
-    # 타임라인 이벤트 조회
-    events = db.query(MeetingEvent).filter(
-        MeetingEvent.meeting_id == meeting_id
-    ).order_by(MeetingEvent.timestamp.asc()).all()
-    
-    print(f"[DEBUG] 타임라인 데이터: 참가자 수={len(participants)}, 이벤트 수={len(events)}")
-    
-    # 이벤트 포맷팅
-    timeline_events = []
-    for event in events:
-        timeline_events.append({
-            "id": event.id,
-            "type": event.event_type,
-            "username": event.username,
-            "timestamp": event.timestamp.isoformat() if event.timestamp else None,
-            "message": event.message,
-            "data": event.data
-        })
+    meeting = _get_accessible_meeting(db, meeting_id, current_user)
     
-    return {
+    # 타임라인 이벤트 조회 (한 건 더 조회해서 다음 페이지 존재 여부 확인)
+    query = _timeline_query(meeting_id, event_type, since, until)
+    if cursor:
+        after_timestamp, after_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            MeetingEvent.timestamp > after_timestamp,
+            and_(MeetingEvent.timestamp == after_timestamp, MeetingEvent.id > after_id)
+        ))
+    events = db.execute(query.limit(limit + 1)).scalars().all()
+    has_more = len(events) > limit
+    events = events[:limit]
+    
+    next_cursor = None
+    if has_more and events:
+        next_cursor = _encode_cursor(events[-1].timestamp, events[-1].id)
+    
+    response = {
         "meeting": {
             "id": meeting.id,
             "room_id": meeting.room_id,
@@ -407,23 +746,84 @@ async def get_meeting_timeline(
             "duration_seconds": meeting.duration_seconds,
             "is_active": meeting.is_active
         },
-        "participants": [
-            {
-                "id": p.id,
-                "username": p.username,
-                "joined_at": p.joined_at.isoformat() if p.joined_at else None,
-                "left_at": p.left_at.isoformat() if p.left_at else None,
-                "duration_seconds": p.duration_seconds
-            }
-            for p in participants
-        ],
-        "timeline": timeline_events
+        "timeline": [_event_to_dict(event) for event in events],
+        "next_cursor": next_cursor
     }
+    if not cursor:
+        participants, participants_cursor = _participants_page(db, meeting_id, None, TIMELINE_PARTICIPANTS)
+        response["participants"] = participants
+        response["participants_next_cursor"] = participants_cursor
+    
+    logger.debug("타임라인 데이터: 참가자 수=%s, 이벤트 수=%s", len(response.get("participants", ())), len(events))
+    return response
+
+@app.get("/api/meetings/{meeting_id}/participants")
+async def get_meeting_participants(
+    meeting_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    current_user: UserContext = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    회의 참가자 목록 조회
+
+    참가 시간순 keyset 페이지네이션: 응답의 next_cursor를 다음 요청의 cursor로 전달
+    """
+    limit = max(1, min(limit, PARTICIPANTS_PAGE_MAX))
+    logger.debug("참가자 목록 조회 요청: meeting_id=%s, user_id=%s, cursor=%s, limit=%s", meeting_id, current_user.id, cursor, limit)
+    _get_accessible_meeting(db, meeting_id, current_user)
+    participants, next_cursor = _participants_page(db, meeting_id, cursor, limit)
+    return {"participants": participants, "next_cursor": next_cursor}
+
+@app.get("/api/meetings/{meeting_id}/timeline/export")
+async def export_meeting_timeline(
+    meeting_id: int,
+    event_type: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: UserContext = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    회의 타임라인 전체를 NDJSON(한 줄에 이벤트 하나)으로 스트리밍
+
+    서버 측 커서에서 TIMELINE_EXPORT_CHUNK개씩 읽어 바로 내보내므로 회의 크기와 무관하게 메모리 사용량이 일정함
+    """
+    logger.debug("타임라인 내보내기 요청: meeting_id=%s, user_id=%s", meeting_id, current_user.id)
+    _get_accessible_meeting(db, meeting_id, current_user)
+    query = _timeline_query(meeting_id, event_type, since, until).execution_options(
+        stream_results=True, yield_per=TIMELINE_EXPORT_CHUNK
+    )
+    
+    def generate():
+        # 응답 스트리밍 동안 사용할 별도 세션 (요청 세션은 응답 전에 닫힐 수 있음)
+        # 동기 제너레이터라서 Starlette가 스레드풀에서 실행하므로 이벤트 루프를 막지 않음
+        export_db = SessionLocal()
+        try:
+            for partition in export_db.execute(query).scalars().partitions():
+                yield "".join(
+                    json.dumps(_event_to_dict(event), ensure_ascii=False) + "\n"
+                    for event in partition
+                )
+        finally:
+            export_db.close()
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="meeting-{meeting_id}-timeline.ndjson"'}
+    )
 
 @app.get("/api/meetings/room/{room_id}/timeline")
 async def get_meeting_timeline_by_room(
     room_id: str,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = 200,
+    event_type: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: UserContext = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """회의실 ID로 타임라인 조회"""
@@ -434,120 +834,215 @@ async def get_meeting_timeline_by_room(
             detail="회의를 찾을 수 없습니다"
         )
     
-    return await get_meeting_timeline(meeting.id, current_user, db)
+    return await get_meeting_timeline(
+        meeting.id, cursor, limit, event_type, since, until, current_user, db
+    )
+
+# 파일 공유 API
+# 요청의 sid(Socket.IO 연결 ID)가 해당 회의실 참가자인지로 권한 확인
+class FileUploadStart(BaseModel):
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+    sha256: Optional[str] = Field(None, pattern=r"^[0-9a-fA-F]{64}$")  # 같은 회의실에 같은 내용이 있으면 업로드 생략
+
+async def _room_member(sid: str, room_id: str):
+    """sid가 회의실 참가자인지 확인 (아니면 403)"""
+    user = await store.get_user(sid)
+    if user is None or user.room_id != room_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="회의실 참가자만 파일을 공유할 수 있습니다"
+        )
+    return user
+
+async def _shared_file(file_id: str, sid: str) -> Dict:
+    """파일 정보 조회 및 같은 회의실 참가자인지 확인"""
+    info = await store.get_file(file_id)
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="파일을 찾을 수 없습니다"
+        )
+    await _room_member(sid, info["room_id"])
+    return info
+
+def _upload_status(info: Dict) -> Dict:
+    return {
+        "file_id": info["file_id"],
+        "offset": info["offset"],
+        "size": info["size"],
+        "complete": info["complete"],
+        "chunk_size": file_share.chunk_bytes,
+    }
+
+@app.post("/api/rooms/{room_id}/files", status_code=status.HTTP_201_CREATED)
+async def start_file_upload(room_id: str, body: FileUploadStart, sid: str = Query(...)):
+    """
+    파일 업로드 시작
+
+    응답의 file_id로 PUT /api/files/{file_id}/content에 청크를 순서대로 보냄
+    """
+    user = await _room_member(sid, room_id)
+    try:
+        info = await file_share.create(
+            room_id, body.filename, body.size, body.content_type, user.username, sha256=body.sha256
+        )
+    except ValueError as e:
+        # 413/416은 Starlette 버전마다 상수 이름이 달라 숫자로 씀
+        raise HTTPException(status_code=413, detail=str(e))
+    if info["complete"]:
+        await sio.emit("file-shared", info, room=room_id)
+    return _upload_status(info)
+
+@app.put("/api/files/{file_id}/content")
+async def upload_file_chunk(
+    file_id: str,
+    request: Request,
+    sid: str = Query(...),
+    content_range: Optional[str] = Header(None)
+):
+    """
+    파일 청크 업로드 (본문을 받는 대로 디스크에 기록)
+
+    Content-Range: bytes 시작-끝/전체 로 위치를 지정 (없으면 현재 offset부터)
+    위치가 맞지 않으면 409와 함께 현재 offset을 돌려주므로 그 위치부터 다시 보내면 됨
+    """
+    info = await _shared_file(file_id, sid)
+    try:
+        parsed = parse_content_range(content_range)
+    except ValueError as e:
+        raise HTTPException(status_code=416, detail=str(e))
+    start = parsed[0] if parsed else info["offset"]
+    try:
+        info = await file_share.write_chunk(info, start, request.stream())
+    except UploadConflict as e:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": str(e), "offset": e.offset},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ClientDisconnect:
+        logger.info("파일 청크 업로드 중 연결 끊김: %s (이어 올리기 가능)", file_id)
+        return Response(status_code=status.HTTP_400_BAD_REQUEST)
+    if info["complete"]:
+        await sio.emit("file-shared", info, room=info["room_id"])
+    return _upload_status(info)
+
+@app.get("/api/files/{file_id}/status")
+async def get_file_upload_status(file_id: str, sid: str = Query(...)):
+    """업로드 진행 상태 (이어 올릴 offset)"""
+    return _upload_status(await _shared_file(file_id, sid))
+
+@app.get("/api/rooms/{room_id}/files")
+async def list_room_files(room_id: str, sid: str = Query(...)):
+    """회의실에 공유된 파일 목록 (업로드가 끝난 파일만)"""
+    await _room_member(sid, room_id)
+    files = [info for info in await store.list_files(room_id) if info.get("complete")]
+    files.sort(key=lambda info: info["created_at"])
+    return {"files": files}
+
+@app.get("/api/files/{file_id}")
+async def download_file(file_id: str, sid: str = Query(...)):
+    """파일 다운로드 (Range 요청 지원, 파일 전체를 메모리에 올리지 않고 스트리밍)"""
+    info = await _shared_file(file_id, sid)
+    if not info["complete"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="아직 업로드 중인 파일입니다"
+        )
+    return FileResponse(file_share.file_path(info), media_type=info["content_type"], filename=info["filename"])
+
+@app.delete("/api/files/{file_id}")
+async def delete_file(file_id: str, sid: str = Query(...)):
+    """공유 파일 삭제"""
+    info = await _shared_file(file_id, sid)
+    await file_share.remove(info)
+    await sio.emit("file-removed", {"file_id": file_id}, room=info["room_id"])
+    return {"ok": True}
 
 # Socket.io 이벤트 핸들러
 @sio.event
-async def connect(sid, environ):
+async def connect(sid, environ, auth=None):
     """클라이언트 연결"""
     client_ip = environ.get("REMOTE_ADDR", "unknown")
-    print(f"[DEBUG] 클라이언트 연결: sid={sid}, ip={client_ip}")
-    print(f"[DEBUG] 현재 연결된 사용자 수: {len(users)}")
+    if isinstance(auth, dict) and auth.get("ice_batch"):
+        ice_batch_sids.add(sid)
+    if isinstance(auth, dict) and auth.get("whiteboard_segments"):
+        whiteboard_segment_sids.add(sid)
+    logger.debug("클라이언트 연결: sid=%s, ip=%s", sid, client_ip)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("현재 연결된 사용자 수: %s", await store.count_users())
     await sio.emit("connected", {"sid": sid}, room=sid)
 
 @sio.event
 async def disconnect(sid):
     """클라이언트 연결 해제"""
-    print(f"[DEBUG] 클라이언트 연결 해제 시작: sid={sid}")
+    logger.debug("클라이언트 연결 해제 시작: sid=%s", sid)
+    ice_batch_sids.discard(sid)
+    whiteboard_segment_sids.discard(sid)
+    ice_batcher.discard(sid)
+    rate_limiter.discard(sid)
+    whiteboard.discard(sid)
     # 사용자가 속한 방에서 제거
-        if sid in users:
-        user = users[sid]
-        room_id = user.get("room_id")
-        username = user.get("username")
-        user_id = user.get("user_id")
+    user = await store.get_user(sid)
+    if user:
+        room_id = user.room_id
+        username = user.username
+        user_id = user.user_id
         
-        print(f"[DEBUG] 사용자 정보: username={username}, room_id={room_id}, user_id={user_id}")
+        logger.debug("사용자 정보: username=%s, room_id=%s, user_id=%s", username, room_id, user_id)
         
         # 대기 목록에서 제거 (방 없는 연결인 경우)
-        if username in waiting_users:
-            del waiting_users[username]
-            print(f"[DEBUG] 대기 목록에서 제거: {username}")
+        if await store.cancel_waiting(sid):
+            logger.debug("대기 목록에서 제거: %s", username)
         
         # 방 없는 직접 연결인 경우
         if not room_id:
-            print(f"[DEBUG] 방 없는 직접 연결 종료")
+            logger.debug("방 없는 직접 연결 종료")
             # WebRTC 피어 연결은 클라이언트에서 처리
-        else:
-            # 기존 방 기반 연결 처리
-            db = SessionLocal()
+        elif user.meeting_id is not None or (room := await store.get_room(room_id)) is not None:
+            # 기존 방 기반 연결 처리 (DB 쓰기는 모두 저널로 보내므로 여기서는 조회/커밋 없음)
             try:
-                if room_id in rooms:
-                print(f"[DEBUG] 방 {room_id}에서 사용자 제거 중...")
-                print(f"[DEBUG] 방 {room_id} 현재 사용자 수: {len(rooms[room_id].get('users', []))}")
-                
-                if sid in rooms[room_id].get("users", []):
-                    rooms[room_id]["users"].remove(sid)
-                    print(f"[DEBUG] 사용자 제거 완료. 남은 사용자 수: {len(rooms[room_id]['users'])}")
+                logger.debug("방 %s에서 사용자 제거 중...", room_id)
+                # 나간 시각은 방에서 빼기 전에 정함 (이후 다시 활성화된 회의는 이 종료 기록으로 끝나지 않음)
+                left_at = datetime.utcnow()
+                remaining = await store.remove_member(room_id, sid)
+                logger.debug("사용자 제거 완료. 남은 사용자 수: %s", remaining)
                 
-                # 데이터베이스에 나감 이벤트 기록
-                meeting_id = rooms[room_id].get("db_id")
-                print(f"[DEBUG] Meeting ID: {meeting_id}")
+                # 데이터베이스에 나감 이벤트 기록 (참가 시 저장한 회의 ID, 없으면 방의 회의 ID)
+                meeting_id = user.meeting_id if user.meeting_id is not None else room.db_id
+                logger.debug("Meeting ID: %s", meeting_id)
                 
                 if meeting_id:
-                    # 참가자 정보 업데이트
-                    participant = db.query(MeetingParticipant).filter(
-                        MeetingParticipant.meeting_id == meeting_id,
-                        MeetingParticipant.username == username
-                    ).order_by(MeetingParticipant.joined_at.desc()).first()
+                    # 참가자 나감 시간 및 나감 이벤트 기록 (저널에서 일괄 커밋)
+                    # 참가 시간이 있으면 (meeting_id, username, joined_at) 키로 조회 없이 UPDATE
+                    joined_at = datetime.fromisoformat(user.joined_at) if user.meeting_id is not None else None
+                    await journal.record_leave(meeting_id, username, joined_at=joined_at, left_at=left_at)
+                    await journal.record_event(meeting_id, "user_leave", user_id=user_id, username=username)
+                    logger.debug("나감 이벤트 저널 기록 완료")
                     
-                    if participant:
-                        print(f"[DEBUG] 참가자 정보 찾음: participant_id={participant.id}")
-                        if not participant.left_at:
-                            participant.left_at = datetime.utcnow()
-                            if participant.joined_at:
-                                duration = (datetime.utcnow() - participant.joined_at).total_seconds()
-                                participant.duration_seconds = int(duration)
-                                print(f"[DEBUG] 참가자 참가 시간: {duration:.2f}초")
-                    else:
-                        print(f"[WARNING] 참가자 정보를 찾을 수 없음: username={username}, meeting_id={meeting_id}")
-                    
-                    # 나감 이벤트 기록
-                    event = MeetingEvent(
-                        meeting_id=meeting_id,
-                        event_type="user_leave",
-                        user_id=user_id,
-                        username=username,
-                        timestamp=datetime.utcnow()
-                    )
-                    db.add(event)
-                    print(f"[DEBUG] 나감 이벤트 기록 완료")
-                    
-                    # 방이 비어있으면 회의 종료 처리
+                    # 방이 비어있으면 회의 종료 처리 (같은 저널 배치에서 나감 기록 뒤에 커밋)
+                    # 그 사이에 다시 활성화되었거나 나가지 않은 참가자가 있으면 DB의 UPDATE 조건에서 건너뜀
                     # 주의: 메모리에서 방을 제거하지 않음 (같은 room_id로 재입장 시 같은 회의 사용을 위해)
-                    if len(rooms[room_id]["users"]) == 0:
-                        print(f"[DEBUG] 방이 비어있음. 회의 종료 처리 중...")
-                        meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
-                        if meeting:
-                            meeting.ended_at = datetime.utcnow()
-                            meeting.is_active = False
-                            if meeting.started_at:
-                                duration = (datetime.utcnow() - meeting.started_at).total_seconds()
-                                meeting.duration_seconds = int(duration)
-                                print(f"[DEBUG] 회의 종료: duration={duration:.2f}초")
-                            # 중요: 메모리에서 방을 제거하지 않음
-                            # 같은 room_id로 재입장 시 같은 meeting_id를 사용하기 위해 유지
-                            print(f"[DEBUG] 메모리 방 유지: 같은 room_id({room_id})로 재입장 시 같은 회의(meeting_id={meeting_id}) 사용")
-                    
-                    db.commit()
-                    print(f"[DEBUG] 데이터베이스 커밋 완료")
+                    if remaining == 0:
+                        logger.debug("방이 비어있음. 회의 종료 기록: meeting_id=%s", meeting_id)
+                        # 다음 참가는 캐시 대신 upsert로 회의를 다시 활성화하고 채팅 기록도 DB에서 다시 채움
+                        meetings.discard(room_id)
+                        chat_history.discard(room_id)
+                        await journal.record_meeting_end(meeting_id, ended_at=left_at)
                 
-                    await sio.emit("user-left", {"sid": sid, "username": username}, room=room_id)
-                    print(f"[DEBUG] user-left 이벤트 전송 완료")
+                await sio.emit("user-left", {"sid": sid, "username": username}, room=room_id)
+                logger.debug("user-left 이벤트 전송 완료")
             except Exception as e:
-                print(f"[ERROR] 연결 해제 중 오류: {e}")
-                import traceback
-                print(f"[ERROR] 상세 오류:\n{traceback.format_exc()}")
-                db.rollback()
-            finally:
-                db.close()
+                logger.exception("연결 해제 중 오류: %s", e)
         
-        del users[sid]
-        print(f"[DEBUG] 사용자 정보 삭제 완료. 현재 연결된 사용자 수: {len(users)}")
+        await store.remove_user(sid)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("사용자 정보 삭제 완료. 현재 연결된 사용자 수: %s", await store.count_users())
     else:
-        print(f"[WARNING] 연결 해제: 사용자 정보를 찾을 수 없음 (sid={sid})")
-
-# 대기 중인 사용자 목록 (방 없이 직접 연결용)
-waiting_users: Dict[str, Dict] = {}  # {username: {sid, username, target_username}}
+        logger.warning("연결 해제: 사용자 정보를 찾을 수 없음 (sid=%s)", sid)
 
 @sio.event
 async def start_connection(sid, data):
@@ -555,107 +1050,54 @@ async def start_connection(sid, data):
     username = data.get("username", f"User_{sid[:8]}")
     target_username = data.get("target_username")  # None이면 자동 매칭
     
-    print(f"[DEBUG] ===== 직접 연결 시작 =====")
-    print(f"[DEBUG] sid={sid}, username={username}, target_username={target_username}")
+    logger.debug("===== 직접 연결 시작 =====")
+    logger.debug("sid=%s, username=%s, target_username=%s", sid, username, target_username)
     
     # 사용자 정보 저장
-    users[sid] = {
-        "sid": sid,
-        "username": username,
-        "room_id": None,  # 방 없음
-        "user_id": None,
-        "joined_at": datetime.now().isoformat(),
-        "target_username": target_username
-    }
+    conn = Connection(sid, username, target_username=target_username)  # 방 없음
+    await store.set_user(conn)
+    
+    # 매칭 시도 - 상대가 없으면 대기열에 추가됨
+    # 지정 연결: 이름이 target_username이고 대상이 없거나 나를 기다리는 사용자
+    # 자동 매칭: 대상이 없거나 나를 기다리는 사용자 중 가장 오래 기다린 사용자
+    matched_user = await store.match_or_wait(sid, username, target_username)
     
-    if target_username:
-        # 특정 사용자에게 연결 시도
-        print(f"[DEBUG] 특정 사용자 연결 시도: {target_username}")
-        target_user = waiting_users.get(target_username)
+    if matched_user:
+        matched_sid = matched_user.sid
+        matched_username = matched_user.username
+        logger.debug("사용자 매칭 성공: %s <-> %s (sid=%s)", username, matched_username, matched_sid)
         
-        if target_user and target_user["sid"] != sid:
-            # 대상 사용자 찾음 - 연결 시작
-            target_sid = target_user["sid"]
-            print(f"[DEBUG] 대상 사용자 찾음: {target_username} (sid={target_sid})")
-            
-            # 대기 목록에서 제거
-            if target_username in waiting_users:
-                del waiting_users[target_username]
-            
-            # 양쪽 사용자에게 매칭 알림
-            # 먼저 연결한 사용자가 송신자 (is_sender=True)
-            await sio.emit("user-matched", {
-                "target_sid": target_sid,
-                "target_username": target_username,
-                "is_sender": True
-            }, room=sid)
-            
-            await sio.emit("user-matched", {
-                "target_sid": sid,
-                "target_username": username,
-                "is_sender": False
-            }, room=target_sid)
-            
-            print(f"[DEBUG] 사용자 매칭 완료: {username} <-> {target_username}")
-        else:
-            # 대상 사용자를 찾을 수 없음 - 대기 목록에 추가
-            print(f"[DEBUG] 대상 사용자를 찾을 수 없음. 대기 목록에 추가")
-            waiting_users[username] = {
-                "sid": sid,
-                "username": username,
-                "target_username": target_username
-            }
-            await sio.emit("connection-waiting", {
-                "message": f"{target_username} 사용자를 기다리는 중..."
-            }, room=sid)
-    else:
-        # 자동 매칭
-        print(f"[DEBUG] 자동 매칭 시도")
+        # 서로를 매칭 상대로 기록 (시그널링 릴레이 허용 대상)
+        conn.peer_sid = matched_sid
+        await store.set_user(conn)
+        matched_conn = await store.get_user(matched_sid)
+        if matched_conn is not None:
+            matched_conn.peer_sid = sid
+            await store.set_user(matched_conn)
         
-        # 대기 중인 다른 사용자 찾기
-        matched_user = None
-        for waiting_username, waiting_user in waiting_users.items():
-            # 자신이 아니고, 대상이 없거나 자신을 기다리는 사용자
-            if (waiting_user["sid"] != sid and 
-                (waiting_user["target_username"] is None or 
-                 waiting_user["target_username"] == username)):
-                matched_user = waiting_user
-                break
+        # 양쪽 사용자에게 매칭 알림
+        # 나중에 연결한 사용자(현재 요청)가 송신자 (is_sender=True)
+        await sio.emit("user-matched", {
+            "target_sid": matched_sid,
+            "target_username": matched_username,
+            "is_sender": True
+        }, room=sid)
         
-        if matched_user:
-            # 매칭된 사용자 찾음
-            matched_sid = matched_user["sid"]
-            matched_username = matched_user["username"]
-            print(f"[DEBUG] 자동 매칭 성공: {username} <-> {matched_username}")
-            
-            # 대기 목록에서 제거
-            if matched_username in waiting_users:
-                del waiting_users[matched_username]
-            
-            # 양쪽 사용자에게 매칭 알림
-            # 먼저 연결한 사용자가 송신자
-            await sio.emit("user-matched", {
-                "target_sid": matched_sid,
-                "target_username": matched_username,
-                "is_sender": True
-            }, room=sid)
-            
-            await sio.emit("user-matched", {
-                "target_sid": sid,
-                "target_username": username,
-                "is_sender": False
-            }, room=matched_sid)
-        else:
-            # 매칭할 사용자 없음 - 대기 목록에 추가
-            print(f"[DEBUG] 매칭할 사용자 없음. 대기 목록에 추가")
-            waiting_users[username] = {
-                "sid": sid,
-                "username": username,
-                "target_username": None
-            }
-            await sio.emit("connection-waiting", {
-                "message": "다른 사용자를 기다리는 중..."
-            }, room=sid)
+        await sio.emit("user-matched", {
+            "target_sid": sid,
+            "target_username": username,
+            "is_sender": False
+        }, room=matched_sid)
+    elif target_username:
+        logger.debug("대상 사용자를 찾을 수 없음. 대기 목록에 추가")
+        await sio.emit("connection-waiting", {
+            "message": f"{target_username} 사용자를 기다리는 중..."
+        }, room=sid)
+    else:
+        logger.debug("매칭할 사용자 없음. 대기 목록에 추가")
+        await sio.emit("connection-waiting", {
+            "message": "다른 사용자를 기다리는 중..."
+        }, room=sid)
 
 @sio.event
 async def join_room(sid, data):
@@ -664,249 +1106,187 @@ async def join_room(sid, data):
     username = data.get("username", f"User_{sid[:8]}")
     user_id = data.get("user_id")  # 로그인한 사용자의 ID (선택사항)
     
-    print(f"[DEBUG] ===== 회의실 참가 요청 =====")
-    print(f"[DEBUG] sid={sid}, username={username}, room_id={room_id}, user_id={user_id}")
-    print(f"[DEBUG] 현재 메모리 방 개수: {len(rooms)}")
-    print(f"[DEBUG] 현재 연결된 사용자 수: {len(users)}")
+    logger.debug("===== 회의실 참가 요청 =====")
+    logger.debug("sid=%s, username=%s, room_id=%s, user_id=%s", sid, username, room_id, user_id)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("현재 방 개수: %s, 연결된 사용자 수: %s", await store.count_rooms(), await store.count_users())
     
     if not room_id:
-        print(f"[ERROR] 방 ID가 없음")
+        logger.error("방 ID가 없음")
         await sio.emit("error", {"message": "방 ID가 필요합니다"}, room=sid)
         return
     
-    db = SessionLocal()
     try:
         # ===== 핵심: DB를 기준으로 항상 같은 회의를 사용 =====
-        # 같은 room_id면 무조건 같은 meeting을 사용하도록 DB를 먼저 확인
-        meeting = db.query(Meeting).filter(Meeting.room_id == room_id).order_by(Meeting.started_at.desc()).first()
-        
-        if meeting:
-            print(f"[DEBUG] DB에서 기존 회의 찾음: meeting_id={meeting.id}, is_active={meeting.is_active}")
-            print(f"[DEBUG] 같은 회의실 ID({room_id})는 항상 같은 회의(meeting_id={meeting.id})를 사용합니다")
-            
-            # DB 회의가 비활성인 경우 재활성화 (같은 회의를 계속 사용)
-            if not meeting.is_active:
-                print(f"[DEBUG] 비활성 회의 재활성화 중... (같은 회의 유지)")
-                meeting.is_active = True
-                # ended_at이 있으면 None으로 설정 (회의 재개)
-                if meeting.ended_at:
-                    meeting.ended_at = None
-                # started_at은 유지 (원래 시작 시간 보존)
-                db.commit()
-                print(f"[DEBUG] 회의 재활성화 완료: meeting_id={meeting.id}")
-        else:
-            # DB에 회의가 없으면 새로 생성
-            print(f"[DEBUG] DB에 회의 없음. 새 회의 생성 중...")
-            meeting = Meeting(
-                room_id=room_id,
-                created_by=user_id,
-                started_at=datetime.utcnow(),
-                is_active=True
-            )
-            db.add(meeting)
-            db.commit()
-            db.refresh(meeting)
-            print(f"[DEBUG] 새 회의 생성 완료: meeting_id={meeting.id}, room_id={room_id}")
-        
-        # 메모리 상태 확인 및 동기화
-        # 메모리에 방이 없으면 생성 (DB 회의를 기준으로)
-        if room_id not in rooms:
-            print(f"[DEBUG] 메모리에 방 없음. DB 회의 기준으로 방 생성 중...")
-            rooms[room_id] = {
-                "id": room_id,
-                "users": [],
-                "created_at": datetime.now().isoformat(),
-                "db_id": meeting.id  # DB 회의 ID 사용
-            }
-            print(f"[DEBUG] 메모리에 방 생성 완료: room_id={room_id}, db_id={meeting.id}")
-        else:
-            # 메모리에 방이 있으면 DB 회의 ID와 동기화 확인
-            existing_db_id = rooms[room_id].get("db_id")
-            if existing_db_id != meeting.id:
-                print(f"[WARNING] 메모리 방의 db_id({existing_db_id})와 DB 회의 ID({meeting.id}) 불일치. 동기화 중...")
-                rooms[room_id]["db_id"] = meeting.id
-                print(f"[DEBUG] 동기화 완료: db_id={meeting.id}")
-            else:
-                print(f"[DEBUG] 메모리 방과 DB 회의 동기화 확인: db_id={meeting.id}")
-            print(f"[DEBUG] 메모리 방 정보: users={len(rooms[room_id].get('users', []))}, db_id={rooms[room_id].get('db_id')}")
-        
-        # 사용자 정보 저장
-        users[sid] = {
-            "sid": sid,
-            "username": username,
-            "room_id": room_id,
-            "user_id": user_id,
-            "joined_at": datetime.now().isoformat()
-        }
-        print(f"[DEBUG] 사용자 정보 저장 완료")
-        
+        # 같은 room_id면 무조건 같은 meeting을 사용 (upsert로 생성/재활성화, started_at은 원래 값 유지)
+        # 다른 참가자가 있는 방은 회의가 진행 중이므로 캐시된 meeting_id를 DB 없이 사용
+        reuse = await store.count_members(room_id) > 0
+        meeting_id = await meetings.resolve(room_id, lambda: _activate_meeting(room_id, user_id), reuse=reuse)
+        logger.debug("같은 회의실 ID(%s)는 항상 같은 회의(meeting_id=%s)를 사용합니다", room_id, meeting_id)
+
+        # 방 상태 확인 및 동기화
+        # 방이 없으면 생성하고, 있으면 DB 회의 ID와 동기화 (DB 회의를 기준으로)
+        room = await store.ensure_room(room_id, meeting_id)
+        logger.debug("방 상태 동기화 완료: room_id=%s, db_id=%s", room_id, room.db_id)
+
+        # 사용자 정보 저장 (참가 시간은 참가자 행의 키로도 쓰여 나갈 때 조회 없이 UPDATE)
+        joined_at = datetime.utcnow()
+        await store.set_user(Connection(sid, username, room_id=room_id, user_id=user_id,
+                                        joined_at=joined_at.isoformat(), meeting_id=meeting_id))
+        logger.debug("사용자 정보 저장 완료")
+
+        # 기존 사용자 목록은 방에 추가하기 직전에 가져옴 (사이에 다른 await가 있으면 동시 참가자끼리 서로를 놓침)
+        existing_users = await store.get_members(room_id, exclude_sid=sid)
         # 방에 사용자 추가
-        if sid not in rooms[room_id]["users"]:
-            rooms[room_id]["users"].append(sid)
-            print(f"[DEBUG] 방에 사용자 추가 완료. 현재 방 사용자 수: {len(rooms[room_id]['users'])}")
+        if await store.add_member(room_id, sid, username):
+            logger.debug("방에 사용자 추가 완료")
         else:
-            print(f"[WARNING] 사용자가 이미 방에 존재함")
-        
+            logger.warning("사용자가 이미 방에 존재함")
+
+        # 캐시를 썼는데 그 사이 다른 참가자가 모두 나가 혼자 남았으면 (다른 워커일 수 있음) 방에 들어간 뒤 다시 활성화
+        # (activated_at이 마지막 참가자가 나간 시각보다 뒤가 되어 그 종료 기록이 이 회의를 끝내지 않음)
+        if reuse and await store.count_members(room_id) == 1:
+            meeting_id = await meetings.resolve(room_id, lambda: _activate_meeting(room_id, user_id), reuse=False)
+    
         await sio.enter_room(sid, room_id)
-        print(f"[DEBUG] Socket.io 방 입장 완료")
-        
-        # 데이터베이스에 참가자 기록 (meeting은 항상 존재함)
-        participant = MeetingParticipant(
-            meeting_id=meeting.id,
-            user_id=user_id,
-            username=username,
-            joined_at=datetime.utcnow()
-        )
-        db.add(participant)
-        print(f"[DEBUG] 참가자 정보 DB 저장 중...")
-        
-        # 참가 이벤트 기록
-        event = MeetingEvent(
-            meeting_id=meeting.id,
-            event_type="user_join",
-            user_id=user_id,
-            username=username,
-            timestamp=datetime.utcnow()
-        )
-        db.add(event)
-        db.commit()
-        print(f"[DEBUG] 참가 이벤트 기록 완료. DB 커밋 완료")
-        
+        await sio.enter_room(sid, _whiteboard_room(room_id, sid in whiteboard_segment_sids))
+        logger.debug("Socket.io 방 입장 완료")
+    
+        # 데이터베이스에 참가자 및 참가 이벤트 기록 (저널에서 일괄 커밋, meeting은 항상 존재함)
+        await journal.record_join(meeting_id, username, user_id=user_id, joined_at=joined_at)
+        await journal.record_event(meeting_id, "user_join", user_id=user_id, username=username)
+        logger.debug("참가 이벤트 저널 기록 완료")
+    
         # 기존 사용자들에게 새 사용자 알림
         await sio.emit("user-joined", {
             "sid": sid,
             "username": username
         }, room=room_id, skip_sid=sid)
-        print(f"[DEBUG] user-joined 이벤트 전송 완료")
-        
+        logger.debug("user-joined 이벤트 전송 완료")
+    
         # 새 사용자에게 기존 사용자 목록 전송
-        existing_users = [
-            {"sid": uid, "username": users[uid].get("username")}
-            for uid in rooms[room_id]["users"] if uid != sid and uid in users
-        ]
         await sio.emit("existing-users", {"users": existing_users}, room=sid)
-        print(f"[DEBUG] existing-users 이벤트 전송 완료. 기존 사용자 수: {len(existing_users)}")
-        
-        print(f"[DEBUG] ===== 회의실 참가 완료 =====")
-        print(f"사용자 {username} ({sid})가 방 {room_id}에 참가했습니다")
+        logger.debug("existing-users 이벤트 전송 완료. 기존 사용자 수: %s", len(existing_users))
+    
+        # 최근 채팅 (처음 조회한 회의실만 DB에서 채우고 이후에는 메모리에서 바로 보냄)
+        history = await chat_history.get(room_id)
+        if history:
+            await sio.emit("chat-history", {"messages": history}, room=sid)
+    
+        # 그려진 화이트보드가 있으면 스냅샷 + 최근 획 전송 (그리기 이벤트를 하나씩 다시 보내지 않음)
+        whiteboard_state = whiteboard.state(room_id) if sid in whiteboard_segment_sids else None
+        if whiteboard_state is not None:
+            await sio.emit("whiteboard-snapshot", whiteboard_state, room=sid)
+    
+        logger.debug("===== 회의실 참가 완료 =====")
+        logger.info("사용자 %s (%s)가 방 %s에 참가했습니다", username, sid, room_id)
     except Exception as e:
-        print(f"[ERROR] 회의 참가 중 오류 발생: {e}")
-        import traceback
-        print(f"[ERROR] 상세 오류:\n{traceback.format_exc()}")
+        logger.exception("회의 참가 중 오류 발생: %s", e)
         await sio.emit("error", {"message": f"회의 참가 실패: {str(e)}"}, room=sid)
-        db.rollback()
-    finally:
-        db.close()
+
+async def _check_relay(sid: str, event_name: str, data, check):
+    """
+    시그널링 릴레이 검증 (형식/크기 → 같은 방 또는 매칭 상대 여부)
+
+    반환: (대상 sid, 전달할 값) - 거절하면 (None, None)
+    """
+    target_sid = value = None
+    if not isinstance(data, dict):
+        reason = REJECT_INVALID
+    else:
+        target_sid = data.get("target")
+        value, reason = check(data)
+        if reason is None and not await can_relay(store, sid, target_sid):
+            reason = REJECT_FORBIDDEN
+    if reason is not None:
+        metrics.SIO_RELAY_REJECTED.labels(event_name, reason).inc()
+        logger.warning("%s 전달 거절: %s -> %s (%s)", event_name, sid, target_sid, reason)
+        return None, None
+    return target_sid, value
 
 @sio.event
 async def offer(sid, data):
-    """WebRTC Offer 전송 (방 없이 직접 전송)"""
-    target_sid = data.get("target")
-    offer = data.get("offer")
-    
-    print(f"[DEBUG] WebRTC Offer: {sid} -> {target_sid}")
+    """WebRTC Offer 전송 (같은 방 또는 매칭 상대에게만, 받은 JSON을 그대로 전달)"""
+    target_sid, offer = await _check_relay(sid, "offer", data, lambda d: check_description("offer", d, RELAY_RAW))
+    if target_sid is None:
+        return
     
-    if target_sid and offer:
-        # 방 없이 직접 전송
-        await sio.emit("offer", {
-            "offer": offer,
-            "from": sid
-        }, room=target_sid)
-        print(f"[DEBUG] Offer 전송 완료: {sid} -> {target_sid}")
-    else:
-        print(f"[WARNING] Offer 전송 실패: target_sid={target_sid}, offer 존재={offer is not None}")
+    await sio.emit("offer", {
+        "offer": offer,
+        "from": sid
+    }, room=target_sid)
+    logger.debug("Offer 전송 완료: %s -> %s", sid, target_sid)
 
 @sio.event
 async def answer(sid, data):
-    """WebRTC Answer 전송 (방 없이 직접 전송)"""
-    target_sid = data.get("target")
-    answer = data.get("answer")
-    
-    print(f"[DEBUG] WebRTC Answer: {sid} -> {target_sid}")
+    """WebRTC Answer 전송 (같은 방 또는 매칭 상대에게만, 받은 JSON을 그대로 전달)"""
+    target_sid, answer = await _check_relay(sid, "answer", data, lambda d: check_description("answer", d, RELAY_RAW))
+    if target_sid is None:
+        return
     
-    if target_sid and answer:
-        # 방 없이 직접 전송
-        await sio.emit("answer", {
-            "answer": answer,
-            "from": sid
-        }, room=target_sid)
-        print(f"[DEBUG] Answer 전송 완료: {sid} -> {target_sid}")
-    else:
-        print(f"[WARNING] Answer 전송 실패: target_sid={target_sid}, answer 존재={answer is not None}")
+    await sio.emit("answer", {
+        "answer": answer,
+        "from": sid
+    }, room=target_sid)
+    logger.debug("Answer 전송 완료: %s -> %s", sid, target_sid)
 
 @sio.event
 async def ice_candidate(sid, data):
-    """ICE Candidate 전송 (방 없이 직접 전송)"""
-    target_sid = data.get("target")
-    candidate = data.get("candidate")
+    """ICE Candidate 전송 (같은 방 또는 매칭 상대에게만, 대상이 지원하면 묶어서 전송)"""
+    target_sid, candidate = await _check_relay(sid, "ice_candidate", data, lambda d: check_candidate(d, RELAY_RAW))
+    if target_sid is None:
+        return
     
-    if target_sid and candidate:
-        # 방 없이 직접 전송
+    if ice_batcher.enabled and target_sid in ice_batch_sids:
+        await ice_batcher.add(sid, target_sid, candidate)
+    else:
         await sio.emit("ice-candidate", {
             "candidate": candidate,
             "from": sid
         }, room=target_sid)
-        print(f"[DEBUG] ICE Candidate 전송: {sid} -> {target_sid}")
-    else:
-        print(f"[WARNING] ICE Candidate 전송 실패: target_sid={target_sid}, candidate 존재={candidate is not None}")
+        logger.debug("ICE Candidate 전송: %s -> %s", sid, target_sid)
 
 @sio.event
 async def message(sid, data):
     """채팅 메시지 전송"""
-    if sid not in users:
-        print(f"[WARNING] 메시지 전송 실패: 사용자 정보 없음 (sid={sid})")
+    user = await store.get_user(sid)
+    if not user:
+        logger.warning("메시지 전송 실패: 사용자 정보 없음 (sid=%s)", sid)
         return
     
-    user = users[sid]
-    room_id = user.get("room_id")
-    username = user.get("username")
-    user_id = user.get("user_id")
+    room_id = user.room_id
+    username = user.username
+    user_id = user.user_id
     message_text = data.get("message", "")
     
-    print(f"[DEBUG] 채팅 메시지: username={username}, room_id={room_id}, message_length={len(message_text)}")
+    logger.debug("채팅 메시지: username=%s, room_id=%s, message_length=%s", username, room_id, len(message_text))
     
     if room_id:
-        db = SessionLocal()
-        try:
-            # 데이터베이스에 채팅 메시지 저장
-            meeting_id = rooms[room_id].get("db_id")
-            if meeting_id:
-                event = MeetingEvent(
-                    meeting_id=meeting_id,
-                    event_type="chat",
-                    user_id=user_id,
-                    username=username,
-                    message=message_text,
-                    timestamp=datetime.utcnow()
-                )
-                db.add(event)
-                db.commit()
-                print(f"[DEBUG] 채팅 메시지 DB 저장 완료: meeting_id={meeting_id}")
-            else:
-                print(f"[WARNING] meeting_id 없음: room_id={room_id}")
-        except Exception as e:
-            print(f"[ERROR] 채팅 메시지 저장 중 오류: {e}")
-            import traceback
-            print(f"[ERROR] 상세 오류:\n{traceback.format_exc()}")
-            db.rollback()
-        finally:
-            db.close()
+        # 데이터베이스에 채팅 메시지 기록 (저널에서 일괄 커밋, 커밋을 기다리지 않고 바로 전송)
+        sent_at = datetime.utcnow()
+        room = await store.get_room(room_id)
+        meeting_id = room.db_id if room else None
+        if meeting_id:
+            await journal.record_event(
+                meeting_id, "chat", user_id=user_id, username=username, message=message_text, timestamp=sent_at
+            )
+        else:
+            logger.warning("meeting_id 없음: room_id=%s", room_id)
         
-        await sio.emit("message", {
-            "username": username,
-            "message": message_text,
-            "timestamp": datetime.now().isoformat()
-        }, room=room_id)
-        print(f"[DEBUG] 메시지 브로드캐스트 완료: {username}: {message_text[:50]}...")
+        chat_message = _chat_message(username, message_text, sent_at)
+        # 최근 채팅 버퍼에도 추가 (DB 기록과 같은 시각을 키로 사용해 버퍼를 채우는 중 중복을 거름)
+        chat_history.append(room_id, (username, message_text, sent_at), chat_message)
+        await sio.emit("message", chat_message, room=room_id)
+        logger.debug("메시지 브로드캐스트 완료: username=%s, room_id=%s", username, room_id)
 
 @sio.event
 async def toggle_video(sid, data):
     """비디오 토글"""
-    if sid not in users:
+    user = await store.get_user(sid)
+    if not user:
         return
     
-    user = users[sid]
-    room_id = user.get("room_id")
+    room_id = user.room_id
     enabled = data.get("enabled", True)
     
     if room_id:
@@ -918,11 +1298,11 @@ async def toggle_video(sid, data):
 @sio.event
 async def toggle_audio(sid, data):
     """오디오 토글"""
-    if sid not in users:
+    user = await store.get_user(sid)
+    if not user:
         return
     
-    user = users[sid]
-    room_id = user.get("room_id")
+    room_id = user.room_id
     enabled = data.get("enabled", True)
     
     if room_id:
@@ -934,50 +1314,63 @@ async def toggle_audio(sid, data):
 @sio.event
 async def screen_share(sid, data):
     """화면 공유 시작/중지"""
-    if sid not in users:
+    user = await store.get_user(sid)
+    if not user:
         return
     
-    user = users[sid]
-    room_id = user.get("room_id")
+    room_id = user.room_id
     sharing = data.get("sharing", False)
     
     if room_id:
         await sio.emit("screen-share", {
             "sid": sid,
             "sharing": sharing,
-            "username": user.get("username")
+            "username": user.username
         }, room=room_id)
 
 @sio.event
 async def whiteboard_draw(sid, data):
-    """화이트보드 그리기"""
-    if sid not in users:
+    """화이트보드 그리기 (획 기록에 반영하고 구간을 묶어 방의 다른 사용자에게 전송)"""
+    user = await store.get_user(sid)
+    if not user or not user.room_id or not isinstance(data, dict):
         return
     
-    user = users[sid]
-    room_id = data.get("room_id")
+    room_id = data.get("room_id", user.room_id)
+    if room_id != user.room_id:
+        return
     
-    if room_id and room_id in rooms:
-        # 방의 다른 사용자들에게 그리기 데이터 전송
-        await sio.emit("whiteboard-draw", data, room=room_id, skip_sid=sid)
+    if await whiteboard.draw(room_id, sid, data):
+        # 구간 형식을 모르는 참가자에게는 받은 이벤트를 그대로 전달
+        await sio.emit("whiteboard-draw", data, room=_whiteboard_room(room_id, False), skip_sid=sid)
+
+@sio.event
+async def whiteboard_sync(sid, data=None):
+    """화이트보드 전체 상태 다시 받기 (구간이 빠진 클라이언트용)"""
+    user = await store.get_user(sid)
+    if not user or not user.room_id:
+        return
+    
+    state = whiteboard.state(user.room_id) or {"g": whiteboard.grid, "snapshot": [], "strokes": []}
+    await sio.emit("whiteboard-snapshot", state, room=sid)
 
 @sio.event
 async def whiteboard_clear(sid, data):
     """화이트보드 지우기"""
-    if sid not in users:
+    user = await store.get_user(sid)
+    if not user:
         return
     
-    user = users[sid]
     room_id = data.get("room_id")
     
-    if room_id and room_id in rooms:
+    if room_id and room_id == user.room_id:
+        whiteboard.clear(room_id)
         # 방의 모든 사용자에게 지우기 알림
         await sio.emit("whiteboard-clear", {}, room=room_id)
 
 if __name__ == "__main__":
     # static 디렉토리 생성
     os.makedirs("static", exist_ok=True)
-    print(f"[DEBUG] static 디렉토리 확인 완료")
+    logger.debug("static 디렉토리 확인 완료")
     
     # Windows 콘솔 인코딩 설정
     import sys
@@ -985,17 +1378,15 @@ if __name__ == "__main__":
         import io
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
-        print(f"[DEBUG] Windows 콘솔 인코딩 설정 완료")
+        logger.debug("Windows 콘솔 인코딩 설정 완료")
     
     # 데이터베이스 초기화 확인
-    print(f"[DEBUG] 데이터베이스 초기화 중...")
+    logger.debug("데이터베이스 초기화 중...")
     try:
         init_db()
-        print(f"[DEBUG] 데이터베이스 초기화 완료")
+        logger.debug("데이터베이스 초기화 완료")
     except Exception as e:
-        print(f"[ERROR] 데이터베이스 초기화 실패: {e}")
-        import traceback
-        print(f"[ERROR] 상세 오류:\n{traceback.format_exc()}")
+        logger.exception("데이터베이스 초기화 실패: %s", e)
     
     # 로컬 IP 주소 가져오기
     def get_local_ip():
@@ -1016,9 +1407,9 @@ if __name__ == "__main__":
     
     print("=" * 60)
     print("🚀 ZOOM 클론 서버 시작 중...")
-    print(f"[DEBUG] 서버 설정: host=0.0.0.0, port={port}")
-    print(f"[DEBUG] 로컬 IP: {local_ip}")
-    print(f"[DEBUG] 데이터베이스 URL: {os.getenv('DATABASE_URL', 'sqlite:///./zoom_clone.db')}")
+    logger.debug("서버 설정: host=0.0.0.0, port=%s", port)
+    logger.debug("로컬 IP: %s", local_ip)
+    logger.debug("데이터베이스 URL: %s", os.getenv('DATABASE_URL', 'sqlite:///./zoom_clone.db'))
     print("=" * 60)
     print("📡 로컬 접속: http://localhost:8000")
     print(f"📡 네트워크 접속: http://{local_ip}:8000")
@@ -1026,8 +1417,8 @@ if __name__ == "__main__":
     print("💡 같은 네트워크의 다른 기기에서 접속하려면:")
     print(f"   → http://{local_ip}:8000")
     print("=" * 60)
-    print(f"[DEBUG] Socket.io 서버 시작: socket_app")
-    print(f"[DEBUG] FastAPI 앱 시작: app")
+    logger.debug("Socket.io 서버 시작: socket_app")
+    logger.debug("FastAPI 앱 시작: app")
     print("=" * 60)
     uvicorn.run(socket_app, host="0.0.0.0", port=port, log_level="info")
 
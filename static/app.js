@@ -72,7 +72,8 @@ class ZoomClone {
     }
 
     async initializeSocket() {
-        this.socket = io();
+        // ice_batch: 서버가 ICE candidate를 묶어서 ice-candidates 프레임으로 보내도 됨
+        this.socket = io({ auth: { ice_batch: true } });
         
         this.socket.on('connect', () => {
             console.log('서버에 연결되었습니다:', this.socket.id);
@@ -124,10 +125,21 @@ class ZoomClone {
             await this.handleIceCandidate(data);
         });
 
+        this.socket.on('ice-candidates', async (data) => {
+            console.log('ICE Candidate 묶음 수신:', data.candidates.length);
+            for (const candidate of data.candidates) {
+                await this.handleIceCandidate({ from: data.from, candidate });
+            }
+        });
+
         this.socket.on('message', (data) => {
             this.displayMessage(data);
         });
 
+        this.socket.on('chat-history', (data) => {
+            data.messages.forEach((message) => this.displayMessage(message));
+        });
+
         this.socket.on('video-toggled', (data) => {
             this.updateRemoteVideoState(data.sid, data.enabled, 'video');
         });
@@ -1,5 +1,5 @@
 // Service Worker - 오프라인 지원 및 캐싱
-const CACHE_NAME = 'zoom-clone-v1';
+const CACHE_NAME = 'zoom-clone-v3';  // 서버가 제공하는 /sw.js에서는 정적 자산 지문으로 바뀜
 const urlsToCache = [
     '/',
     '/index.html',
@@ -110,6 +110,20 @@ self.addEventListener('fetch', (event) => {
         return;
     }
 
+    // 지문이 붙은 자산(/assets/app.<hash>.js)은 내용이 바뀌지 않으므로 캐시 우선
+    if (url.pathname.startsWith('/assets/')) {
+        event.respondWith(
+            caches.match(event.request).then((cached) => cached || fetch(event.request).then((response) => {
+                if (response && response.status === 200) {
+                    const responseToCache = response.clone();
+                    caches.open(CACHE_NAME).then((cache) => cache.put(event.request, responseToCache));
+                }
+                return response;
+            }))
+        );
+        return;
+    }
+
     event.respondWith(
         fetch(event.request)
             .then((response) => {
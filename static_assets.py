@@ -0,0 +1,167 @@
+"""
+정적 자산 빌드 및 서빙
+- 시작할 때 app.js/style.css 내용의 sha256으로 파일 이름에 지문을 붙이고(/assets/app.<hash>.js),
+  gzip(및 brotli 패키지가 있으면 br)으로 미리 압축해 메모리에 보관
+- 지문이 붙은 자산은 내용이 바뀌면 URL이 바뀌므로 1년 immutable 캐시
+- index.html/manifest.json/sw.js는 URL이 고정이므로 no-cache + ETag(If-None-Match → 304)
+- index.html의 자산 경로와 sw.js의 CACHE_NAME/캐시 목록은 지문에 맞게 생성
+- static/ 원본은 그대로 두므로 static/을 그대로 올리는 프론트엔드 호스팅은 영향 없음
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.responses import Response
+
+from logger import get_logger
+
+try:
+    import brotli
+except ImportError:  # 선택 사항 (없으면 gzip만 제공)
+    brotli = None
+
+logger = get_logger("static_assets")
+
+STATIC_DIR = Path("static")
+ASSET_PREFIX = "/assets/"
+FINGERPRINTED = ("app.js", "style.css")  # 지문을 붙여 immutable로 제공할 파일
+COMPRESS_MIN_BYTES = int(os.getenv("STATIC_COMPRESS_MIN_BYTES", "1024"))  # 이보다 작은 파일은 압축하지 않음
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_MEDIA_TYPES = {
+    ".js": "application/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".html": "text/html; charset=utf-8",
+    ".json": "application/json",
+}
+_CACHE_NAME = re.compile(r"const CACHE_NAME = '[^']*';")
+_URLS_TO_CACHE = re.compile(r"const urlsToCache = \[[^\]]*\];")
+
+
+class Asset:
+    """미리 압축한 응답 본문 하나"""
+
+    __slots__ = ("body", "encoded", "tag", "media_type", "cache_control")
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.tag = hashlib.sha256(body).hexdigest()[:16]  # ETag는 인코딩별로 "<tag>-gzip" 형태
+        self.encoded: Dict[str, bytes] = {}
+        if len(body) >= COMPRESS_MIN_BYTES:
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(body, quality=11)
+            self.encoded["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            # 압축해도 줄지 않으면 보내지 않음
+            self.encoded = {k: v for k, v in self.encoded.items() if len(v) < len(body)}
+
+
+def _accepted_encodings(header: Optional[str]) -> set:
+    """Accept-Encoding에서 받을 수 있는 인코딩 (q=0 제외)"""
+    accepted = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def _etag_matches(header: Optional[str], tag: str) -> bool:
+    """If-None-Match가 인코딩과 관계없이 같은 내용의 ETag를 포함하는지"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(value.strip().removeprefix("W/").strip('"').split("-")[0] == tag for value in header.split(","))
+
+
+class StaticAssets:
+    """
+    시작 시 만든 자산 표 (URL 경로 → Asset)
+
+    - build(): static/을 읽어 지문/압축/index.html·sw.js 생성 (자산이 바뀌면 서버 재시작 필요)
+    - response(): Accept-Encoding/If-None-Match에 맞춘 응답
+    """
+
+    def __init__(self, directory: Path = STATIC_DIR):
+        self.directory = directory
+        self.assets: Dict[str, Asset] = {}
+        self.urls: Dict[str, str] = {}  # 원본 파일 이름 → 지문이 붙은 URL
+        self.version = ""
+
+    def build(self):
+        assets: Dict[str, Asset] = {}
+        urls: Dict[str, str] = {}
+        for name in FINGERPRINTED:
+            path = self.directory / name
+            if not path.exists():
+                continue
+            body = path.read_bytes()
+            stem, suffix = os.path.splitext(name)
+            url = f"{ASSET_PREFIX}{stem}.{hashlib.sha256(body).hexdigest()[:12]}{suffix}"
+            assets[url] = Asset(body, _MEDIA_TYPES[suffix], IMMUTABLE)
+            urls[name] = url
+
+        index = self.directory / "index.html"
+        if index.exists():
+            assets["/"] = Asset(self._rewrite_index(index.read_text(encoding="utf-8"), urls).encode(),
+                                _MEDIA_TYPES[".html"], REVALIDATE)
+        manifest = self.directory / "manifest.json"
+        if manifest.exists():
+            assets["/manifest.json"] = Asset(manifest.read_bytes(), _MEDIA_TYPES[".json"], REVALIDATE)
+        # 서비스 워커가 캐시하는 자산 중 하나라도 바뀌면 버전(CACHE_NAME)이 바뀜
+        self.version = hashlib.sha256(" ".join(a.tag for a in assets.values()).encode()).hexdigest()[:12]
+        service_worker = self.directory / "sw.js"
+        if service_worker.exists():
+            assets["/sw.js"] = Asset(self._generate_service_worker(service_worker.read_text(encoding="utf-8"), urls),
+                                     _MEDIA_TYPES[".js"], REVALIDATE)
+        self.assets = assets
+        self.urls = urls
+        logger.info("정적 자산 준비 완료: 버전 %s, %s", self.version,
+                    ", ".join(f"{url} ({len(a.body)}B, {'/'.join(a.encoded) or '압축 없음'})"
+                              for url, a in assets.items()))
+
+    @staticmethod
+    def _rewrite_index(html: str, urls: Dict[str, str]) -> str:
+        """index.html의 /app.js, /style.css (또는 /static/...) 참조를 지문이 붙은 URL로 교체"""
+        for name, url in urls.items():
+            html = re.sub(r'((?:src|href)=")/(?:static/)?%s"' % re.escape(name), r'\g<1>%s"' % url, html)
+        return html
+
+    def _generate_service_worker(self, source: str, urls: Dict[str, str]) -> bytes:
+        """sw.js의 CACHE_NAME과 캐시 목록을 지문 기준으로 생성 (자산이 바뀌면 이전 캐시는 activate에서 삭제)"""
+        cached = ["/", *urls.values(), "/manifest.json"]
+        source = _CACHE_NAME.sub(f"const CACHE_NAME = 'zoom-clone-{self.version}';", source, count=1)
+        source = _URLS_TO_CACHE.sub(f"const urlsToCache = {json.dumps(cached)};", source, count=1)
+        return source.encode()
+
+    def response(self, path: str, accept_encoding: Optional[str] = None,
+                 if_none_match: Optional[str] = None) -> Optional[Response]:
+        """path의 응답 (없으면 None)"""
+        asset = self.assets.get(path)
+        if asset is None:
+            return None
+        accepted = _accepted_encodings(accept_encoding)
+        encoding = next((e for e in ("br", "gzip") if e in asset.encoded and e in accepted), None)
+        headers = {
+            "ETag": f'"{asset.tag}-{encoding}"' if encoding else f'"{asset.tag}"',
+            "Cache-Control": asset.cache_control,
+        }
+        if asset.encoded:
+            headers["Vary"] = "Accept-Encoding"
+        if _etag_matches(if_none_match, asset.tag):
+            return Response(status_code=304, headers=headers)
+        if encoding is None:
+            return Response(asset.body, media_type=asset.media_type, headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(asset.encoded[encoding], media_type=asset.media_type, headers=headers)
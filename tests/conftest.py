@@ -0,0 +1,14 @@
+"""
+pytest 공통 설정
+
+서버 모듈은 불러올 때 DATABASE_URL로 엔진을 만들므로, 테스트용 임시 SQLite DB를 먼저 지정함
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='zoom-test-')}/test.db")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,48 @@
+"""
+blob 저장소 중복 제거와 GC가 다시 쓰인 blob을 지우지 않는지
+"""
+import asyncio
+import os
+import time
+
+from blob_store import BlobStore, _remove_stale
+from room_store import MemoryRoomStore
+
+
+def _part(directory, name, data):
+    path = directory / f"{name}.part"
+    path.write_bytes(data)
+    return path
+
+
+def test_commit_dedup_and_collect(tmp_path):
+    async def run():
+        blobs = BlobStore(MemoryRoomStore(), tmp_path, grace=60)
+        digest = "ab" * 32
+        assert await blobs.commit("a", _part(tmp_path, "a", b"x"), digest) is False
+        assert await blobs.commit("b", _part(tmp_path, "b", b"x"), digest) is True
+        assert not (tmp_path / "b.part").exists()
+        assert await blobs.add_ref(digest) is True
+        assert await blobs.add_ref("cd" * 32) is False
+
+        # 참조가 남아 있으면 오래되어도 지우지 않음
+        old = time.time() - 3600
+        os.utime(blobs.path(digest), (old, old))
+        assert (await blobs.collect())[0] == 0
+        for _ in range(3):
+            await blobs.release(digest)
+        assert (await blobs.collect())[0] == 1
+        assert not blobs.path(digest).exists()
+
+    asyncio.run(run())
+
+
+def test_remove_stale_keeps_touched_blob(tmp_path):
+    path = tmp_path / "blob"
+    path.write_bytes(b"x")
+    # GC가 목록을 만든 뒤 commit()이 수정 시각을 갱신한 경우
+    assert _remove_stale(path, time.time() - 60) is False
+    assert path.exists() and not path.with_name("blob.gc").exists()
+    assert _remove_stale(path, time.time() + 60) is True
+    assert not path.exists() and not path.with_name("blob.gc").exists()
+    assert _remove_stale(path, time.time()) is False
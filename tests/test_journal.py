@@ -0,0 +1,117 @@
+"""
+회의 종료가 다른 워커의 재활성화/참가 뒤에 커밋되어도 회의를 끝내지 않는지 (DB의 UPDATE 조건)
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from database import AsyncSessionLocal, Meeting, MeetingEvent, MeetingParticipant, init_db
+from journal import EventJournal
+
+
+async def _setup(room_id, activated_at, participants=()):
+    async with AsyncSessionLocal() as db:
+        meeting = Meeting(room_id=room_id, started_at=activated_at, activated_at=activated_at, is_active=True)
+        db.add(meeting)
+        await db.flush()
+        for username, joined_at, left_at in participants:
+            db.add(MeetingParticipant(meeting_id=meeting.id, username=username, joined_at=joined_at, left_at=left_at))
+        await db.commit()
+        return meeting.id
+
+
+async def _is_active(meeting_id):
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(Meeting.is_active).where(Meeting.id == meeting_id))).scalar_one()
+
+
+def test_meeting_end_conditions():
+    init_db()
+
+    async def run():
+        now = datetime.utcnow()
+        ended_at = now - timedelta(seconds=5)
+        # 마지막 참가자가 나간 뒤 다른 워커가 다시 활성화함
+        reactivated = await _setup("reactivated", now)
+        # 활성화 이후 참가해서 아직 나가지 않은 참가자가 있음 (참가 기록이 먼저 커밋됨)
+        occupied = await _setup("occupied", now - timedelta(minutes=1), [("b", now - timedelta(seconds=30), None)])
+        # 활성화 이전의 닫히지 않은 참가 기록은 비정상 종료로 남은 행이므로 무시
+        stale = await _setup("stale", now - timedelta(minutes=1), [("old", now - timedelta(hours=1), None)])
+        # 같은 배치에서 마지막 참가자가 나감
+        last = await _setup("last", now - timedelta(minutes=1), [("a", now - timedelta(seconds=50), None)])
+
+        journal = EventJournal()
+        await journal.record_leave(last, "a", joined_at=now - timedelta(seconds=50), left_at=ended_at)
+        for meeting_id in (reactivated, occupied, stale, last):
+            await journal.record_meeting_end(meeting_id, ended_at=ended_at)
+        await journal.stop()
+        assert journal.failed_ops == 0
+        return [await _is_active(meeting_id) for meeting_id in (reactivated, occupied, stale, last)]
+
+    assert asyncio.run(run()) == [True, True, False, False]
+
+
+async def _event_count(meeting_id):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(func.count()).select_from(MeetingEvent).where(MeetingEvent.meeting_id == meeting_id))
+        return result.scalar_one()
+
+
+def test_restart_keeps_queued_ops():
+    init_db()
+
+    async def run():
+        meeting_id = await _setup("restart", datetime.utcnow())
+        journal = EventJournal(flush_interval=10)
+        await journal.record_event(meeting_id, "a")
+        # 백그라운드 작업이 배치를 모으는 중에 죽어도 큐에 남은 작업은 다음 시작 때 이어서 기록
+        await asyncio.sleep(0)
+        journal._task.cancel()
+        await asyncio.gather(journal._task, return_exceptions=True)
+        await journal.record_event(meeting_id, "b")
+        await journal.record_event(meeting_id, "c")
+        await journal.flush()
+        count = await _event_count(meeting_id)
+        await journal.stop()
+        return count
+
+    # 취소된 시점에 배치로 꺼낸 "a"는 잃어도 뒤에 넣은 작업은 남음
+    assert asyncio.run(run()) >= 2
+
+
+def test_flush_returns_when_task_dies():
+    async def run():
+        journal = EventJournal(flush_interval=10)
+        await journal.start()
+        flushing = asyncio.create_task(journal.flush())
+        await asyncio.sleep(0)
+        journal._task.cancel()
+        await asyncio.wait_for(flushing, 1)
+
+    asyncio.run(run())
+
+
+def test_unexpected_error_does_not_kill_loop():
+    init_db()
+    calls = []
+
+    def session_factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("연결 실패")
+        return AsyncSessionLocal()
+
+    async def run():
+        meeting_id = await _setup("unexpected", datetime.utcnow())
+        journal = EventJournal(session_factory=session_factory)
+        await journal.record_event(meeting_id, "lost")
+        await journal.flush()
+        task = journal._task
+        await journal.record_event(meeting_id, "kept")
+        await journal.flush()
+        assert journal._task is task and not task.done()
+        await journal.stop()
+        return journal.failed_ops, await _event_count(meeting_id)
+
+    assert asyncio.run(run()) == (1, 1)
@@ -0,0 +1,46 @@
+"""
+지정 연결은 다른 사람을 기다리는 대기자를 가로채지 않는지 (Matchmaker와 Redis 저장소가 같은 규칙인지)
+"""
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from matchmaking import Matchmaker
+from room_store import MemoryRoomStore, RedisRoomStore
+
+
+def _stores():
+    return [MemoryRoomStore(), RedisRoomStore(fakeredis.aioredis.FakeRedis(decode_responses=True))]
+
+
+def test_targeted_connect_skips_waiter_waiting_for_someone_else():
+    matchmaker = Matchmaker()
+    assert matchmaker.match_or_wait("a", "alice", "carol") is None
+    # bob이 alice를 지정해도 alice는 carol을 기다리므로 매칭하지 않고 bob도 대기
+    assert matchmaker.match_or_wait("b", "bob", "alice") is None
+    assert "a" in matchmaker and "b" in matchmaker
+    # carol이 오면 alice와 매칭, alice가 bob을 지정하면 매칭
+    assert matchmaker.match_or_wait("c", "carol", "alice").sid == "a"
+    assert matchmaker.match_or_wait("a2", "alice", "bob").sid == "b"
+
+
+def test_targeted_connect_takes_anonymous_or_mutual_waiter():
+    matchmaker = Matchmaker()
+    assert matchmaker.match_or_wait("a1", "alice") is None
+    assert matchmaker.match_or_wait("a2", "alice", "bob") is None
+    # 먼저 기다린 대상 없는 alice부터
+    assert matchmaker.match_or_wait("b1", "bob", "alice").sid == "a1"
+    assert matchmaker.match_or_wait("b2", "bob", "alice").sid == "a2"
+    assert len(matchmaker) == 0
+
+
+@pytest.mark.parametrize("store", _stores(), ids=["memory", "redis"])
+def test_store_uses_same_rule(store):
+    async def run():
+        assert await store.match_or_wait("a", "alice", "carol") is None
+        assert await store.match_or_wait("b", "bob", "alice") is None
+        matched = await store.match_or_wait("c", "carol", "alice")
+        return matched.sid
+
+    assert asyncio.run(run()) == "a"
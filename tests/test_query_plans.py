@@ -0,0 +1,44 @@
+"""
+핫 쿼리가 의도한 복합 인덱스를 쓰는지 (benchmarks/check_query_plans.py의 쿼리를 SQLite EXPLAIN QUERY PLAN으로 확인)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import check_query_plans  # noqa: E402
+from database import engine, init_db  # noqa: E402
+
+# 쿼리 이름 → 써야 하는 인덱스
+EXPECTED_INDEXES = {
+    "나감 처리": "ix_meeting_participants_meeting_username_joined",
+    "타임라인": "ix_meeting_events_meeting_timestamp",
+    "회의실 입장": "ix_meetings_room_id",
+    "회의 목록": "ix_meeting_participants_user_meeting",
+    "접근 권한 확인": "ix_meeting_participants_user_meeting",
+    "참가자 목록": "ix_meeting_participants_meeting_joined",
+}
+
+
+@pytest.fixture(scope="module")
+def connection():
+    if engine.dialect.name != "sqlite":
+        pytest.skip("SQLite 실행 계획 형식만 확인")
+    init_db()
+    with engine.connect() as connection:
+        yield connection
+
+
+def test_every_hot_query_has_expected_index():
+    assert set(check_query_plans.hot_queries()) == set(EXPECTED_INDEXES)
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED_INDEXES))
+def test_hot_query_uses_index(connection, name):
+    plan = check_query_plans.explain(connection, check_query_plans.hot_queries()[name])
+    assert any(f"INDEX {EXPECTED_INDEXES[name]} " in line for line in plan), plan
+    # 정렬도 인덱스 순서로 처리 (임시 정렬 없음)
+    assert not any("TEMP B-TREE" in line for line in plan), plan
+    assert check_query_plans.uses_index(plan), plan
@@ -0,0 +1,58 @@
+"""
+offer/answer는 조용히 버리지 않고, 연결 해제 시 sid의 상태만 지우는지
+"""
+import asyncio
+
+from ratelimit import POLICY_COALESCE, POLICY_DROP, POLICY_NOTIFY, DEFAULT_LIMITS, RateLimiter
+
+
+class FakeSio:
+    def __init__(self):
+        self.handlers = {"/": {}}
+        self.emitted = []
+
+    async def emit(self, event, data=None, room=None):
+        self.emitted.append((event, room))
+
+
+def test_offer_answer_notify_with_large_budget():
+    for name in ("offer", "answer"):
+        rate, burst, policy = DEFAULT_LIMITS[name]
+        assert policy == POLICY_NOTIFY
+        assert burst >= 100
+    assert DEFAULT_LIMITS["ice_candidate"][2] == POLICY_DROP
+    assert DEFAULT_LIMITS["whiteboard_draw"][2] == POLICY_DROP
+
+
+def test_discard_only_touches_sid():
+    async def run():
+        sio = FakeSio()
+        now = [0.0]
+        limiter = RateLimiter({"offer": (1, 1, POLICY_NOTIFY), "toggle": (1, 1, POLICY_COALESCE)}, clock=lambda: now[0])
+        handled = []
+
+        async def handler(sid, data):
+            handled.append((sid, data))
+
+        offer = limiter.wrap(sio, "offer", handler)
+        toggle = limiter.wrap(sio, "toggle", handler)
+        for sid in ("a", "b"):
+            await offer(sid, 1)
+            await offer(sid, 2)  # 초과 → 알림
+            await offer(sid, 3)  # 이미 알림 → 조용히 버림
+            await toggle(sid, 1)
+            await toggle(sid, 2)  # 보류
+        assert sio.emitted == [("error", "a"), ("error", "b")]
+        assert set(limiter._pending) == {"a", "b"}
+
+        limiter.discard("a")
+        assert set(limiter._pending) == {"b"} and set(limiter._timers) == {"b"}
+        assert "a" not in limiter._notified and "b" in limiter._notified
+
+        now[0] = 1.0
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert ("b", 2) in handled and ("a", 2) not in handled
+        assert not limiter._pending and not limiter._timers
+
+    asyncio.run(run())
@@ -0,0 +1,80 @@
+"""
+시그널링 릴레이 페이로드가 Redis pub/sub 매니저를 거쳐도 객체로 전달되는지
+"""
+import asyncio
+import json
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from relay import RELAY_RAW_MIN_BYTES, RelayJSON, allows_raw, check_candidate, check_description
+
+
+class CapturingPubSubManager(AsyncPubSubManager):
+    """발행한 메시지를 Redis 대신 목록에 보관 (AsyncRedisManager와 같이 self.json.dumps로 인코딩)"""
+
+    name = "capture"
+
+    def __init__(self):
+        super().__init__(channel="test")
+        self.published = []
+
+    async def _publish(self, data):
+        self.published.append(self.json.dumps(data))
+
+    async def _listen(self):
+        await asyncio.Event().wait()
+
+
+def _relay_packet(event_name, field, value):
+    """클라이언트가 보낸 것과 같은 ["이벤트", {...}] 텍스트 (원본 텍스트를 보관하는 크기 이상)"""
+    packet = json.dumps([event_name, {"target": "peer", field: value}])
+    assert len(packet) >= RELAY_RAW_MIN_BYTES
+    return RelayJSON.loads(packet)
+
+
+def _publish(manager, event_name, payload):
+    sio = socketio.AsyncServer(async_mode="asgi", client_manager=manager, json=RelayJSON)
+
+    async def emit():
+        await sio.emit(event_name, payload, room="peer")
+
+    asyncio.run(emit())
+    return json.loads(manager.published[-1])["data"][0]
+
+
+def test_pubsub_manager_disables_raw():
+    assert allows_raw(socketio.AsyncManager())
+    assert not allows_raw(CapturingPubSubManager())
+
+
+def test_offer_round_trips_through_pubsub_as_object():
+    offer = {"type": "offer", "sdp": "v=0\r\n" + "a=candidate:x\r\n" * 200}
+    _, data = _relay_packet("offer", "offer", offer)
+    manager = CapturingPubSubManager()
+    value, reason = check_description("offer", data, allows_raw(manager))
+    assert reason is None
+
+    received = _publish(manager, "offer", {"offer": value, "from": "sender"})
+    assert received["offer"] == offer
+
+
+def test_candidate_round_trips_through_pubsub_as_object():
+    candidate = {"candidate": "candidate:" + "1" * 1200, "sdpMid": "0", "sdpMLineIndex": 0}
+    _, data = _relay_packet("ice_candidate", "candidate", candidate)
+    manager = CapturingPubSubManager()
+    value, reason = check_candidate(data, allows_raw(manager))
+    assert reason is None
+
+    received = _publish(manager, "ice-candidate", {"candidate": value, "from": "sender"})
+    assert received["candidate"] == candidate
+
+
+def test_raw_json_would_arrive_as_string_through_pubsub():
+    """원본 텍스트를 그대로 발행하면 문자열이 됨 (allows_raw로 막는 이유)"""
+    offer = {"type": "offer", "sdp": "v=0\r\n" + "a=x\r\n" * 300}
+    _, data = _relay_packet("offer", "offer", offer)
+    value, _ = check_description("offer", data, raw_ok=True)
+
+    received = _publish(CapturingPubSubManager(), "offer", {"offer": value, "from": "sender"})
+    assert isinstance(received["offer"], str)
@@ -0,0 +1,34 @@
+"""
+화이트보드 압축이 진행 중인 획에 막히지 않고 max_strokes를 지키는지
+"""
+import asyncio
+import json
+
+from whiteboard import WhiteboardEngine
+
+
+async def _ignore(room_id, sid, segments):
+    pass
+
+
+def test_compact_past_open_stroke():
+    async def run():
+        engine = WhiteboardEngine(_ignore, window=0, snapshot_every=100, max_strokes=500)
+        # 끝을 보내지 않은 획 하나가 가장 앞에 있음
+        await engine.draw("room", "open", {"stroke": "a", "points": [[0, 0], [1, 1]]})
+        for i in range(3000):
+            await engine.draw("room", "sid", {"stroke": i, "points": [[0, 0], [1, 1]], "end": True})
+        return engine._boards["room"]
+
+    board = asyncio.run(run())
+    # 압축 사이에는 log가 snapshot_every까지만 늘어남
+    assert len(board.log) < 100
+    assert len(board.snapshot_parts) + len(board.log) <= 500 + 100
+    board.compact(500)
+    assert len(board.snapshot_parts) + len(board.log) <= 500
+    assert list(board.log) == [1]
+    assert any(not stroke.ended for stroke in board.log.values())
+    snapshot = json.loads(board.snapshot)
+    assert len(snapshot) == len(board.snapshot_parts)
+    # 가장 최근 획은 남고 오래된 획부터 버림
+    assert snapshot[-1]["id"] == board.next_id - 1
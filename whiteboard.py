@@ -0,0 +1,322 @@
+"""
+화이트보드 엔진
+- 클라이언트의 점 스트림을 획(stroke) 단위로 모아 WHITEBOARD_BATCH_MS마다 구간(segment)으로 묶어 전송
+- 좌표는 격자(WHITEBOARD_GRID)로 양자화한 정수를 직전 점과의 차이(delta)로 저장/전송
+- 회의실별 획 기록을 유지하고 완료된 획이 쌓이면 미리 인코딩한 스냅샷으로 압축해
+  새 참가자에게 스냅샷 하나와 최근 획만 보냄
+
+프레임 형식 (p는 [dx0, dy0, dx1, dy1, ...], 획의 첫 점은 (0, 0) 기준):
+    whiteboard-draw     {"from": sid, "g": 격자, "segments": [{"id", "i": 시작 점 번호, "p", "c"?, "w"?, "end"?}]}
+    whiteboard-snapshot {"g": 격자, "snapshot": [{"id", "c", "w", "p"}, ...], "strokes": [...최근 획]}
+구간 형식과 스냅샷은 연결 시 auth={"whiteboard_segments": true}로 알린 클라이언트만 받음 (나머지는 받은 이벤트를 그대로 받음)
+스냅샷 직후 받은 구간은 이미 가진 점과 겹칠 수 있으므로 클라이언트는 i로 받은 점을 건너뜀
+"""
+import asyncio
+import json
+import math
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from logger import get_logger
+from relay import RawJSON
+
+logger = get_logger("whiteboard")
+
+# 설정 (환경 변수로 조정 가능)
+WHITEBOARD_GRID = int(os.getenv("WHITEBOARD_GRID", "10"))  # 좌표 1을 몇 칸으로 나눌지 (10이면 0.1 단위, 정규화 좌표면 10000 등)
+WHITEBOARD_BATCH_MS = int(os.getenv("WHITEBOARD_BATCH_MS", "30"))  # 구간을 모아 보내는 시간 (0이면 바로 전송)
+WHITEBOARD_SNAPSHOT_EVERY = int(os.getenv("WHITEBOARD_SNAPSHOT_EVERY", "100"))  # 완료된 획이 이만큼 쌓이면 스냅샷으로 압축
+WHITEBOARD_MAX_STROKES = int(os.getenv("WHITEBOARD_MAX_STROKES", "5000"))  # 회의실당 보관할 최대 획 수 (오래된 것부터 버림)
+WHITEBOARD_MAX_POINTS = int(os.getenv("WHITEBOARD_MAX_POINTS", "4096"))  # 획 하나의 최대 점 수 (넘으면 획 종료)
+
+# 선 굵기/색 문자열 제한
+_MAX_COLOR_LENGTH = 32
+_MAX_WIDTH = 1000
+# 예전 형식({x0, y0, x1, y1})으로 그리는 클라이언트의 획 키
+_LEGACY_STROKE = "_legacy"
+
+SendSegments = Callable[[str, str, List[Dict]], Awaitable[None]]
+
+
+def _number(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError("좌표가 숫자가 아님")
+    return value
+
+
+def parse_points(raw, grid: int) -> List[Tuple[int, int]]:
+    """[[x, y], ...], [{"x", "y"}, ...], [x, y, x, y, ...] 형식의 점 목록을 격자 좌표로 변환"""
+    if not isinstance(raw, list) or not raw:
+        raise ValueError("점 목록이 비어 있음")
+    if isinstance(raw[0], (list, tuple)):
+        pairs = [(_number(p[0]), _number(p[1])) for p in raw if len(p) >= 2]
+    elif isinstance(raw[0], dict):
+        pairs = [(_number(p.get("x")), _number(p.get("y"))) for p in raw]
+    else:
+        if len(raw) % 2:
+            raise ValueError("좌표 개수가 홀수")
+        pairs = [(_number(raw[i]), _number(raw[i + 1])) for i in range(0, len(raw), 2)]
+    if not pairs:
+        raise ValueError("점 목록이 비어 있음")
+    return [(round(x * grid), round(y * grid)) for x, y in pairs]
+
+
+class Stroke:
+    """획 하나 (점은 직전 점과의 차이로 평평한 정수 목록에 저장)"""
+
+    __slots__ = ("id", "author", "color", "width", "deltas", "last", "ended")
+
+    def __init__(self, stroke_id: int, author: str, color, width):
+        self.id = stroke_id
+        self.author = author
+        self.color = color
+        self.width = width
+        self.deltas: List[int] = []
+        self.last = (0, 0)
+        self.ended = False
+
+    @property
+    def count(self) -> int:
+        return len(self.deltas) // 2
+
+    def append(self, points: List[Tuple[int, int]]) -> int:
+        """점 추가 (반환: 추가한 점 수, 최대 점 수를 넘는 부분은 버림)"""
+        points = points[:max(0, WHITEBOARD_MAX_POINTS - self.count)]
+        last_x, last_y = self.last
+        deltas = self.deltas
+        for x, y in points:
+            deltas.append(x - last_x)
+            deltas.append(y - last_y)
+            last_x, last_y = x, y
+        self.last = (last_x, last_y)
+        return len(points)
+
+    def segment(self, start: int) -> Dict:
+        """start번째 점부터의 구간 (첫 구간에는 색/굵기 포함)"""
+        segment = {"id": self.id, "i": start, "p": self.deltas[start * 2:]}
+        if start == 0:
+            segment["c"] = self.color
+            segment["w"] = self.width
+        if self.ended:
+            segment["end"] = True
+        return segment
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "c": self.color, "w": self.width, "p": self.deltas}
+
+
+class Whiteboard:
+    """
+    회의실 하나의 화이트보드 상태
+
+    - snapshot_parts: 압축된 획들의 JSON 텍스트 (snapshot은 이를 이어 붙인 RawJSON, 참가 시 다시 인코딩하지 않음)
+    - log: 스냅샷 이후의 획 (그린 순서 유지, 진행 중인 획 포함)
+    - active: (sid, 클라이언트 획 키) → 진행 중인 획
+    - dirty: 작성자 sid → {획 ID: 아직 보내지 않은 첫 점 번호}
+    """
+
+    __slots__ = ("snapshot_parts", "snapshot", "log", "active", "next_id", "dirty", "timer")
+
+    def __init__(self):
+        self.snapshot_parts: List[str] = []
+        self.snapshot = RawJSON("[]")
+        self.log: Dict[int, Stroke] = {}
+        self.active: Dict[Tuple[str, object], Stroke] = {}
+        self.next_id = 1
+        self.dirty: Dict[str, Dict[int, int]] = {}
+        self.timer: Optional[asyncio.Task] = None
+
+    def compact(self, max_strokes: int):
+        """
+        완료되어 모두 보낸 획을 스냅샷으로 옮기고 전체 획 수를 max_strokes로 제한
+
+        진행 중이거나 아직 보내지 않은 구간이 있는 획은 건너뛰고 log에 남김
+        (끝을 보내지 않는 참가자가 있어도 압축이 멈추지 않음, 그 획은 스냅샷 위에 그려짐)
+        """
+        unsent = {stroke_id for pending in self.dirty.values() for stroke_id in pending}
+        changed = False
+        for stroke_id in list(self.log):
+            stroke = self.log[stroke_id]
+            if not stroke.ended or stroke_id in unsent:
+                continue
+            del self.log[stroke_id]
+            self.snapshot_parts.append(json.dumps(stroke.to_dict(), separators=(",", ":")))
+            changed = True
+        overflow = len(self.snapshot_parts) + len(self.log) - max_strokes
+        if overflow > 0 and self.snapshot_parts:
+            del self.snapshot_parts[:overflow]
+            changed = True
+        if changed:
+            self.snapshot = RawJSON("[" + ",".join(self.snapshot_parts) + "]")
+
+
+class WhiteboardEngine:
+    """
+    회의실별 화이트보드
+
+    - draw()는 점을 획 기록에 바로 반영하고, 전송은 회의실별 타이머가 window마다 작성자별로 모아서 수행
+    - 전송은 send(room_id, author_sid, segments) 콜백으로 수행
+    - 워커 메모리에 보관하므로 REDIS_URL로 여러 워커를 쓰면 워커마다 자기 참가자가 그린 획만 스냅샷에 남음
+    """
+
+    def __init__(
+        self,
+        send: SendSegments,
+        window: float = WHITEBOARD_BATCH_MS / 1000,
+        grid: int = WHITEBOARD_GRID,
+        snapshot_every: int = WHITEBOARD_SNAPSHOT_EVERY,
+        max_strokes: int = WHITEBOARD_MAX_STROKES,
+    ):
+        self.send = send
+        self.window = window
+        self.grid = grid
+        self.snapshot_every = snapshot_every
+        self.max_strokes = max_strokes
+        self._boards: Dict[str, Whiteboard] = {}
+        self.frames_sent = 0
+        self.points_received = 0
+
+    def _board(self, room_id: str) -> Whiteboard:
+        board = self._boards.get(room_id)
+        if board is None:
+            board = self._boards[room_id] = Whiteboard()
+        return board
+
+    def _start(self, board: Whiteboard, sid: str, key, data: Dict) -> Stroke:
+        """새 획 시작 (한 사람은 한 번에 한 획만 그리므로 같은 sid의 진행 중인 획은 종료)"""
+        for other in [other for other in board.active if other[0] == sid]:
+            self._end(board, sid, other[1], board.active[other])
+        color = data.get("color")
+        if not isinstance(color, str) or len(color) > _MAX_COLOR_LENGTH:
+            color = None
+        width = data.get("width")
+        if isinstance(width, bool) or not isinstance(width, (int, float)) or not 0 < width <= _MAX_WIDTH:
+            width = None
+        stroke = Stroke(board.next_id, sid, color, width)
+        board.next_id += 1
+        board.log[stroke.id] = stroke
+        board.active[(sid, key)] = stroke
+        return stroke
+
+    def _end(self, board: Whiteboard, sid: str, key, stroke: Stroke):
+        stroke.ended = True
+        board.active.pop((sid, key), None)
+        self._mark(board, sid, stroke, stroke.count)
+
+    def _mark(self, board: Whiteboard, sid: str, stroke: Stroke, start: int):
+        pending = board.dirty.setdefault(sid, {})
+        if stroke.id not in pending:
+            pending[stroke.id] = start
+
+    async def draw(self, room_id: str, sid: str, data: Dict) -> bool:
+        """
+        그리기 이벤트 반영 (반환: 형식이 올바른지)
+
+        data: {"stroke": 클라이언트 획 키, "points": [...], "color"?, "width"?, "end"?}
+              또는 예전 형식 {"x0", "y0", "x1", "y1", "color"?, "width"?} (이어지는 선분은 한 획으로 합침)
+        """
+        try:
+            if "points" in data:
+                key = data.get("stroke")
+                if not isinstance(key, (str, int)) or isinstance(key, bool):
+                    raise ValueError("획 키가 없음")
+                points = parse_points(data["points"], self.grid)
+            else:
+                key = _LEGACY_STROKE
+                points = parse_points([data.get("x0"), data.get("y0"), data.get("x1"), data.get("y1")], self.grid)
+        except (ValueError, TypeError, AttributeError, IndexError) as e:
+            logger.debug("화이트보드 이벤트 무시: sid=%s (%s)", sid, e)
+            return False
+
+        board = self._board(room_id)
+        stroke = board.active.get((sid, key))
+        if key == _LEGACY_STROKE:
+            # 직전 선분의 끝점에서 같은 색/굵기로 이어지면 같은 획
+            if stroke is not None and (stroke.last != points[0] or stroke.color != data.get("color")
+                                       or stroke.width != data.get("width")):
+                stroke = None
+            elif stroke is not None:
+                points = points[1:]
+        if stroke is None:
+            stroke = self._start(board, sid, key, data)
+
+        start = stroke.count
+        added = stroke.append(points)
+        self.points_received += added
+        if added:
+            self._mark(board, sid, stroke, start)
+        if data.get("end") is True or stroke.count >= WHITEBOARD_MAX_POINTS:
+            self._end(board, sid, key, stroke)
+
+        if self.window <= 0:
+            await self.flush(room_id)
+        else:
+            self._schedule(room_id, board)
+        return True
+
+    def _schedule(self, room_id: str, board: Whiteboard):
+        """window 뒤에 회의실 전송 예약 (이미 예약되어 있으면 그대로)"""
+        if board.timer is None:
+            board.timer = asyncio.create_task(self._flush_later(room_id, board))
+
+    async def flush(self, room_id: str):
+        """회의실의 보내지 않은 구간을 작성자별 프레임으로 전송"""
+        board = self._boards.get(room_id)
+        if board is None:
+            return
+        timer, board.timer = board.timer, None
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+        dirty, board.dirty = board.dirty, {}
+        for author, pending in dirty.items():
+            segments = []
+            for stroke_id, start in pending.items():
+                stroke = board.log.get(stroke_id)
+                if stroke is not None:
+                    segments.append(stroke.segment(start))
+            if not segments:
+                continue
+            self.frames_sent += 1
+            try:
+                await self.send(room_id, author, segments)
+            except Exception as e:
+                logger.warning("화이트보드 구간 전송 실패: room=%s, sid=%s: %s", room_id, author, e)
+        # 보낸 뒤에 압축 (보내지 않은 구간이 있는 획은 기록에 남김)
+        if len(board.log) >= self.snapshot_every:
+            board.compact(self.max_strokes)
+
+    async def flush_all(self):
+        """모든 회의실 전송 (종료 시)"""
+        for room_id in list(self._boards):
+            await self.flush(room_id)
+
+    async def _flush_later(self, room_id: str, board: Whiteboard):
+        await asyncio.sleep(self.window)
+        if self._boards.get(room_id) is board:
+            await self.flush(room_id)
+
+    def state(self, room_id: str) -> Optional[Dict]:
+        """참가자에게 보낼 현재 상태 (그린 것이 없으면 None)"""
+        board = self._boards.get(room_id)
+        if board is None or (not board.snapshot_parts and not board.log):
+            return None
+        return {
+            "g": self.grid,
+            "snapshot": board.snapshot,
+            "strokes": [stroke.to_dict() for stroke in board.log.values()],
+        }
+
+    def clear(self, room_id: str):
+        """회의실 화이트보드 지우기"""
+        board = self._boards.pop(room_id, None)
+        if board is not None and board.timer is not None:
+            board.timer.cancel()
+
+    def discard(self, sid: str):
+        """sid의 진행 중인 획을 종료 처리하고 끝 표시를 전송 예약 (연결 해제 시, 보내지 않은 점도 함께 전송)"""
+        for room_id, board in self._boards.items():
+            keys = [key for key in board.active if key[0] == sid]
+            for key in keys:
+                self._end(board, sid, key[1], board.active[key])
+            if keys:
+                self._schedule(room_id, board)